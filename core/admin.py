@@ -1,12 +1,40 @@
 from django.contrib import admin
-from .models import Profile, Book, Post, Like, Repost, Comment, Follow, Notification
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, StreamingHttpResponse
+from django.urls import path
+from django.utils import timezone
+
+from . import exporters
+from .models import Profile, Book, Post, Like, Repost, Comment, Follow, Notification, TimelineEntry
 
 # Register your models here.
 admin.site.register(Profile)
 admin.site.register(Book)
-admin.site.register(Post)
 admin.site.register(Like)
 admin.site.register(Repost)
 admin.site.register(Comment)
 admin.site.register(Follow)
-admin.site.register(Notification)
\ No newline at end of file
+admin.site.register(Notification)
+admin.site.register(TimelineEntry)
+
+
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+    change_list_template = 'admin/core/post/change_list.html'
+
+    def get_urls(self):
+        urls = [
+            path('export/<str:fmt>/', self.admin_site.admin_view(self.export_view), name='core_post_export'),
+        ]
+        return urls + super().get_urls()
+
+    def export_view(self, request, fmt):
+        """전체 게시물을 스트리밍으로 내려받는다 (메모리에 모으지 않음)."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        if fmt not in exporters.FORMATS:
+            raise Http404
+        response = StreamingHttpResponse(exporters.stream(fmt), content_type=exporters.CONTENT_TYPES[fmt])
+        filename = f"posts-{timezone.now():%Y%m%d-%H%M%S}.{fmt}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,128 @@
+# ============================
+# core/bench.py
+# 주요 엔드포인트 벤치마크 (manage.py bench)
+# ============================
+# Django 테스트 클라이언트로 미들웨어/뷰/템플릿 전체 경로를 순서대로 호출한다 (네트워크/서버 제외).
+# 요청마다 지연 시간과 쿼리 수(core/instrumentation.py)를 재서 p50/p95/p99, 초당 처리량을 낸다.
+# 결과는 JSON 으로 저장해 이전 실행과 비교할 수 있다.
+# 좋아요/팔로우는 두 번 누르면 원래 상태로 돌아오므로 짝수 번 호출해 데이터를 바꾸지 않는다
+# (알림 작업은 jobs 테이블에 쌓일 수 있다).
+import math
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from . import instrumentation
+from .models import Comment, Follow, Post
+
+SCENARIOS = ('feed', 'profile', 'list_comments_api', 'list_notifications_api', 'toggle_like', 'toggle_follow')
+
+
+def percentile(values, pct):
+    """nearest-rank 백분위수."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def pick_fixtures():
+    """가장 활발한 사용자(보는 사람), 인기 사용자(프로필/팔로우 대상), 댓글 많은 게시물."""
+    viewer = User.objects.annotate(n=Count('following')).order_by('-n', 'id').first()
+    if viewer is None:
+        raise ValueError('no users to benchmark with (run manage.py seed first)')
+    target = User.objects.exclude(id=viewer.id).order_by('-profile__follower_count', 'id').first()
+    post_id = (
+        Comment.objects.values('post_id').annotate(n=Count('id')).order_by('-n').values_list('post_id', flat=True).first()
+        or Post.objects.order_by('-like_count', '-id').values_list('id', flat=True).first()
+    )
+    if target is None or post_id is None:
+        raise ValueError('need at least two users and one post (run manage.py seed first)')
+    return viewer, target, post_id
+
+
+def _requests(viewer, target, post_id):
+    """시나리오 이름 -> (method, url)."""
+    return {
+        'feed': ('get', reverse('feed')),
+        'profile': ('get', reverse('profile_detail', args=[target.id])),
+        'list_comments_api': ('get', reverse('list_comments_api', args=[post_id])),
+        'list_notifications_api': ('get', reverse('list_notifications_api')),
+        'toggle_like': ('post', reverse('like_post', args=[post_id])),
+        'toggle_follow': ('post', reverse('toggle_follow', args=[target.id])),
+    }
+
+
+def _host():
+    hosts = [h for h in settings.ALLOWED_HOSTS if h and h != '*' and not h.startswith('.')]
+    return hosts[0] if hosts else 'localhost'
+
+
+def run(scenarios=SCENARIOS, iterations=50, warmup=5, log=print):
+    """시나리오별 통계 dict 를 담은 결과를 반환 (JSON 으로 저장 가능)."""
+    viewer, target, post_id = pick_fixtures()
+    client = Client(HTTP_HOST=_host())
+    client.force_login(viewer)
+    plan = _requests(viewer, target, post_id)
+    # 토글은 짝수 번 호출해서 원래 상태로 되돌린다
+    iterations += iterations % 2
+    warmup += warmup % 2
+
+    results = {}
+    for name in scenarios:
+        method, url = plan[name]
+        call = getattr(client, method)
+        for _ in range(warmup):
+            call(url)
+        latencies, queries = [], []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            with instrumentation.collect() as metrics:
+                response = call(url)
+            if response.status_code >= 400:
+                raise RuntimeError(f'{name}: {method.upper()} {url} returned {response.status_code}')
+            latencies.append(metrics.total_time * 1000)
+            queries.append(metrics.queries)
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            'url': url,
+            'requests': iterations,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'queries_per_request': round(sum(queries) / len(queries), 1),
+            'max_queries': max(queries),
+            'throughput_rps': round(iterations / elapsed, 1),
+        }
+        log(f"{name}: p50 {results[name]['p50_ms']}ms, p95 {results[name]['p95_ms']}ms, "
+            f"{results[name]['queries_per_request']} queries, {results[name]['throughput_rps']} req/s")
+
+    return {
+        'created_at': timezone.now().isoformat(),
+        'database': str(settings.DATABASES['default']['NAME']),
+        'iterations': iterations,
+        'fixtures': {'viewer_id': viewer.id, 'target_id': target.id, 'post_id': post_id},
+        'dataset': {
+            'users': User.objects.count(),
+            'posts': Post.objects.count(),
+            'follows': Follow.objects.count(),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current):
+    """시나리오별 (이름, 기준 p95, 현재 p95, 변화율 %, 기준 쿼리 수, 현재 쿼리 수)."""
+    rows = []
+    for name, stats in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        change = (stats['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100 if base['p95_ms'] else 0.0
+        rows.append((name, base['p95_ms'], stats['p95_ms'], round(change, 1),
+                     base['queries_per_request'], stats['queries_per_request']))
+    return rows
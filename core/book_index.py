@@ -0,0 +1,121 @@
+# ============================
+# core/book_index.py
+# books 테이블의 로컬 전문 검색 인덱스 (SQLite FTS5, trigram 토크나이저)
+# ============================
+# trigram 토크나이저는 공백이 없는 한국어 제목도 세 글자 단위 부분 문자열로 찾아 준다.
+# 세 글자보다 짧은 검색어는 같은 가상 테이블에 LIKE 로 조회한다.
+# SQLite 가 아니거나 FTS5/trigram 을 지원하지 않으면 ORM icontains 검색으로 대신한다.
+from django.db import OperationalError, connection
+from django.db.models import Q
+
+from .models import Book
+
+FTS_TABLE = 'books_fts'
+MIN_TRIGRAM_LENGTH = 3
+
+_available = None
+
+
+def create_table(conn=None):
+    conn = conn or connection
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                "USING fts5(title, author, isbn, tokenize='trigram')"
+            )
+    except OperationalError as e:
+        # FTS5 또는 trigram 토크나이저(SQLite 3.34+)가 없는 빌드
+        print(f"Book index unavailable: {e}")
+        return False
+    return True
+
+
+def available():
+    global _available
+    if _available is None:
+        if connection.vendor != 'sqlite':
+            _available = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                _available = cursor.fetchone() is not None
+    return _available
+
+
+def index_books(books):
+    if not available() or not books:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+            [(book.id,) for book in books],
+        )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, author, isbn) VALUES (%s, %s, %s, %s)",
+            [(book.id, book.title, book.author or '', book.isbn or '') for book in books],
+        )
+
+
+def remove_book(book_id):
+    if not available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [book_id])
+
+
+def rebuild(conn=None):
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, author, isbn) "
+            "SELECT id, title, COALESCE(author, ''), COALESCE(isbn, '') FROM books"
+        )
+
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _fts_search(terms, limit):
+    long_terms = [t for t in terms if len(t) >= MIN_TRIGRAM_LENGTH]
+    short_terms = [t for t in terms if len(t) < MIN_TRIGRAM_LENGTH]
+    where, params = [], []
+    if long_terms:
+        # 각 단어를 구문으로 감싸 AND 검색 (trigram 에서는 부분 문자열 일치)
+        where.append(f"{FTS_TABLE} MATCH %s")
+        params.append(' AND '.join('"' + t.replace('"', '""') + '"' for t in long_terms))
+    for term in short_terms:
+        where.append("(title LIKE %s ESCAPE '\\' OR author LIKE %s ESCAPE '\\' OR isbn LIKE %s ESCAPE '\\')")
+        pattern = f"%{_escape_like(term)}%"
+        params += [pattern, pattern, f"{_escape_like(term)}%"]
+    # 제목이 검색어로 시작하는 책을 먼저, 그다음 bm25 관련도
+    order = "CASE WHEN title LIKE %s ESCAPE '\\' THEN 0 ELSE 1 END"
+    params.append(f"{_escape_like(terms[0])}%")
+    if long_terms:
+        order += f", bm25({FTS_TABLE})"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {' AND '.join(where)} ORDER BY {order} LIMIT %s",
+            params,
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _orm_search(terms, limit):
+    books = Book.objects.all()
+    for term in terms:
+        books = books.filter(Q(title__icontains=term) | Q(author__icontains=term) | Q(isbn__startswith=term))
+    return list(books.order_by('title').values_list('id', flat=True)[:limit])
+
+
+def search(query, limit=10):
+    """제목/저자/ISBN 부분 일치 검색. 관련도 순 Book 목록."""
+    terms = query.lower().split()
+    if not terms:
+        return []
+    book_ids = _fts_search(terms, limit) if available() else _orm_search(terms, limit)
+    books = Book.objects.in_bulk(book_ids)
+    return [books[book_id] for book_id in book_ids if book_id in books]
@@ -0,0 +1,276 @@
+# ============================
+# core/book_search.py
+# 외부 도서 검색 (Kakao + OpenLibrary 병렬 조회, 제공자별 타임아웃, 결과 캐시)
+# ============================
+# 두 제공자를 동시에 호출하고 각각 BOOK_SEARCH_TIMEOUT 안에 끝난 결과만 합친다.
+# HTTP 는 제공자별 requests.Session(연결 풀 재사용)을 스레드에서 돌리고, 이벤트 루프에서는 기다리기만 한다.
+# 정규화된 결과는 프로세스 내 LRU(TTL) 와 BookSearchCache 테이블 두 단계로 캐시되어 재시작 후에도 남는다.
+# 일부 제공자가 실패한 결과는 BOOK_SEARCH_PARTIAL_CACHE_TTL 동안 메모리에만 둔다 (곧 다시 전체 조회).
+import asyncio
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import timedelta
+
+import requests
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from . import instrumentation
+from .models import BookSearchCache
+
+RESULTS_PER_PROVIDER = 10
+
+
+# -----------------------------
+# ISBN / 결과 정규화
+# -----------------------------
+def _isbn10_to_13(isbn10):
+    core = '978' + isbn10[:9]
+    total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(core))
+    return core + str((10 - total % 10) % 10)
+
+
+def normalize_isbn(raw):
+    """'8936434594 9788936434595' 같은 값에서 ISBN-13 하나를 고른다. 없으면 None."""
+    if not raw:
+        return None
+    candidates = [re.sub(r'[^0-9Xx]', '', part) for part in re.split(r'[\s,]+', str(raw))]
+    for candidate in candidates:
+        if len(candidate) == 13 and candidate.isdigit():
+            return candidate
+    for candidate in candidates:
+        if len(candidate) == 10 and candidate[:9].isdigit():
+            return _isbn10_to_13(candidate)
+    return None
+
+
+def normalize_query(query):
+    return ' '.join(query.lower().split())
+
+
+def query_key(query):
+    """캐시 키: 정규화한 검색어의 해시. 검색어 길이와 무관하게 64자 (BookSearchCache.query_key)."""
+    normalized = normalize_query(query)
+    return hashlib.sha256(normalized.encode()).hexdigest() if normalized else None
+
+
+def _fold(text):
+    # 전각/반각·대소문자·문장부호 차이를 없앤다
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text).split())
+
+
+def normalize_title(title):
+    return _fold(title or '')
+
+
+def normalize_author(author):
+    """'한강 (지은이), 홍길동 옮김' -> '한강|홍길동 옮김'. 공저자는 순서와 무관하게 같은 값."""
+    text = re.sub(r'\([^)]*\)', ' ', author or '')
+    names = {_fold(name) for name in re.split(r'\s*(?:[,;&/·]|\band\b)\s*', text)}
+    return '|'.join(sorted(name for name in names if name))
+
+
+def book_key(title, author):
+    """정규화한 제목+저자의 해시. Book.normalized_key 와 검색 결과 병합에 쓴다."""
+    raw = f'{normalize_title(title)}\x1f{normalize_author(author)}'
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def merge_results(*result_lists):
+    """제공자 순서대로 합치되 ISBN(없으면 제목+저자)이 같은 책은 한 번만."""
+    merged, seen = [], set()
+    for results in result_lists:
+        for book in results:
+            key = book['isbn'] or book_key(book['title'], book['author'])
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(book)
+    return merged
+
+
+# -----------------------------
+# 제공자
+# -----------------------------
+class Provider:
+    name = None
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        # 스레드마다 Session 하나: 같은 스레드풀 워커가 keep-alive 연결을 계속 재사용한다
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    def enabled(self):
+        return True
+
+    def fetch(self, query, timeout):
+        raise NotImplementedError
+
+
+class KakaoProvider(Provider):
+    name = 'kakao'
+
+    def enabled(self):
+        return bool(settings.KAKAO_API_KEY)
+
+    def fetch(self, query, timeout):
+        response = self.session.get(
+            settings.KAKAO_SEARCH_URL,
+            headers={"Authorization": f"KakaoAK {settings.KAKAO_API_KEY}"},
+            params={"query": query, "size": RESULTS_PER_PROVIDER},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        results = []
+        for doc in response.json().get('documents', []):
+            title = doc.get('title')
+            authors = ", ".join(doc.get('authors', []))
+            if title and authors:
+                results.append({
+                    'title': title,
+                    'author': authors,
+                    'cover_url': doc.get('thumbnail') or None,
+                    'isbn': normalize_isbn(doc.get('isbn')),
+                })
+        return results
+
+
+class OpenLibraryProvider(Provider):
+    name = 'openlibrary'
+
+    def fetch(self, query, timeout):
+        response = self.session.get(
+            settings.OPENLIBRARY_SEARCH_URL,
+            params={"q": query, "limit": RESULTS_PER_PROVIDER},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        results = []
+        for doc in response.json().get('docs', []):
+            title = doc.get('title')
+            authors = ", ".join(doc.get('author_name', []))
+            cover_id = doc.get('cover_i')
+            if title and authors:
+                results.append({
+                    'title': title,
+                    'author': authors,
+                    'cover_url': f"https://covers.openlibrary.org/b/id/{cover_id}-M.jpg" if cover_id else None,
+                    'isbn': normalize_isbn(' '.join(doc.get('isbn', [])[:5])),
+                })
+        return results
+
+
+PROVIDERS = [KakaoProvider(), OpenLibraryProvider()]
+
+
+# -----------------------------
+# 캐시
+# -----------------------------
+class ResultCache:
+    """프로세스 내 TTL + LRU. 스레드 안전."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, results = entry
+            if expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return results
+
+    def set(self, key, results, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, results)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+memory_cache = ResultCache(max_entries=1024)
+
+
+async def _load_persistent(key):
+    entry = await BookSearchCache.objects.filter(query_key=key, expires_at__gt=timezone.now()).afirst()
+    return entry.results if entry else None
+
+
+async def _store_persistent(key, results, ttl):
+    now = timezone.now()
+    await BookSearchCache.objects.aupdate_or_create(
+        query_key=key,
+        defaults={'results': results, 'expires_at': now + timedelta(seconds=ttl)},
+    )
+    await BookSearchCache.objects.filter(expires_at__lte=now).adelete()
+
+
+# -----------------------------
+# 검색
+# -----------------------------
+async def _run_provider(provider, query, timeout):
+    try:
+        # 제공자는 병렬로 돌므로 'http' 합계는 벽시계 시간보다 클 수 있다
+        with instrumentation.span('http'):
+            return await asyncio.wait_for(asyncio.to_thread(provider.fetch, query, timeout), timeout)
+    except (asyncio.TimeoutError, requests.exceptions.RequestException, ValueError) as e:
+        print(f"{provider.name} search error: {e!r}")
+        return None
+
+
+async def search(query):
+    """병렬 검색 + 병합. 결과 dict 목록 반환 (title, author, cover_url, isbn)."""
+    key = query_key(query)
+    if not key:
+        return []
+    results = memory_cache.get(key)
+    if results is not None:
+        return results
+    ttl = settings.BOOK_SEARCH_CACHE_TTL
+    results = await _load_persistent(key)
+    if results is not None:
+        memory_cache.set(key, results, ttl)
+        return results
+
+    providers = [p for p in PROVIDERS if p.enabled()]
+    responses = await asyncio.gather(*(_run_provider(p, query, settings.BOOK_SEARCH_TIMEOUT) for p in providers))
+    results = merge_results(*(r for r in responses if r))
+    if all(r is not None for r in responses):
+        memory_cache.set(key, results, ttl)
+        await _store_persistent(key, results, ttl)
+    elif any(r is not None for r in responses):
+        # 일부 제공자만 응답: 빠진 결과를 하루 동안 굳히지 않도록 잠깐만. 모두 실패하면 캐시하지 않는다
+        memory_cache.set(key, results, settings.BOOK_SEARCH_PARTIAL_CACHE_TTL)
+    return results
+
+
+def search_sync(query):
+    """동기 뷰/서비스용 진입점."""
+    return async_to_sync(search)(query)
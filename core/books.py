@@ -0,0 +1,210 @@
+# ============================
+# core/books.py
+# 책 식별 (ISBN / 정규화한 제목+저자로 같은 책을 한 행으로)
+# ============================
+# 같은 책인지는 ISBN-13 이 있으면 ISBN 으로, 없으면 book_search.book_key(제목, 저자)로 판단한다.
+# ISBN 이 다른 같은 제목+저자는 다른 판이므로 따로 둔다. ISBN 은 유일하고, key 는 ISBN 없는 책 사이에서만 유일해
+# 동시에 같은 책을 만들어도 한 행만 남는다. 만들기는 INSERT 를 시도하고
+# 충돌(다른 요청이 먼저 만듦)이면 무시한 뒤 다시 조회하는 방식이라 락이 필요 없다.
+# resolve_many() 는 가져오기처럼 많은 책을 한 번에 풀 때 묶음당 조회 2번 + INSERT 1번으로 처리한다.
+# 유일 제약 이전에 생긴 중복은 merge_duplicates() (manage.py merge_duplicate_books) 로 합친다.
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from . import book_index, book_search
+from .models import Book, Post
+
+
+def _prepare(title, author, cover_url=None, isbn=None):
+    title = (title or '').strip()
+    if not title:
+        return None
+    author = (author or '').strip() or None
+    return {
+        'title': title[:255],
+        'author': author[:255] if author else None,
+        'cover_url': cover_url[:255] if cover_url else None,
+        'isbn': book_search.normalize_isbn(isbn),
+        'normalized_key': book_search.book_key(title, author),
+    }
+
+
+def _lookup(rows):
+    """rows 의 ISBN / key 에 해당하는 기존 책. ({isbn: Book}, {key: [Book, ...]})"""
+    isbns = {row['isbn'] for row in rows if row['isbn']}
+    keys = {row['normalized_key'] for row in rows}
+    by_isbn, by_key = {}, defaultdict(list)
+    for book in Book.objects.filter(Q(isbn__in=isbns) | Q(normalized_key__in=keys)).order_by('id'):
+        _add(book, by_isbn, by_key)
+    return by_isbn, by_key
+
+
+def _add(book, by_isbn, by_key):
+    if book.isbn:
+        by_isbn[book.isbn] = book
+    if book.normalized_key:
+        by_key[book.normalized_key].append(book)
+
+
+def _match(row, by_isbn, by_key):
+    """ISBN 이 같은 책, 없으면 제목+저자가 같고 ISBN 이 없는 책.
+
+    ISBN 이 다른 같은 제목+저자는 다른 판이라 합치지 않는다. ISBN 을 모르는 항목은 ISBN 이 있는 판에도 붙는다.
+    """
+    if row['isbn'] and row['isbn'] in by_isbn:
+        return by_isbn[row['isbn']]
+    same_key = by_key.get(row['normalized_key'], [])
+    book = next((b for b in same_key if not b.isbn), None)
+    if book or row['isbn']:
+        return book
+    return same_key[0] if same_key else None
+
+
+def _enrich(changed):
+    """기존 책에 없던 ISBN / 표지를 저장한다. 충돌로 저장하지 못했으면 False."""
+    if not changed:
+        return True
+    try:
+        with transaction.atomic():
+            Book.objects.bulk_update(changed, ['isbn', 'cover_url'])
+    except IntegrityError:
+        # 그 사이 같은 ISBN 의 책이 생겼다. 보강은 다음 기회에
+        return False
+    book_index.index_books(changed)
+    return True
+
+
+def _resolve_batch(rows):
+    by_isbn, by_key = _lookup(rows)
+    known = {book.id for books in by_key.values() for book in books} | {book.id for book in by_isbn.values()}
+    new, changed = [], []
+    for row in rows:
+        book = _match(row, by_isbn, by_key)
+        if not book:
+            # 같은 묶음의 뒤 항목도 이 책에 붙도록 바로 색인에 넣는다
+            book = Book(**row)
+            new.append(book)
+            _add(book, by_isbn, by_key)
+            continue
+        # 기존 책에 없던 ISBN / 표지를 채운다 (아직 만들지 않은 책은 INSERT 에 그대로 들어간다)
+        before = (book.isbn, book.cover_url)
+        if row['isbn'] and not book.isbn:
+            book.isbn = row['isbn']
+            by_isbn[book.isbn] = book
+        book.cover_url = book.cover_url or row['cover_url']
+        if book.id is not None and (book.isbn, book.cover_url) != before and book not in changed:
+            changed.append(book)
+    enriched = _enrich(changed)
+    if new or not enriched:
+        # 다른 요청이 먼저 만든 책은 충돌로 건너뛰고 재조회에서 가져온다
+        Book.objects.bulk_create(new, ignore_conflicts=True)
+        by_isbn, by_key = _lookup(rows)
+        # bulk_create 는 post_save 를 보내지 않으므로 검색 인덱스는 직접 반영
+        created = {book.id: book for books in by_key.values() for book in books if book.id not in known}
+        created.update((book.id, book) for book in by_isbn.values() if book.id not in known)
+        if created:
+            book_index.index_books(list(created.values()))
+    return [_match(row, by_isbn, by_key) for row in rows]
+
+
+def resolve_many(entries, batch_size=500):
+    """entries: [{'title', 'author', 'cover_url', 'isbn'}] -> 같은 순서의 Book 목록 (제목이 없으면 None)."""
+    prepared = [_prepare(e.get('title'), e.get('author'), e.get('cover_url'), e.get('isbn')) for e in entries]
+    books = [None] * len(prepared)
+    positions = [i for i, row in enumerate(prepared) if row]
+    for start in range(0, len(positions), batch_size):
+        chunk = positions[start:start + batch_size]
+        for i, book in zip(chunk, _resolve_batch([prepared[i] for i in chunk])):
+            books[i] = book
+    return books
+
+
+def resolve(title, author, cover_url=None, isbn=None):
+    """책 하나를 찾거나 만든다. 제목이 없으면 None."""
+    return resolve_many([{'title': title, 'author': author, 'cover_url': cover_url, 'isbn': isbn}])[0]
+
+
+# -----------------------------
+# 기존 중복 합치기
+# -----------------------------
+def find_duplicates():
+    """같은 책으로 합칠 묶음. [[id, ...]] (각 묶음의 첫 id 가 남길 책).
+
+    ISBN 이 같으면 같은 책. 제목+저자가 같고 ISBN 이 없는 책끼리도 같은 책이며, 그 제목+저자의 판(ISBN)이
+    하나뿐이면 그 판에 합친다. 판이 여럿이면 어느 판인지 모르므로 ISBN 없는 책은 따로 남긴다.
+    """
+    rows = list(Book.objects.order_by('id').values_list('id', 'title', 'author', 'isbn'))
+    parent = {book_id: book_id for book_id, *_ in rows}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        a, b = find(a), find(b)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    isbn_owners = {}
+    by_key = defaultdict(list)
+    has_isbn = set()
+    for book_id, title, author, isbn in rows:
+        isbn = book_search.normalize_isbn(isbn)
+        if isbn:
+            has_isbn.add(book_id)
+            if isbn in isbn_owners:
+                union(isbn_owners[isbn], book_id)
+            else:
+                isbn_owners[isbn] = book_id
+        by_key[book_search.book_key(title, author)].append((book_id, isbn))
+
+    for books in by_key.values():
+        bare = [book_id for book_id, isbn in books if not isbn]
+        editions = {isbn: book_id for book_id, isbn in books if isbn}
+        if bare and len(editions) == 1:
+            bare.append(next(iter(editions.values())))
+        for book_id in bare[1:]:
+            union(bare[0], book_id)
+
+    groups = defaultdict(list)
+    for book_id, *_ in rows:
+        groups[find(book_id)].append(book_id)
+    # ISBN 이 있는 책, 그다음 먼저 생긴 책을 남긴다
+    return [sorted(ids, key=lambda i: (i not in has_isbn, i)) for ids in groups.values() if len(ids) > 1]
+
+
+def merge_duplicates():
+    """중복 책을 합치고 Post.book 을 남는 책으로 옮긴 뒤, 모든 책의 ISBN / key 를 정규화된 값으로 채운다.
+
+    (합친 묶음 수, 지운 책 수, 옮긴 게시물 수) 반환.
+    """
+    groups = find_duplicates()
+    deleted = moved = 0
+    for keep_id, *other_ids in groups:
+        with transaction.atomic():
+            cover_url = Book.objects.filter(id__in=other_ids).exclude(cover_url__isnull=True) \
+                .exclude(cover_url='').values_list('cover_url', flat=True).first()
+            moved += Post.objects.filter(book_id__in=other_ids).update(book_id=keep_id)
+            Book.objects.filter(id__in=other_ids).delete()
+            deleted += len(other_ids)
+            if cover_url:
+                Book.objects.filter(Q(cover_url__isnull=True) | Q(cover_url=''), id=keep_id).update(cover_url=cover_url)
+
+    # 저장된 값과 다른 것만 먼저 비우고 채운다 (행마다 갱신하는 동안 유일 제약에 걸리지 않도록)
+    updates = []
+    for book in Book.objects.only('id', 'title', 'author', 'isbn', 'normalized_key').iterator():
+        isbn = book_search.normalize_isbn(book.isbn)
+        key = book_search.book_key(book.title, book.author)
+        if (isbn, key) != (book.isbn, book.normalized_key):
+            book.isbn, book.normalized_key = isbn, key
+            updates.append(book)
+    with transaction.atomic():
+        for start in range(0, len(updates), 500):
+            ids = [b.id for b in updates[start:start + 500]]
+            Book.objects.filter(id__in=ids).update(isbn=None, normalized_key=None)
+        Book.objects.bulk_update(updates, ['isbn', 'normalized_key'], batch_size=500)
+    return len(groups), deleted, moved
@@ -0,0 +1,42 @@
+# ============================
+# core/concurrency.py
+# 워커(프로세스)당 비동기 API 동시 처리 수 제한
+# ============================
+# ASGI 워커 하나는 이벤트 루프 하나로 많은 요청을 동시에 받는다. 상호작용 API 는 결국 DB 를 쓰므로
+# 한꺼번에 너무 많이 들어오면 연결/잠금 대기만 길어진다. ASYNC_API_CONCURRENCY 개까지만 동시에 처리하고,
+# 나머지는 ASYNC_API_QUEUE_TIMEOUT 초까지 기다렸다가 그래도 자리가 없으면 Busy (뷰에서 503).
+# asyncio.Semaphore 는 처음 기다린 이벤트 루프에 묶이므로 루프마다 하나씩 둔다.
+# (WSGI 에서 async 뷰는 요청마다 새 루프에서 돌므로 사실상 제한이 없다. 그때는 워커 스레드 수가 상한이다)
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+
+
+class Busy(Exception):
+    """동시 처리 상한에 걸려 기다리다 시간이 다 됨."""
+
+
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(settings.ASYNC_API_CONCURRENCY)
+    return semaphore
+
+
+@asynccontextmanager
+async def limit():
+    semaphore = _semaphore()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), settings.ASYNC_API_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise Busy from None
+    try:
+        yield
+    finally:
+        semaphore.release()
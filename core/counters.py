@@ -0,0 +1,104 @@
+# ============================
+# core/counters.py
+# 좋아요/리포스트 카운터 write-behind 집계
+# ============================
+# 토글은 Post 행을 잠그지 않고 CounterDelta 에 +1/-1 을 append 만 한다.
+# flush() 가 쌓인 증감을 게시물별로 합산해 Post.like_count / repost_count 에 한 번에 반영하고,
+# reconcile() 은 likes / reposts 테이블로부터 정확한 값을 다시 계산한다.
+# 댓글('comments')은 컬럼 없이 hot 점수(core/ranking.py)에만 반영되는 증감이다.
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import jobs, ranking
+from .models import CounterDelta, Like, Post, Repost
+
+COUNTER_FIELDS = ('like_count', 'repost_count')
+RANKING_ONLY_FIELDS = ('comments',)
+
+
+def record(post_id, field, delta):
+    """증감 한 건을 기록하고 flush 작업을 적재 (이미 대기 중이면 그대로)."""
+    if field not in COUNTER_FIELDS + RANKING_ONLY_FIELDS:
+        raise ValueError(f'unknown counter field: {field}')
+    CounterDelta.objects.create(post_id=post_id, field=field, delta=delta)
+    _schedule_flush()
+
+
+def _pending_sum(field):
+    pending = (
+        CounterDelta.objects.filter(post_id=OuterRef('id'), field=field)
+        .values('post_id')
+        .annotate(total=Sum('delta'))
+        .values('total')
+    )
+    return Coalesce(Subquery(pending, output_field=IntegerField()), Value(0))
+
+
+def approximate(post_id, field):
+    """반영된 값 + 아직 합산되지 않은 증감. 쿼리 한 번, 잠금 없음."""
+    folded, pending = (
+        Post.objects.filter(id=post_id)
+        .annotate(pending=_pending_sum(field))
+        .values_list(field, 'pending')
+        .get()
+    )
+    return folded + pending
+
+
+def _schedule_flush():
+    # COUNTER_FLUSH_INTERVAL 뒤에 한 번. 대기 중인 flush 작업이 있으면 (같은 key) 그것으로 충분하다
+    jobs.enqueue('counters.flush', key='counters.flush', delay=settings.COUNTER_FLUSH_INTERVAL)
+
+
+def flush():
+    """쌓인 증감을 Post 에 합산하고 지운다. 합산된 게시물 id 목록 반환.
+
+    먼저 batch 토큰으로 행을 점유하므로 여러 프로세스가 동시에 돌아도 같은 증감을 두 번 더하지 않는다.
+    """
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        claimed = CounterDelta.objects.filter(batch__isnull=True).update(batch=token)
+        if not claimed:
+            return []
+        # 취소로 과하게 빠진 hot 점수를 바로잡는 재계산을 주기당 한 번 (같은 key 는 하나만 대기)
+        jobs.enqueue('ranking.rescore', key='ranking.rescore', delay=settings.HOT_RESCORE_INTERVAL)
+        totals = {}
+        rows = (
+            CounterDelta.objects.filter(batch=token)
+            .values('post_id', 'field')
+            .annotate(total=Sum('delta'))
+        )
+        for row in rows:
+            totals.setdefault(row['post_id'], {})[row['field']] = row['total']
+        for post_id, fields in totals.items():
+            updates = {field: F(field) + total for field, total in fields.items() if total and field in COUNTER_FIELDS}
+            if updates:
+                Post.objects.filter(id=post_id).update(**updates)
+        # hot 점수는 증감 하나하나의 시각이 필요하다
+        ranking.apply(
+            CounterDelta.objects.filter(batch=token).values_list('post_id', 'field', 'delta', 'created_at')
+        )
+        CounterDelta.objects.filter(batch=token).delete()
+    return list(totals)
+
+
+def reconcile(post_ids=None):
+    """likes / reposts 로부터 카운트를 정확히 다시 계산한다. 갱신한 행 수 반환."""
+    like_counts = Like.objects.filter(post_id=OuterRef('id')).values('post_id').annotate(n=Count('id')).values('n')
+    repost_counts = Repost.objects.filter(post_id=OuterRef('id')).values('post_id').annotate(n=Count('id')).values('n')
+    with transaction.atomic():
+        # 댓글 증감은 여기서 다시 계산하지 않으므로 남겨 두고 flush 가 hot 점수에 반영한다
+        deltas = CounterDelta.objects.filter(field__in=COUNTER_FIELDS)
+        posts = Post.objects.all()
+        if post_ids is not None:
+            deltas = deltas.filter(post_id__in=post_ids)
+            posts = posts.filter(id__in=post_ids)
+        deltas.delete()
+        return posts.update(
+            like_count=Coalesce(Subquery(like_counts, output_field=IntegerField()), Value(0)),
+            repost_count=Coalesce(Subquery(repost_counts, output_field=IntegerField()), Value(0)),
+        )
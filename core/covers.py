@@ -0,0 +1,223 @@
+# ============================
+# core/covers.py
+# 책 표지 캐싱 프록시 (Kakao / OpenLibrary 썸네일을 한 번만 받아 직접 서빙)
+# ============================
+# 게시물에 표지 URL 이 저장되면 'covers.fetch' 작업이 원격 이미지를 받아 피드 표시 크기로 줄이고,
+# 내용의 SHA-256 이름으로 MEDIA_ROOT/covers/ 아래에 저장한다 (같은 그림은 URL 이 달라도 한 파일).
+# 피드 요청은 원격 서버에 접속하지 않는다. 아직 받지 못한 표지는 원래 URL 을 그대로 쓴다.
+# 주소가 내용(digest)이므로 /covers/<digest>.jpg 는 영구 캐시(immutable) 헤더로 서빙한다.
+# 'covers.revalidate' 는 오래된 항목을 ETag / If-Modified-Since 조건부 요청으로 다시 확인한다.
+# 표지를 처음 받으면 COVER_REVALIDATE_INTERVAL 뒤로 예약되고, 돌 때마다 다음 주기를 다시 예약한다 (같은 key 는 하나만 대기).
+# 두 작업 모두 atomic=False 로 등록한다: 원격 요청 동안 쓰기 잠금을 쥐지 않고, 실패 기록(attempts/last_error)이 재시도 전에 커밋된다.
+import hashlib
+import io
+import os
+from datetime import timedelta
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import LazyObject
+from PIL import Image
+
+from . import fragments, images, instrumentation, jobs
+from .models import CoverImage, Post
+
+MAX_REDIRECTS = 3
+
+
+class CoverStorage(LazyObject):
+    def _setup(self):
+        self._wrapped = FileSystemStorage(
+            location=os.path.join(settings.MEDIA_ROOT, 'covers'),
+            base_url=settings.MEDIA_URL + 'covers/',
+        )
+
+
+cover_storage = CoverStorage()
+
+
+def url_hash(url):
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def blob_name(digest):
+    return f'{digest[:2]}/{digest}.jpg'
+
+
+def is_allowed(url):
+    """http(s) 이고 호스트가 COVER_ALLOWED_HOSTS 에 속하는 URL 만 받는다 (임의 주소로의 요청 방지)."""
+    parts = urlsplit(url or '')
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return False
+    host = parts.hostname.lower()
+    return any(host == allowed.lstrip('.') or (allowed.startswith('.') and host.endswith(allowed))
+               for allowed in settings.COVER_ALLOWED_HOSTS)
+
+
+# -----------------------------
+# 조회 (요청 경로)
+# -----------------------------
+def attach(posts):
+    """각 post 에 post.cover_src 를 붙인다. 받아 둔 표지면 프록시 URL, 아니면 원래 URL. 쿼리 한 번."""
+    hashes = {post.id: url_hash(post.book_cover_url_snapshot) for post in posts if post.book_cover_url_snapshot}
+    ready = dict(
+        CoverImage.objects.filter(url_hash__in=set(hashes.values()), status=CoverImage.STATUS_OK)
+        .values_list('url_hash', 'digest')
+    ) if hashes else {}
+    for post in posts:
+        digest = ready.get(hashes.get(post.id))
+        post.cover_src = reverse('cover_image', args=[digest]) if digest else post.book_cover_url_snapshot
+
+
+def queue_fetch(url):
+    """표지 URL 을 받아 두도록 작업 적재. 이미 받았거나 받을 수 없는 URL 이면 아무 일도 하지 않는다."""
+    if not url or not is_allowed(url):
+        return
+    if CoverImage.objects.filter(url_hash=url_hash(url), status=CoverImage.STATUS_OK).exists():
+        return
+    jobs.enqueue('covers.fetch', {'url': url}, key=f'covers.fetch:{url_hash(url)}')
+
+
+def schedule_revalidate():
+    """다음 재검증 작업을 예약한다. 이미 대기 중이면 그대로."""
+    jobs.enqueue('covers.revalidate', key='covers.revalidate', delay=settings.COVER_REVALIDATE_INTERVAL)
+
+
+# -----------------------------
+# 원격 요청 (작업 경로)
+# -----------------------------
+_session = None
+
+
+def _get(url, headers):
+    """리다이렉트마다 호스트를 다시 검사하며 GET. 본문은 COVER_MAX_BYTES 까지만 읽는다."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    for _ in range(MAX_REDIRECTS + 1):
+        if not is_allowed(url):
+            raise ValidationError(f'허용되지 않은 표지 주소입니다: {url}')
+        with instrumentation.span('http'):
+            response = _session.get(url, headers=headers, timeout=settings.COVER_FETCH_TIMEOUT,
+                                    allow_redirects=False, stream=True)
+        if response.is_redirect:
+            url = urljoin(url, response.headers['Location'])
+            response.close()
+            continue
+        if response.status_code == 304:
+            return response, None
+        response.raise_for_status()
+        body = bytearray()
+        for chunk in response.iter_content(64 * 1024):
+            body += chunk
+            if len(body) > settings.COVER_MAX_BYTES:
+                response.close()
+                raise ValidationError('표지 이미지가 너무 큽니다.')
+        return response, bytes(body)
+    raise ValidationError('리다이렉트가 너무 많습니다.')
+
+
+def _resize(body):
+    """표시 크기로 줄인 JPEG 바이트."""
+    img = images._to_rgb(images._open(io.BytesIO(body)))
+    img.thumbnail(settings.COVER_DISPLAY_SIZE, Image.LANCZOS)
+    buf = io.BytesIO()
+    pil_format, options = images.FORMATS['jpeg']
+    img.save(buf, format=pil_format, **options)
+    return buf.getvalue()
+
+
+def _store(data):
+    digest = hashlib.sha256(data).hexdigest()
+    name = blob_name(digest)
+    if not cover_storage.exists(name):
+        cover_storage.save(name, ContentFile(data))
+    return digest
+
+
+def _release(digest):
+    """더 이상 어떤 항목도 가리키지 않는 파일을 지운다."""
+    if digest and not CoverImage.objects.filter(digest=digest).exists():
+        cover_storage.delete(blob_name(digest))
+
+
+def _invalidate_posts(url):
+    # 조각 캐시에 원래 URL 로 구워진 카드를 다시 렌더링하게 한다
+    for post_id in Post.objects.filter(book_cover_url_snapshot=url).values_list('id', flat=True).iterator():
+        fragments.invalidate(post_id)
+
+
+def fetch(url, force=False):
+    """url 의 표지를 받아 저장하거나(처음), 조건부 요청으로 다시 확인한다. CoverImage 반환."""
+    key = url_hash(url)
+    try:
+        cover, _ = CoverImage.objects.get_or_create(url_hash=key, defaults={'source_url': url})
+    except IntegrityError:
+        cover = CoverImage.objects.get(url_hash=key)
+    headers = {}
+    if cover.status == CoverImage.STATUS_OK and not force:
+        if cover.etag:
+            headers['If-None-Match'] = cover.etag
+        if cover.last_modified:
+            headers['If-Modified-Since'] = cover.last_modified
+
+    now = timezone.now()
+    try:
+        response, body = _get(url, headers)
+        data = _resize(body) if body is not None else None
+    except (requests.RequestException, ValidationError) as e:
+        cover.attempts += 1
+        cover.checked_at = now
+        cover.last_error = str(e)[:500]
+        if cover.status != CoverImage.STATUS_OK:
+            cover.status = CoverImage.STATUS_FAILED
+        cover.save(update_fields=['attempts', 'checked_at', 'last_error', 'status'])
+        # 일시적인 네트워크 오류는 작업 큐가 재시도한다. 이미 받아 둔 표지는 그대로 둔다
+        if isinstance(e, requests.RequestException) and cover.status != CoverImage.STATUS_OK:
+            raise
+        return cover
+
+    cover.checked_at = now
+    cover.last_error = ''
+    if data is None:
+        # 304 Not Modified
+        cover.save(update_fields=['checked_at', 'last_error'])
+        return cover
+
+    first = cover.status != CoverImage.STATUS_OK
+    old_digest = cover.digest
+    cover.digest = _store(data)
+    cover.etag = response.headers.get('ETag', '')[:255]
+    cover.last_modified = response.headers.get('Last-Modified', '')[:64]
+    cover.status = CoverImage.STATUS_OK
+    cover.fetched_at = now
+    cover.save()
+    if old_digest != cover.digest:
+        _release(old_digest)
+        _invalidate_posts(url)
+    if first:
+        schedule_revalidate()
+    return cover
+
+
+def revalidate(older_than_days=None, limit=500):
+    """checked_at 이 오래된 표지를 조건부 요청으로 다시 확인. 확인한 수 반환."""
+    older_than_days = older_than_days or settings.COVER_REVALIDATE_DAYS
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    urls = list(
+        CoverImage.objects.filter(status=CoverImage.STATUS_OK, checked_at__lt=cutoff)
+        .order_by('checked_at').values_list('source_url', flat=True)[:limit]
+    )
+    for url in urls:
+        try:
+            fetch(url)
+        except requests.RequestException as e:
+            print(f"Cover revalidation failed for {url}: {e!r}")
+    return len(urls)
@@ -0,0 +1,58 @@
+# ============================
+# core/db_routers.py
+# 읽기 전용 뷰의 조회를 읽기 연결(DATABASES['replica'])로 보내는 라우터
+# ============================
+# @read_replica 가 붙은 뷰가 실행되는 동안에만 읽기를 replica 로 보낸다. 그 밖의 읽기와 모든 쓰기,
+# 세션 조회는 default 로 간다 (방금 로그인한 세션이 복제 지연으로 안 보이는 일을 막기 위해).
+# SQLite 프로필에서는 같은 파일을 query_only 연결로 여는 것이고, PostgreSQL 이면 실제 복제본을 가리킨다.
+# 라우터/뷰 코드는 어느 쪽이든 같다.
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+REPLICA = 'replica'
+
+_use_replica = ContextVar('use_replica', default=False)
+
+# 읽기 전용 뷰 안에서도 항상 default 에서 읽는 앱
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+def read_replica(view):
+    """이 뷰 안의 조회(세션 제외)를 replica 로 보낸다. 쓰기가 없는 뷰에만 붙인다."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            token = _use_replica.set(True)
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+    else:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            token = _use_replica.set(True)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and REPLICA in settings.DATABASES and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            return REPLICA
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 두 별칭은 같은 데이터
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,171 @@
+# ============================
+# core/exporters.py
+# 게시물 스트리밍 내보내기 (CSV / NDJSON)
+# ============================
+# 게시물을 최신순(created_at, id 내림차순)으로 chunk 단위(iterator)로 읽어 한 줄씩 내보내므로 전체를 메모리에 올리지 않는다.
+# 컬럼과 순서는 예전 data/posts.csv 와 같다 (읽는 쪽이 이 형식에 기대고 있음).
+# 파일 내보내기는 임시 파일에 쓴 뒤 os.replace 로 바꿔치기해서, 읽는 쪽이 반쯤 쓰인 파일을 보지 않는다.
+# 파일 옆 '<파일>.hwm' 에 마지막으로 내보낸 id(high-water mark)와 맨 위 행을 남겨, 다음에는 새 게시물만 DB 에서 읽어
+# 헤더 바로 아래에 끼워 넣는다. 새 게시물 중 맨 위 행보다 오래된 것이 있으면(가져오기 등) 순서를 지키려고 전체를 다시 쓴다.
+# 덧붙이기는 새 게시물만 반영한다. 수정/삭제까지 반영하려면 전체를 다시 내보낸다.
+import csv
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from .models import Post
+
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+
+COLUMNS = ["id", "created_at", "user_id", "nickname", "text", "user_photo",
+           "book_title", "book_author", "book_cover_url_snapshot", "like_count", "repost_count"]
+
+# 같은 프로세스의 워커 스레드들이 한 파일을 동시에 바꿔치기하지 않도록
+_write_lock = threading.Lock()
+
+_FIELDS = ('id', 'created_at', 'user_id', 'user__profile__nickname', 'text', 'user_photo',
+           'book__title', 'book__author', 'book_cover_url_snapshot', 'like_count', 'repost_count')
+
+
+def _posts(since_id=None):
+    posts = Post.objects.filter(deleted_at__isnull=True)
+    if since_id:
+        posts = posts.filter(id__gt=since_id)
+    return posts
+
+
+def iter_posts(since_id=None):
+    """최신순으로 게시물 dict 를 하나씩. since_id 보다 id 가 큰 것만."""
+    posts = _posts(since_id).order_by('-created_at', '-id')
+    # values_list: 모델 인스턴스를 만들지 않고 조인된 컬럼만 읽는다
+    for values in posts.values_list(*_FIELDS).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+        row = dict(zip(COLUMNS, values))
+        row['user_photo'] = default_storage.url(row['user_photo']) if row['user_photo'] else ""
+        yield row
+
+
+class _LineBuffer:
+    """csv.writer 가 쓴 한 줄을 그대로 돌려주는 가짜 파일."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(posts, header=True):
+    writer = csv.writer(_LineBuffer())
+    if header:
+        yield writer.writerow(COLUMNS)
+    for row in posts:
+        row['created_at'] = row['created_at'].strftime("%Y-%m-%d %H:%M:%S")
+        yield writer.writerow([row[col] if row[col] is not None else "" for col in COLUMNS])
+
+
+def iter_ndjson(posts):
+    for row in posts:
+        row['created_at'] = row['created_at'].isoformat()
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def stream(fmt='csv', since_id=None, header=True):
+    """내보낼 내용을 문자열 조각으로 하나씩 (StreamingHttpResponse / 파일 쓰기용)."""
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown export format: {fmt}')
+    posts = iter_posts(since_id)
+    return iter_csv(posts, header=header) if fmt == 'csv' else iter_ndjson(posts)
+
+
+# -----------------------------
+# 파일 내보내기
+# -----------------------------
+def _hwm_path(path):
+    return path + '.hwm'
+
+
+def _read_hwm(path, fmt):
+    """덧붙여도 되는 상태면 기록된 high-water mark, 아니면 None."""
+    try:
+        with open(_hwm_path(path), encoding='utf-8') as f:
+            hwm = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # 형식/컬럼이 바뀌었거나 파일이 기록 이후 바뀌었으면 처음부터 다시 쓴다
+    if hwm.get('format') != fmt or hwm.get('columns') != COLUMNS or 'newest' not in hwm:
+        return None
+    if not os.path.exists(path) or os.path.getsize(path) != hwm.get('size'):
+        return None
+    # 맨 위 행보다 오래된 새 게시물이 있으면 위에 끼워 넣을 수 없다
+    if hwm['newest'] and _posts(hwm['last_id']).filter(created_at__lt=datetime.fromisoformat(hwm['newest'])).exists():
+        return None
+    return hwm
+
+
+def _atomic_write_json(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tmp-')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def export_to_file(path, fmt='csv', incremental=False):
+    """게시물을 path 에 내보낸다. incremental 이면 지난번 이후 새 게시물만 덧붙인다.
+
+    (이번에 쓴 행 수, 덧붙였는지 여부) 반환.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown export format: {fmt}')
+    with _write_lock:
+        return _export_to_file(path, fmt, incremental)
+
+
+def _export_to_file(path, fmt, incremental):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    hwm = _read_hwm(path, fmt) if incremental else None
+    last_id = hwm['last_id'] if hwm else None
+    newest = hwm['newest'] if hwm else None
+    written = 0
+
+    def tracked(posts):
+        nonlocal last_id, newest, written
+        for row in posts:
+            last_id = max(last_id or 0, row['id'])
+            if written == 0:
+                # 최신순이므로 이번에 쓴 첫 행이 파일의 맨 위 행
+                newest = row['created_at'].isoformat()
+            written += 1
+            yield row
+
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as out:
+            if hwm and fmt == 'csv':
+                out.writelines(iter_csv([]))  # 헤더만
+            posts = tracked(iter_posts(since_id=last_id))
+            chunks = iter_csv(posts, header=not hwm) if fmt == 'csv' else iter_ndjson(posts)
+            for chunk in chunks:
+                out.write(chunk)
+            if hwm:
+                # 기존 행은 새 행 아래로 그대로 복사한다 (DB 에서는 새 행만 읽음)
+                with open(path, encoding='utf-8', newline='') as existing:
+                    if fmt == 'csv':
+                        existing.readline()
+                    shutil.copyfileobj(existing, out)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    _atomic_write_json(_hwm_path(path), {
+        'format': fmt,
+        'columns': COLUMNS,
+        'last_id': last_id,
+        'newest': newest,
+        'size': os.path.getsize(path),
+    })
+    return written, bool(hwm)
@@ -0,0 +1,95 @@
+# ============================
+# core/fragments.py
+# 피드 카드의 공유 가능한 HTML 조각 캐시
+# ============================
+# 카드 중 보는 사람과 무관한 부분(작성자/사진/본문, 댓글 미리보기)만 게시물 단위로 캐시하고,
+# 좋아요·리포스트 상태나 CSRF 폼처럼 사용자별로 다른 부분은 매 요청 _post_card.html 에서 덧입힌다.
+# 카운트는 캐시 밖에 두므로 좋아요/리포스트 토글은 조각을 무효화할 필요가 없다.
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+# 조각 템플릿 구조가 바뀌면 올려서 이전 조각을 한꺼번에 버린다
+FRAGMENT_VERSION = 2
+
+STATS_HITS_KEY = 'post_fragment:stats:hits'
+STATS_MISSES_KEY = 'post_fragment:stats:misses'
+
+
+def _cache():
+    return caches[settings.FRAGMENT_CACHE_ALIAS]
+
+
+def fragment_key(post_id):
+    return f'post_fragment:v{FRAGMENT_VERSION}:{post_id}'
+
+
+def _render(post):
+    return {
+        'content': render_to_string('_post_fragment.html', {'post': post}),
+        'comments': render_to_string('_post_comments_preview.html', {'post': post}),
+        'comments_embedded': getattr(post, 'comments_embedded', False),
+    }
+
+
+def attach(posts, prepare_misses=None):
+    """각 post 에 post.fragment 를 붙인다. 캐시에 없는 게시물만 렌더링해 저장.
+
+    prepare_misses(posts) 는 렌더링 직전 미스 게시물에만 호출된다 (예: 댓글 미리보기 일괄 조회).
+    """
+    if not posts:
+        return
+    cache = _cache()
+    keys = {post.id: fragment_key(post.id) for post in posts}
+    found = cache.get_many(list(keys.values()))
+    misses = [post for post in posts if keys[post.id] not in found]
+    if misses:
+        if prepare_misses:
+            prepare_misses(misses)
+        rendered = {keys[post.id]: _render(post) for post in misses}
+        cache.set_many(rendered, settings.FRAGMENT_CACHE_TIMEOUT)
+        found.update(rendered)
+    for post in posts:
+        fragment = found[keys[post.id]]
+        post.fragment = {
+            'content': mark_safe(fragment['content']),
+            'comments': mark_safe(fragment['comments']),
+            'comments_embedded': fragment['comments_embedded'],
+        }
+    _record_stats(hits=len(posts) - len(misses), misses=len(misses))
+
+
+def invalidate(*post_ids):
+    _cache().delete_many([fragment_key(post_id) for post_id in post_ids])
+
+
+def _record_stats(hits, misses):
+    cache = _cache()
+    for key, n in ((STATS_HITS_KEY, hits), (STATS_MISSES_KEY, misses)):
+        if not n:
+            continue
+        if not cache.add(key, n, timeout=None):
+            try:
+                cache.incr(key, n)
+            except ValueError:
+                # 그 사이 축출됨
+                cache.set(key, n, timeout=None)
+
+
+def stats():
+    """누적 히트/미스와 히트율. 캐시 크기 산정용."""
+    values = _cache().get_many([STATS_HITS_KEY, STATS_MISSES_KEY])
+    hits = values.get(STATS_HITS_KEY, 0)
+    misses = values.get(STATS_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+        'backend': settings.CACHES[settings.FRAGMENT_CACHE_ALIAS]['BACKEND'],
+    }
+
+
+def reset_stats():
+    _cache().delete_many([STATS_HITS_KEY, STATS_MISSES_KEY])
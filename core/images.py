@@ -0,0 +1,187 @@
+# ============================
+# core/images.py
+# 업로드 이미지 정규화 + 반응형 파생본(WebP/JPEG) 생성
+# ============================
+# 업로드 시: 방향 보정 후 EXIF 제거, 용량/해상도 상한 검사, 긴 변 IMAGE_MAX_DIMENSION 으로 축소해 JPEG 로 저장.
+# 저장 후: 용도별 크기(avatar/card/full)로 줄인 WebP·JPEG 파생본을 variants/ 아래 만든다.
+# AVIF 는 pillow-avif-plugin 이 설치되어 있을 때만 추가로 만든다.
+# 만든 형식은 이미지 필드 옆 '<필드>_variants' 컬럼에 남겨, 렌더링할 때 파일 시스템을 확인하지 않는다.
+import io
+import os
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import LazyObject
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+try:
+    import pillow_avif  # type: ignore  # noqa: F401
+except ImportError:
+    pillow_avif = None
+
+# 이름: (긴 변 픽셀, 정사각형 크롭 여부)
+VARIANT_SPECS = {
+    'avatar': (96, True),
+    'card': (600, False),
+    'full': (1200, False),
+}
+
+# upload_to 디렉터리별로 만들 파생본
+FIELD_VARIANTS = {
+    'post_photos': ('card', 'full'),
+    'profile_pics': ('avatar', 'card'),
+}
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+if 'AVIF' in Image.SAVE:
+    FORMATS['avif'] = ('AVIF', {'quality': 60})
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg', 'avif': 'avif'}
+
+
+class VariantStorage(LazyObject):
+    def _setup(self):
+        self._wrapped = FileSystemStorage(
+            location=os.path.join(settings.MEDIA_ROOT, 'variants'),
+            base_url=settings.MEDIA_URL + 'variants/',
+        )
+
+
+variant_storage = VariantStorage()
+
+
+def _open(file):
+    try:
+        # open 은 헤더만 읽으므로 픽셀을 디코딩하기 전에 크기를 검사할 수 있다
+        img = Image.open(file)
+        if img.width * img.height > settings.IMAGE_MAX_PIXELS:
+            raise ValidationError(f'이미지 해상도가 너무 큽니다 ({img.width}x{img.height}).')
+        img.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ValidationError(f'이미지를 읽을 수 없습니다: {e}') from e
+    # EXIF Orientation 을 픽셀에 반영 (이후 EXIF 는 저장하지 않음)
+    return ImageOps.exif_transpose(img)
+
+
+def _to_rgb(img):
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img.convert('RGBA'), mask=img.convert('RGBA').split()[-1])
+        return background
+    return img.convert('RGB')
+
+
+def normalize_upload(file):
+    """업로드 파일을 검사·정리해 새 ContentFile 로 반환. 문제가 있으면 ValidationError."""
+    if file.size > settings.IMAGE_UPLOAD_MAX_BYTES:
+        raise ValidationError(f'이미지는 {settings.IMAGE_UPLOAD_MAX_BYTES // (1024 * 1024)}MB 이하만 올릴 수 있습니다.')
+    img = _to_rgb(_open(file))
+    img.thumbnail((settings.IMAGE_MAX_DIMENSION, settings.IMAGE_MAX_DIMENSION), Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, format='JPEG', quality=90, optimize=True)
+    return ContentFile(buf.getvalue(), name=f'{uuid.uuid4().hex}.jpg')
+
+
+def _variant_names(source_name):
+    return FIELD_VARIANTS.get(source_name.split('/', 1)[0], ('card', 'full'))
+
+
+def variant_name(source_name, variant, fmt):
+    stem = os.path.splitext(source_name)[0]
+    return f'{stem}/{variant}.{EXTENSIONS[fmt]}'
+
+
+def _formats_field(field_file):
+    """파생본 형식을 기록하는 컬럼 이름 (Post.user_photo_variants 등). 없으면 None."""
+    name = f'{field_file.field.name}_variants'
+    try:
+        field_file.instance._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return name
+
+
+def available_formats(field_file):
+    """기록된 파생본 형식 목록. 모델 값만 읽는다 (파일 시스템 접근 없음)."""
+    field = _formats_field(field_file)
+    value = getattr(field_file.instance, field, '') if field else ''
+    return [fmt for fmt in value.split(',') if fmt in FORMATS]
+
+
+def variant_url(field_file, variant, fmt='jpeg'):
+    """파생본 URL. 아직 없으면 None."""
+    if fmt not in available_formats(field_file) or variant not in _variant_names(field_file.name):
+        return None
+    return variant_storage.url(variant_name(field_file.name, variant, fmt))
+
+
+def srcset(field_file, fmt='jpeg'):
+    """'<url> 600w, <url> 1200w' 형태. 파생본이 없으면 빈 문자열."""
+    if fmt not in available_formats(field_file):
+        return ''
+    return ', '.join(
+        f'{variant_storage.url(variant_name(field_file.name, variant, fmt))} {VARIANT_SPECS[variant][0]}w'
+        for variant in _variant_names(field_file.name)
+    )
+
+
+def has_variants(field_file):
+    """파일 시스템 기준으로 파생본이 있는지 (작업 경로용)."""
+    first = _variant_names(field_file.name)[0]
+    return variant_storage.exists(variant_name(field_file.name, first, 'jpeg'))
+
+
+def _record_formats(field_file):
+    """실제로 있는 파생본 형식을 같은 파일을 가리키는 모든 행에 기록. 기록한 값 반환."""
+    first = _variant_names(field_file.name)[0]
+    value = ','.join(fmt for fmt in FORMATS if variant_storage.exists(variant_name(field_file.name, first, fmt)))
+    field = _formats_field(field_file)
+    if field:
+        # 내용 주소 스토리지에서는 여러 행이 한 파일(과 그 파생본)을 공유한다
+        model = type(field_file.instance)
+        model._base_manager.filter(**{field_file.field.name: field_file.name}).update(**{field: value})
+        setattr(field_file.instance, field, value)
+    return value
+
+
+def generate_variants(field_file, force=False):
+    """field_file 의 파생본을 모두 만들고 형식을 기록한다. 만든 파일 수 반환."""
+    if not field_file:
+        return 0
+    if not force and has_variants(field_file):
+        _record_formats(field_file)
+        return 0
+    with field_file.open('rb') as f:
+        source = _to_rgb(_open(f))
+    created = 0
+    for variant in _variant_names(field_file.name):
+        size, crop = VARIANT_SPECS[variant]
+        if crop:
+            img = ImageOps.fit(source, (size, size), Image.LANCZOS)
+        else:
+            img = source.copy()
+            img.thumbnail((size, size), Image.LANCZOS)
+        for fmt, (pil_format, options) in FORMATS.items():
+            buf = io.BytesIO()
+            img.save(buf, format=pil_format, **options)
+            name = variant_name(field_file.name, variant, fmt)
+            if variant_storage.exists(name):
+                variant_storage.delete(name)
+            variant_storage.save(name, ContentFile(buf.getvalue()))
+            created += 1
+    _record_formats(field_file)
+    return created
+
+
+def delete_variants(source_name):
+    for variant in _variant_names(source_name):
+        for fmt in FORMATS:
+            name = variant_name(source_name, variant, fmt)
+            if variant_storage.exists(name):
+                variant_storage.delete(name)
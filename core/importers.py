@@ -0,0 +1,216 @@
+# ============================
+# core/importers.py
+# 독서 기록 가져오기 (Goodreads CSV, 우리 CSV / NDJSON 내보내기 형식)
+# ============================
+# 파일을 한 행씩 읽어(전체를 메모리에 올리지 않음) IMPORT_BATCH_SIZE 행 단위로 반영한다.
+# 한 묶음은 트랜잭션 하나: 책 일괄 식별(core/books.py) -> 게시물 bulk_create -> ImportRun.rows_done 전진.
+# 진행 상황이 게시물과 같이 커밋되므로, 중간에 죽어도 다시 돌리면 rows_done 다음 행부터 정확히 이어 간다.
+# rows_done 은 "내가 읽은 위치와 같을 때만" 올리므로, 같은 가져오기를 두 워커가 동시에 돌려도 한쪽만 반영된다.
+# IMPORT_DIR 에 올라온 파일은 가져오기가 끝나거나 실패하면 지운다 (실패한 가져오기는 같은 파일을 다시 올리면 이어 간다).
+# 명령(manage.py import_readlog)으로 넘긴 사용자 파일은 지우지 않는다.
+import csv
+import hashlib
+import html
+import io
+import json
+import os
+import re
+from datetime import datetime, timezone as dt_timezone
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import services
+from .models import ImportRun
+
+FORMATS = ('goodreads', 'csv', 'ndjson')
+
+GOODREADS_DATE_FORMATS = ('%Y/%m/%d', '%Y-%m-%d')
+# 아직 읽지 않은 책 (독서 기록이 아니므로 게시물로 만들지 않는다)
+GOODREADS_SKIP_SHELVES = {'to-read'}
+
+
+# -----------------------------
+# 파일 형식
+# -----------------------------
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _open_text(path):
+    # 엑셀에서 저장한 CSV 의 BOM 을 벗긴다
+    return open(path, encoding='utf-8-sig', newline='')
+
+
+def detect_format(path):
+    """파일 앞부분을 보고 형식을 고른다. 알 수 없으면 ValueError."""
+    with _open_text(path) as f:
+        head = f.read(4096)
+    if head.lstrip().startswith('{'):
+        return 'ndjson'
+    header = next(csv.reader(io.StringIO(head)), [])
+    if 'Exclusive Shelf' in header or 'Book Id' in header:
+        return 'goodreads'
+    if 'book_title' in header and 'text' in header:
+        return 'csv'
+    raise ValueError('지원하지 않는 파일 형식입니다. (Goodreads CSV, ReadLog CSV / NDJSON)')
+
+
+# -----------------------------
+# 행 -> 게시물 내용
+# -----------------------------
+def _aware(value):
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def _goodreads_isbn(raw):
+    # Goodreads 는 엑셀이 숫자로 바꾸지 않도록 ="9780316769174" 로 감싼다
+    return (raw or '').strip().lstrip('=').strip('"') or None
+
+
+def _goodreads_date(raw):
+    for fmt in GOODREADS_DATE_FORMATS:
+        try:
+            return datetime.strptime(raw.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _goodreads_entry(row):
+    if row.get('Exclusive Shelf') in GOODREADS_SKIP_SHELVES:
+        return None
+    authors = [row.get('Author') or ''] + (row.get('Additional Authors') or '').split(',')
+    read_at = _goodreads_date(row.get('Date Read') or '') or _goodreads_date(row.get('Date Added') or '')
+    review = html.unescape(re.sub(r'<br\s*/?>', '\n', row.get('My Review') or '')).strip()
+    return {
+        'title': (row.get('Title') or '').strip(),
+        'author': ', '.join(a.strip() for a in authors if a.strip()),
+        'isbn': _goodreads_isbn(row.get('ISBN13')) or _goodreads_isbn(row.get('ISBN')),
+        'cover_url': None,
+        'text': review or None,
+        'created_at': _aware(read_at) if read_at else None,
+    }
+
+
+def _readlog_entry(row, parse_date):
+    created_at = row.get('created_at')
+    return {
+        'title': (row.get('book_title') or '').strip(),
+        'author': (row.get('book_author') or '').strip(),
+        'isbn': None,
+        'cover_url': row.get('book_cover_url_snapshot') or None,
+        'text': row.get('text') or None,
+        'created_at': _aware(parse_date(created_at)) if created_at else None,
+    }
+
+
+def _ndjson_entry(line):
+    return _readlog_entry(json.loads(line), datetime.fromisoformat) if line.strip() else None
+
+
+def _parse_csv_date(value):
+    # exporters.iter_csv 가 쓰는 형식. 시간대 표시 없이 UTC 로 쓴다 (TIME_ZONE 으로 읽으면 9시간 어긋난다)
+    return datetime.strptime(value, '%Y-%m-%d %H:%M:%S').replace(tzinfo=dt_timezone.utc)
+
+
+def iter_entries(f, fmt):
+    """열린 텍스트 파일에서 행마다 게시물 내용 dict 하나씩. 가져오지 않을 행은 None (행 번호를 맞추기 위해)."""
+    if fmt == 'ndjson':
+        rows, parse = f, _ndjson_entry
+    elif fmt == 'csv':
+        rows, parse = csv.DictReader(f), partial(_readlog_entry, parse_date=_parse_csv_date)
+    elif fmt == 'goodreads':
+        rows, parse = csv.DictReader(f), _goodreads_entry
+    else:
+        raise ValueError(f'unknown import format: {fmt}')
+    for row in rows:
+        try:
+            entry = parse(row)
+        except (ValueError, TypeError, AttributeError):
+            # 깨진 JSON 행, 날짜 형식이 다른 행 등은 건너뛴다
+            entry = None
+        if entry and not entry['title'] and not entry['text']:
+            entry = None
+        yield entry
+
+
+# -----------------------------
+# 실행
+# -----------------------------
+def discard_upload(path):
+    """IMPORT_DIR 에 올라온 파일이면 지운다."""
+    if not path or os.path.dirname(os.path.realpath(path)) != os.path.realpath(settings.IMPORT_DIR):
+        return
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def start(user_id, path, source_name=None, fmt=None):
+    """가져오기를 만든다. 같은 사용자가 같은 내용의 파일로 끝내지 못한 가져오기가 있으면 그것을 돌려준다."""
+    fmt = fmt or detect_format(path)
+    digest = file_digest(path)
+    unfinished = ImportRun.objects.filter(user_id=user_id, digest=digest, format=fmt) \
+        .exclude(status=ImportRun.STATUS_DONE).order_by('-id').first()
+    if unfinished:
+        if unfinished.path != path:
+            old_path, unfinished.path = unfinished.path, path
+            unfinished.save(update_fields=['path', 'updated_at'])
+            # 이전에 올린 같은 내용의 파일은 더 이상 가리키는 곳이 없다
+            discard_upload(old_path)
+        return unfinished
+    return ImportRun.objects.create(
+        user_id=user_id, source_name=source_name or os.path.basename(path), path=path, digest=digest, format=fmt,
+    )
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def run(import_run, batch_size=None, log=None):
+    """import_run.rows_done 다음 행부터 끝까지 반영. 다른 실행이 먼저 전진시켰으면 멈춘다. 갱신된 ImportRun 반환."""
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    ImportRun.objects.filter(id=import_run.id).update(status=ImportRun.STATUS_RUNNING, last_error='')
+    offset = import_run.rows_done
+    try:
+        with _open_text(import_run.path) as f:
+            for chunk in _chunks(islice(iter_entries(f, import_run.format), offset, None), batch_size):
+                entries = [entry for entry in chunk if entry]
+                with transaction.atomic():
+                    created = len(services.import_posts(import_run.user_id, entries)) if entries else 0
+                    advanced = ImportRun.objects.filter(id=import_run.id, rows_done=offset).update(
+                        rows_done=offset + len(chunk),
+                        posts_created=F('posts_created') + created,
+                        rows_skipped=F('rows_skipped') + len(chunk) - len(entries),
+                        updated_at=timezone.now(),
+                    )
+                    if not advanced:
+                        # 다른 실행이 이 구간을 이미 반영했다
+                        transaction.set_rollback(True)
+                        break
+                offset += len(chunk)
+                if log:
+                    log(f'{offset} rows')
+            else:
+                ImportRun.objects.filter(id=import_run.id).update(
+                    status=ImportRun.STATUS_DONE, finished_at=timezone.now(),
+                )
+                discard_upload(import_run.path)
+    except (OSError, ValueError, csv.Error) as e:
+        ImportRun.objects.filter(id=import_run.id).update(status=ImportRun.STATUS_FAILED, last_error=str(e)[:1000])
+        discard_upload(import_run.path)
+    import_run.refresh_from_db()
+    return import_run
@@ -0,0 +1,211 @@
+# ============================
+# core/instrumentation.py
+# 요청 단위 성능 계측: 쿼리 수/DB 시간/중복 쿼리(N+1), 외부 HTTP, 템플릿 렌더링
+# ============================
+# collect() 가 연 구간 동안의 측정값을 contextvar 에 모은다. 미들웨어는 요청마다 collect() 를 열고
+# 결과를 Server-Timing 헤더와 'readlog.perf' 로거의 JSON 한 줄로 내보낸다.
+# DB 쿼리는 모든 연결에 건 execute_wrapper 로, 외부 HTTP 와 템플릿은 span() 으로 잰다.
+# contextvar 는 sync_to_async / asyncio.to_thread 로 넘어간 스레드에도 복사되므로 그쪽 쿼리도 잡힌다.
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template.backends.django import DjangoTemplates
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger('readlog.perf')
+
+_current = ContextVar('request_metrics', default=None)
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+def fingerprint(sql):
+    """파라미터 자리만 다른 쿼리를 같은 것으로 본다 (IN 목록 길이도 무시)."""
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+class RequestMetrics:
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.fingerprints = Counter()
+        self.span_time = defaultdict(float)
+        self.span_count = Counter()
+        self._lock = threading.Lock()
+
+    def record_query(self, sql, duration):
+        with self._lock:
+            self.queries += 1
+            self.db_time += duration
+            self.fingerprints[fingerprint(sql)] += 1
+        if self.parent:
+            self.parent.record_query(sql, duration)
+
+    def record_span(self, name, duration):
+        with self._lock:
+            self.span_time[name] += duration
+            self.span_count[name] += 1
+        if self.parent:
+            self.parent.record_span(name, duration)
+
+    def duplicates(self, min_count=2):
+        """같은 모양으로 min_count 번 이상 실행된 쿼리 (많은 순)."""
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n >= min_count]
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        parts = [f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"']
+        for name in sorted(self.span_time):
+            parts.append(f'{name};dur={self.span_time[name] * 1000:.1f};desc="{self.span_count[name]} calls"')
+        parts.append(f'total;dur={self.total_time * 1000:.1f}')
+        return ', '.join(parts)
+
+    def as_dict(self):
+        return {
+            'total_ms': round(self.total_time * 1000, 1),
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 1),
+            'duplicate_queries': [
+                {'sql': sql[:200], 'count': n}
+                for sql, n in self.duplicates(settings.INSTRUMENTATION_DUPLICATE_THRESHOLD)[:5]
+            ],
+            **{f'{name}_ms': round(t * 1000, 1) for name, t in self.span_time.items()},
+            **{f'{name}_calls': n for name, n in self.span_count.items()},
+        }
+
+
+@contextmanager
+def collect():
+    """이 구간의 측정값을 모은다. 바깥 구간이 있으면 그쪽에도 함께 더한다."""
+    metrics = RequestMetrics(parent=_current.get())
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name):
+    """외부 HTTP, 템플릿 렌더링 등 구간 시간 측정. 측정 중이 아니면 아무 일도 하지 않는다."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record_span(name, time.perf_counter() - started)
+
+
+# -----------------------------
+# DB 쿼리
+# -----------------------------
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - started)
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """connection_created 시그널 핸들러. 모든 연결(스레드/별칭)에 한 번씩 건다."""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+# -----------------------------
+# 템플릿
+# -----------------------------
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        with span('template'):
+            return self.template.render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """렌더링 시간을 재는 DjangoTemplates 백엔드 (include 는 바깥 템플릿 시간에 포함)."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+# -----------------------------
+# 미들웨어
+# -----------------------------
+def _finish(request, response, metrics):
+    response['Server-Timing'] = metrics.server_timing()
+    record = {'method': request.method, 'path': request.path, 'status': response.status_code, **metrics.as_dict()}
+    noisy = record['duplicate_queries'] or metrics.queries > settings.INSTRUMENTATION_QUERY_WARNING
+    logger.log(logging.WARNING if noisy else logging.INFO, json.dumps(record, ensure_ascii=False))
+
+
+@sync_and_async_middleware
+def instrumentation_middleware(get_response):
+    if not settings.INSTRUMENTATION_ENABLED:
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with collect() as metrics:
+                response = await get_response(request)
+            _finish(request, response, metrics)
+            return response
+    else:
+        def middleware(request):
+            with collect() as metrics:
+                response = get_response(request)
+            _finish(request, response, metrics)
+            return response
+    return middleware
+
+
+# -----------------------------
+# 테스트 도우미
+# -----------------------------
+@contextmanager
+def query_budget(max_queries, max_duplicates=None):
+    """구간 안의 쿼리 수가 예산을 넘으면 AssertionError. 중복 쿼리(N+1) 상한도 줄 수 있다.
+
+        with query_budget(10, max_duplicates=2):
+            client.get('/')
+    """
+    with collect() as metrics:
+        yield metrics
+    problems = []
+    if metrics.queries > max_queries:
+        problems.append(f'{metrics.queries} queries exceed the budget of {max_queries}')
+    repeated = metrics.duplicates(min_count=(max_duplicates or 0) + 1) if max_duplicates is not None else []
+    if repeated:
+        problems.append(f'queries repeated more than {max_duplicates} times')
+    if problems:
+        detail = '\n'.join(f'  {n}x {sql}' for sql, n in metrics.fingerprints.most_common(10))
+        raise AssertionError('; '.join(problems) + '\n' + detail)
@@ -0,0 +1,176 @@
+# ============================
+# core/jobs.py
+# DB 기반 경량 작업 큐
+# ============================
+# 요청 경로에서는 enqueue() 로 커밋 직후 jobs 테이블에 한 줄만 남기고, 실제 작업은 `manage.py runworker` 가 처리한다.
+# 워커는 가져간 작업을 locked_until 까지 점유한다. 그 안에 끝내지 못하고 죽으면 다른 워커가 다시 가져간다 (visibility timeout).
+# 실패하면 지수 백오프로 다시 시도하고, max_attempts 를 넘기면 failed 로 남긴다.
+# 같은 작업이 두 번 실행될 수 있으므로 핸들러는 멱등이어야 한다.
+# JOBS_EAGER 가 켜져 있으면 워커 없이 커밋 직후 같은 프로세스에서 바로 실행한다 (개발/테스트용).
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+_registry = {}
+_non_atomic = set()
+
+
+def register(name, atomic=True):
+    """작업 핸들러 등록 데코레이터. 핸들러는 payload 를 키워드 인자로 받는다.
+
+    atomic=False 면 작업 전체를 트랜잭션 하나로 묶지 않는다. 스스로 나눠 커밋하고,
+    중간에 실패해도 다시 돌리면 이어서 하는 핸들러(가져오기, 물리 삭제)나
+    오래 걸리는 핸들러(원격 요청, 이미지 처리, 전체 스캔)용. 쓰기 잠금을 작업 내내 쥐지 않는다.
+    """
+    def decorator(func):
+        _registry[name] = func
+        if not atomic:
+            _non_atomic.add(name)
+        return func
+    return decorator
+
+
+# -----------------------------
+# 적재
+# -----------------------------
+def enqueue(name, payload=None, key=None, delay=0, max_attempts=None):
+    """현재 트랜잭션이 커밋되면 작업을 적재한다.
+
+    key 가 같은 작업이 이미 대기 중이면 새로 넣지 않는다 (CSV 내보내기처럼 한 번만 돌면 되는 작업).
+    """
+    if name not in _registry:
+        raise ValueError(f'unknown job: {name}')
+    fields = {
+        'name': name,
+        'payload': payload or {},
+        'key': key,
+        'max_attempts': max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    }
+
+    def _insert():
+        if settings.JOBS_EAGER:
+            now = timezone.now()
+            job = Job.objects.create(
+                status=Job.STATUS_RUNNING, attempts=1, run_at=now,
+                locked_until=now + timedelta(seconds=settings.JOBS_VISIBILITY_TIMEOUT), **fields,
+            )
+            run(job)
+            return
+        run_at = timezone.now() + timedelta(seconds=delay)
+        Job.objects.bulk_create([Job(run_at=run_at, **fields)], ignore_conflicts=True)
+
+    transaction.on_commit(_insert)
+
+
+# -----------------------------
+# 점유 / 실행
+# -----------------------------
+def _claimable(now):
+    # 대기 중이고 실행 시각이 된 작업 + 점유가 만료된(워커가 죽은) 작업
+    return Q(status=Job.STATUS_QUEUED, run_at__lte=now) | Q(status=Job.STATUS_RUNNING, locked_until__lt=now)
+
+
+def claim(limit, visibility_timeout=None):
+    """실행할 작업을 최대 limit 개 점유해 반환."""
+    visibility_timeout = visibility_timeout or settings.JOBS_VISIBILITY_TIMEOUT
+    now = timezone.now()
+    candidates = list(
+        Job.objects.filter(_claimable(now)).order_by('run_at', 'id').values_list('id', flat=True)[:limit]
+    )
+    claimed = []
+    for job_id in candidates:
+        # 조건부 UPDATE 로 점유: 다른 워커가 먼저 가져갔으면 0 행
+        updated = Job.objects.filter(_claimable(now), id=job_id).update(
+            status=Job.STATUS_RUNNING,
+            locked_until=now + timedelta(seconds=visibility_timeout),
+            attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(job_id)
+    return list(Job.objects.filter(id__in=claimed).order_by('run_at', 'id'))
+
+
+def run(job):
+    """점유한 작업 하나를 실행. 성공하면 행을 지우고 True."""
+    try:
+        handler = _registry[job.name]
+        if job.name in _non_atomic:
+            handler(**job.payload)
+        else:
+            # 작업 단위 트랜잭션: 실패하면 부분 반영 없이 재시도된다
+            with transaction.atomic():
+                handler(**job.payload)
+    except Exception:
+        _retry_or_fail(job, traceback.format_exc())
+        return False
+    Job.objects.filter(id=job.id).delete()
+    return True
+
+
+def backoff(attempts):
+    return min(settings.JOBS_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.JOBS_RETRY_MAX_DELAY)
+
+
+def _retry_or_fail(job, error):
+    print(f"Job {job.id} ({job.name}) failed on attempt {job.attempts}: {error.splitlines()[-1]}")
+    jobs = Job.objects.filter(id=job.id)
+    if job.attempts >= job.max_attempts:
+        jobs.update(status=Job.STATUS_FAILED, locked_until=None, last_error=error)
+        return
+    try:
+        with transaction.atomic():
+            jobs.update(
+                status=Job.STATUS_QUEUED,
+                run_at=timezone.now() + timedelta(seconds=backoff(job.attempts)),
+                locked_until=None,
+                last_error=error,
+            )
+    except IntegrityError:
+        # 같은 key 의 작업이 이미 대기 중이면 그쪽이 대신 처리한다
+        jobs.delete()
+
+
+# -----------------------------
+# 워커 루프
+# -----------------------------
+def _run_in_thread(job):
+    try:
+        return run(job)
+    finally:
+        # 스레드마다 생긴 DB 연결을 정리
+        connection.close()
+
+
+def work(concurrency=1, poll_interval=1.0, visibility_timeout=None, once=False, stop=None):
+    """스레드 concurrency 개로 작업을 처리한다. once 면 지금 실행 가능한 작업이 모두 끝나면 반환.
+
+    처리한 작업 수 반환. stop(threading.Event)이 설정되면 실행 중인 작업만 마치고 끝낸다.
+    """
+    stop = stop or threading.Event()
+    processed = 0
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='job') as pool:
+        while not stop.is_set():
+            close_old_connections()
+            free = concurrency - len(in_flight)
+            jobs = claim(free, visibility_timeout) if free else []
+            for job in jobs:
+                in_flight.add(pool.submit(_run_in_thread, job))
+            if not in_flight:
+                if once:
+                    break
+                stop.wait(poll_interval)
+                continue
+            done, in_flight = wait(in_flight, timeout=None if once else poll_interval, return_when=FIRST_COMPLETED)
+            processed += len(done)
+        done, _ = wait(in_flight)
+        processed += len(done)
+    return processed
@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core import timeline
+from core.models import Follow
+
+
+class Command(BaseCommand):
+    help = "팔로우 관계로부터 홈 타임라인(TimelineEntry)을 채운다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--follower', type=int, help='이 사용자의 타임라인만 채움')
+        parser.add_argument('--followee', type=int, help='이 사용자의 게시물만 채움')
+        parser.add_argument('--size', type=int, default=None, help='팔로우 관계당 채울 최근 게시물 수')
+
+    def handle(self, *args, **options):
+        follows = Follow.objects.all()
+        if options['follower']:
+            if not User.objects.filter(id=options['follower']).exists():
+                raise CommandError(f"User {options['follower']} does not exist")
+            follows = follows.filter(follower_id=options['follower'])
+        if options['followee']:
+            follows = follows.filter(followee_id=options['followee'])
+
+        total = 0
+        for follower_id, followee_id in follows.values_list('follower_id', 'followee_id').iterator():
+            total += timeline.backfill(follower_id, followee_id, size=options['size'])
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {total} timeline entries.'))
@@ -0,0 +1,45 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import bench
+
+
+class Command(BaseCommand):
+    help = "피드/프로필/댓글/알림/좋아요/팔로우 엔드포인트의 지연 시간(p50/p95/p99), 요청당 쿼리 수, 처리량을 잰다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', choices=bench.SCENARIOS, dest='scenarios',
+                            help='특정 시나리오만 (여러 번 지정 가능, 기본: 전체)')
+        parser.add_argument('--iterations', type=int, default=50, help='시나리오당 측정 요청 수')
+        parser.add_argument('--warmup', type=int, default=5, help='측정 전 버리는 요청 수')
+        parser.add_argument('--output', help='결과 JSON 경로 (기본: data/bench/<시각>.json)')
+        parser.add_argument('--compare', help='비교할 이전 결과 JSON')
+
+    def handle(self, *args, **options):
+        try:
+            result = bench.run(
+                scenarios=options['scenarios'] or bench.SCENARIOS,
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                log=self.stdout.write,
+            )
+        except (ValueError, RuntimeError) as e:
+            raise CommandError(str(e))
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'data', 'bench', timezone.now().strftime('%Y%m%d-%H%M%S') + '.json'
+        )
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                baseline = json.load(f)
+            for name, before, after, change, q_before, q_after in bench.compare(baseline, result):
+                self.stdout.write(f'{name}: p95 {before}ms -> {after}ms ({change:+}%), queries {q_before} -> {q_after}')
+        self.stdout.write(self.style.SUCCESS(f'Saved benchmark results to {output}.'))
@@ -0,0 +1,23 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from core import exporters
+
+
+class Command(BaseCommand):
+    help = "게시물을 CSV 또는 NDJSON 으로 내보낸다. --incremental 이면 지난번 이후 새 게시물만 덧붙인다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="출력 파일 경로 ('-' 이면 표준 출력)")
+        parser.add_argument('--format', choices=exporters.FORMATS, default='csv')
+        parser.add_argument('--incremental', action='store_true', help='high-water mark 이후 게시물만 덧붙임')
+
+    def handle(self, *args, **options):
+        if options['output'] == '-':
+            for chunk in exporters.stream(options['format']):
+                sys.stdout.write(chunk)
+            return
+        written, appended = exporters.export_to_file(options['output'], options['format'], incremental=options['incremental'])
+        action = 'Appended' if appended else 'Exported'
+        self.stdout.write(self.style.SUCCESS(f"{action} {written} posts to {options['output']}."))
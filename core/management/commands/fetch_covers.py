@@ -0,0 +1,41 @@
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import covers
+from core.models import CoverImage, Post
+
+
+class Command(BaseCommand):
+    help = "게시물 표지 URL 중 아직 받지 않은 것을 받아 두거나(--revalidate 이면) 오래된 표지를 조건부 요청으로 다시 확인한다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--revalidate', action='store_true', help='받아 둔 표지 중 오래된 것을 다시 확인')
+        parser.add_argument('--days', type=int, default=settings.COVER_REVALIDATE_DAYS,
+                            help='며칠 동안 확인하지 않은 표지를 다시 확인할지 (기본: COVER_REVALIDATE_DAYS)')
+        parser.add_argument('--retry-failed', action='store_true', help='실패로 남은 URL 도 다시 시도')
+
+    def handle(self, *args, **options):
+        if options['revalidate']:
+            checked = covers.revalidate(older_than_days=options['days'], limit=None)
+            self.stdout.write(self.style.SUCCESS(f'Revalidated {checked} covers.'))
+            return
+
+        skip = [CoverImage.STATUS_OK] if options['retry_failed'] else [CoverImage.STATUS_OK, CoverImage.STATUS_FAILED]
+        done = set(CoverImage.objects.filter(status__in=skip).values_list('url_hash', flat=True))
+        urls = Post.objects.exclude(book_cover_url_snapshot='').exclude(book_cover_url_snapshot__isnull=True) \
+            .values_list('book_cover_url_snapshot', flat=True).distinct()
+        fetched = failed = 0
+        for url in urls.iterator():
+            if covers.url_hash(url) in done or not covers.is_allowed(url):
+                continue
+            try:
+                cover = covers.fetch(url)
+            except requests.RequestException as e:
+                cover = None
+                self.stderr.write(f'{url}: {e}')
+            if cover and cover.status == CoverImage.STATUS_OK:
+                fetched += 1
+            else:
+                failed += 1
+        self.stdout.write(self.style.SUCCESS(f'Fetched {fetched} covers ({failed} failed).'))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import counters
+
+
+class Command(BaseCommand):
+    help = "CounterDelta 에 쌓인 좋아요/리포스트 증감을 Post 카운트에 합산한다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='종료하지 않고 주기적으로 반복')
+        parser.add_argument('--interval', type=float, default=2.0, help='--loop 반복 주기(초)')
+
+    def handle(self, *args, **options):
+        while True:
+            touched = counters.flush()
+            if touched or not options['loop']:
+                self.stdout.write(f'Flushed counters for {len(touched)} posts.')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
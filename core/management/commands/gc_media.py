@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import media_storage
+
+
+class Command(BaseCommand):
+    help = "참조 수를 다시 세고, 어떤 게시물/프로필도 가리키지 않는 업로드 파일과 파생본을 지운다. (--adopt-existing 이면 예전 파일명 업로드를 내용 주소로 옮김)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=settings.MEDIA_GC_GRACE_HOURS,
+                            help='참조가 0 이 된 뒤 이 시간이 지난 파일만 지움 (기본: MEDIA_GC_GRACE_HOURS)')
+        parser.add_argument('--adopt-existing', action='store_true', help='원래 파일명으로 저장된 업로드를 먼저 내용 주소로 옮김')
+        parser.add_argument('--dry-run', action='store_true', help='지울 파일 수와 용량만 출력')
+
+    def handle(self, *args, **options):
+        if options['adopt_existing']:
+            moved = media_storage.adopt_existing(dry_run=options['dry_run'])
+            self.stdout.write(self.style.SUCCESS(f'Moved {moved} uploads to content-addressed names.'))
+        removed, freed = media_storage.gc(grace_hours=options['grace_hours'], dry_run=options['dry_run'])
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {removed} files ({freed / 1024 / 1024:.1f} MB).'))
@@ -0,0 +1,34 @@
+from itertools import chain
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from core import fragments, images
+from core.models import Post, Profile
+
+
+class Command(BaseCommand):
+    help = "기존 게시물 사진/프로필 이미지의 반응형 파생본(WebP/JPEG)을 만들고 형식을 기록한다. 이미 있으면 기록만."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='이미 있는 파생본도 다시 만듦')
+
+    def handle(self, *args, **options):
+        created = failed = 0
+        posts = Post.objects.exclude(user_photo='').exclude(user_photo__isnull=True).only('id', 'user_photo')
+        profiles = Profile.objects.exclude(profile_image='').exclude(profile_image__isnull=True).only('id', 'profile_image')
+        targets = chain(
+            ((post, post.user_photo) for post in posts.iterator()),
+            ((profile, profile.profile_image) for profile in profiles.iterator()),
+        )
+        for obj, field_file in targets:
+            try:
+                n = images.generate_variants(field_file, force=options['force'])
+            except (ValidationError, FileNotFoundError) as e:
+                failed += 1
+                self.stderr.write(f'{field_file.name}: {e}')
+                continue
+            if isinstance(obj, Post):
+                fragments.invalidate(obj.id)
+            created += n
+        self.stdout.write(self.style.SUCCESS(f'Created {created} variant files ({failed} failed).'))
@@ -0,0 +1,35 @@
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core import importers
+
+
+class Command(BaseCommand):
+    help = "Goodreads CSV 또는 ReadLog 내보내기(CSV / NDJSON) 파일을 사용자의 게시물로 가져온다. 중단된 가져오기는 이어 간다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='가져올 파일')
+        parser.add_argument('--user', required=True, help='게시물을 쓸 사용자 (이메일 또는 id)')
+        parser.add_argument('--format', choices=importers.FORMATS, help='기본: 파일 내용으로 판단')
+        parser.add_argument('--batch-size', type=int, help='한 트랜잭션에 반영할 행 수 (기본: IMPORT_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(**({'id': options['user']} if options['user'].isdigit() else {'email': options['user']})).first()
+        if not user:
+            raise CommandError(f"사용자를 찾을 수 없습니다: {options['user']}")
+        path = os.path.abspath(options['path'])
+        try:
+            import_run = importers.start(user.id, path, fmt=options['format'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        if import_run.rows_done:
+            self.stdout.write(f'Resuming import #{import_run.id} after row {import_run.rows_done}.')
+        import_run = importers.run(import_run, batch_size=options['batch_size'], log=self.stdout.write)
+        if import_run.status != import_run.STATUS_DONE:
+            raise CommandError(f'Import #{import_run.id} {import_run.status}: {import_run.last_error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {import_run.posts_created} posts from {import_run.rows_done} rows '
+            f'({import_run.rows_skipped} skipped).'
+        ))
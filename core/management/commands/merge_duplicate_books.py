@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core import books
+
+
+class Command(BaseCommand):
+    help = "ISBN 또는 정규화한 제목+저자가 같은 책을 하나로 합치고 게시물의 책을 남는 책으로 옮긴다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='합칠 묶음만 출력하고 바꾸지 않음')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            groups = books.find_duplicates()
+            for keep_id, *other_ids in groups:
+                self.stdout.write(f'{keep_id} <- {", ".join(map(str, other_ids))}')
+            self.stdout.write(self.style.SUCCESS(f'{len(groups)} duplicate groups.'))
+            return
+        groups, deleted, moved = books.merge_duplicates()
+        self.stdout.write(self.style.SUCCESS(f'Merged {groups} groups: removed {deleted} books, repointed {moved} posts.'))
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import services
+
+
+class Command(BaseCommand):
+    help = "보존 기간이 지난 읽은 알림을 삭제한다. cron 등으로 주기적으로 실행."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.NOTIFICATION_RETENTION_DAYS,
+                            help='이 일수보다 오래된 읽은 알림을 삭제')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = services.prune_notifications(options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} read notifications older than {options["days"]} days.'))
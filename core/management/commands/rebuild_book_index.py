@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import book_index
+from core.models import Book
+
+
+class Command(BaseCommand):
+    help = "books 테이블 전체로 로컬 도서 검색 인덱스(books_fts)를 다시 만든다."
+
+    def handle(self, *args, **options):
+        if not book_index.available():
+            raise CommandError('Book index is not available on this database.')
+        book_index.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {Book.objects.count()} books.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core import counters
+
+
+class Command(BaseCommand):
+    help = "likes / reposts 테이블로부터 Post.like_count / repost_count 를 정확히 다시 계산한다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('post_ids', nargs='*', type=int, help='대상 게시물 (생략 시 전체)')
+
+    def handle(self, *args, **options):
+        updated = counters.reconcile(options['post_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Reconciled counts for {updated} posts.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core import services
+
+
+class Command(BaseCommand):
+    help = "Profile 의 팔로워/팔로잉/게시물 수를 follows / posts 테이블로부터 다시 계산한다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('user_ids', nargs='*', type=int, help='특정 사용자만 (기본: 전체)')
+
+    def handle(self, *args, **options):
+        updated = services.reconcile_profile_counts(options['user_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Reconciled counts for {updated} profiles.'))
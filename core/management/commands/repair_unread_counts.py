@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core import services
+
+
+class Command(BaseCommand):
+    help = "Profile.unread_notification_count 를 notifications 테이블로부터 다시 계산한다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('user_ids', nargs='*', type=int, help='특정 사용자만 (기본: 전체)')
+
+    def handle(self, *args, **options):
+        updated = services.recount_unread_notifications(options['user_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Recounted unread notifications for {updated} profiles.'))
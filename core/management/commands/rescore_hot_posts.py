@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import counters, ranking
+
+
+class Command(BaseCommand):
+    help = "likes / reposts / comments 로부터 게시물 hot 점수를 정확히 다시 계산하고 상위 목록을 갱신한다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.HOT_RESCORE_MAX_AGE_DAYS,
+                            help='최근 며칠 안의 게시물만 (기본: HOT_RESCORE_MAX_AGE_DAYS)')
+        parser.add_argument('--all', action='store_true', help='모든 게시물')
+
+    def handle(self, *args, **options):
+        counters.flush()
+        updated = ranking.rescore(max_age_days=None if options['all'] else options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Rescored {updated} posts.'))
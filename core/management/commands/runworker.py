@@ -0,0 +1,92 @@
+import multiprocessing
+import signal
+import threading
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import jobs
+
+
+def _process_main(options):
+    # spawn 방식으로 시작된 경우 Django 를 다시 초기화해야 한다 (fork 면 아무 일도 하지 않음)
+    django.setup()
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        jobs.work(
+            concurrency=options['threads'],
+            poll_interval=options['poll_interval'],
+            visibility_timeout=options['visibility_timeout'],
+            once=options['once'],
+            stop=stop,
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+class Command(BaseCommand):
+    help = "jobs 테이블에 쌓인 백그라운드 작업(알림, 타임라인 분배, 이미지 파생본, 카운터 합산 등)을 처리한다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=settings.JOBS_WORKER_CONCURRENCY,
+                            help='프로세스당 작업 스레드 수')
+        parser.add_argument('--processes', type=int, default=1, help='워커 프로세스 수')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='할 일이 없을 때 다시 확인하는 주기(초)')
+        parser.add_argument('--visibility-timeout', type=int, default=settings.JOBS_VISIBILITY_TIMEOUT,
+                            help='작업 점유 시간(초)')
+        parser.add_argument('--once', action='store_true', help='지금 실행 가능한 작업만 처리하고 종료')
+        parser.add_argument('--allow-memory-broker', action='store_true',
+                            help="REALTIME_BROKER='memory' 여도 시작 (SSE 알림을 쓰지 않을 때)")
+
+    def handle(self, *args, **options):
+        if settings.REALTIME_BROKER == 'memory' and not options['allow_memory_broker']:
+            # 알림 작업이 이 프로세스의 Hub 에 발행하므로 웹 프로세스의 SSE 연결에는 닿지 않는다
+            raise CommandError(
+                "REALTIME_BROKER='memory' 로는 워커가 만든 알림이 SSE 로 전달되지 않습니다. "
+                "REALTIME_BROKER=sqlite 로 웹 프로세스와 같이 설정하거나, JOBS_EAGER=1 로 워커 없이 실행하세요. "
+                "(SSE 를 쓰지 않으면 --allow-memory-broker)"
+            )
+        if options['processes'] <= 1:
+            stop = threading.Event()
+            signal.signal(signal.SIGTERM, lambda *_: stop.set())
+            try:
+                processed = jobs.work(
+                    concurrency=options['threads'],
+                    poll_interval=options['poll_interval'],
+                    visibility_timeout=options['visibility_timeout'],
+                    once=options['once'],
+                    stop=stop,
+                )
+            except KeyboardInterrupt:
+                return
+            self.stdout.write(f'Processed {processed} jobs.')
+            return
+
+        # 부모의 DB 연결을 자식에게 물려주지 않는다
+        connections.close_all()
+        child_options = {k: options[k] for k in ('threads', 'poll_interval', 'visibility_timeout', 'once')}
+        children = [
+            multiprocessing.Process(target=_process_main, args=(child_options,), name=f'runworker-{i}')
+            for i in range(options['processes'])
+        ]
+        for child in children:
+            child.start()
+        self.stdout.write(f'Started {len(children)} worker processes x {options["threads"]} threads.')
+
+        def _stop_children(*_):
+            # 자식은 SIGTERM 을 받으면 실행 중인 작업만 마치고 끝난다
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, _stop_children)
+        try:
+            for child in children:
+                child.join()
+        except KeyboardInterrupt:
+            _stop_children()
+            for child in children:
+                child.join()
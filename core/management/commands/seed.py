@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import seed
+
+
+class Command(BaseCommand):
+    help = "벤치마크용 가짜 사용자/도서/게시물/좋아요/리포스트/댓글/팔로우/알림을 멱법칙 분포로 대량 생성한다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--books', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--likes', type=int, default=5000)
+        parser.add_argument('--reposts', type=int, default=500)
+        parser.add_argument('--comments', type=int, default=2000)
+        parser.add_argument('--follows', type=int, default=1000)
+        parser.add_argument('--notifications', type=int, default=2000)
+        parser.add_argument('--days', type=int, default=90, help='게시물 작성 시각을 흩뿌릴 기간(일)')
+        parser.add_argument('--activity-alpha', type=float, default=1.1,
+                            help='활동(작성/반응)이 소수 사용자에게 몰리는 정도 (0 이면 균등)')
+        parser.add_argument('--popularity-alpha', type=float, default=1.2,
+                            help='반응/팔로우가 인기 게시물/사용자에게 몰리는 정도 (0 이면 균등)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--random-seed', type=int, default=None, help='같은 값이면 같은 데이터')
+        parser.add_argument('--no-timelines', action='store_true', help='홈 타임라인 채우기 생략')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = seed.seed(
+                users=options['users'],
+                books=options['books'],
+                posts=options['posts'],
+                likes=options['likes'],
+                reposts=options['reposts'],
+                comments=options['comments'],
+                follows=options['follows'],
+                notifications=options['notifications'],
+                days=options['days'],
+                activity_alpha=options['activity_alpha'],
+                popularity_alpha=options['popularity_alpha'],
+                batch_size=options['batch_size'],
+                random_seed=options['random_seed'],
+                build_timelines=not options['no_timelines'],
+                log=self.stdout.write,
+            )
+        summary = ', '.join(f'{n} {name}' for name, n in created.items())
+        self.stdout.write(self.style.SUCCESS(f'Seeded {summary}.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core import timeline
+from core.models import TimelineEntry
+
+
+class Command(BaseCommand):
+    help = "모든 홈 타임라인을 TIMELINE_MAX_LENGTH 이하로 자른다. 주기적으로 실행."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-length', type=int, default=None)
+
+    def handle(self, *args, **options):
+        user_ids = TimelineEntry.objects.values_list('user_id', flat=True).distinct()
+        deleted = sum(timeline.trim(user_id, options['max_length']) for user_id in user_ids.iterator())
+        self.stdout.write(self.style.SUCCESS(f'Trimmed {deleted} timeline entries.'))
@@ -0,0 +1,215 @@
+# ============================
+# core/media_storage.py
+# 업로드 파일용 내용 주소 스토리지 (같은 이미지는 한 번만 저장)
+# ============================
+# 업로드를 임시 파일로 흘려 쓰면서 SHA-256 을 계산하고, '<upload_to>/<aa>/<sha256><확장자>' 로 옮긴다.
+# 같은 내용이 이미 있으면 임시 파일만 버린다. 이름이 내용이므로 URL 이 바뀌지 않아 영구 캐시할 수 있다 (views.media_file).
+# 파일마다 MediaBlob 행에 참조 수를 둔다: 저장하면 +1, delete() 는 -1 만 하고 파일은 그대로 둔다.
+# 참조가 0 이 된 파일은 유예 시간이 지난 뒤 gc() (`manage.py gc_media`) 가 파생본과 함께 지운다.
+# 참조 수 증감은 게시물 저장과 같은 트랜잭션이라 롤백되면 함께 되돌아가고, 그때 남는 파일은 gc() 가 고아로 치운다.
+# 내용 주소 이전에 저장된 파일(원래 파일명)은 행이 없으며 delete() 하면 예전처럼 바로 지운다.
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import images
+from .models import MediaBlob
+
+# 업로드 도중의 임시 파일 위치 (MEDIA_ROOT 기준, 같은 파일 시스템이어야 os.replace 가 원자적)
+INCOMING_DIR = '.incoming'
+_BLOB_RE = re.compile(r'(?:^|/)[0-9a-f]{2}/([0-9a-f]{64})(?:\.[a-z0-9]+)?$')
+_DIGEST_RE = re.compile(r'(?:^|/)([0-9a-f]{64})(?:\.[a-z0-9]+$|/)')
+
+
+def blob_name(directory, digest, ext):
+    return posixpath.join(directory, digest[:2], f'{digest}{ext}')
+
+
+def is_blob(name):
+    return bool(name and _BLOB_RE.search(name))
+
+
+def digest_of(name):
+    """내용 주소 파일(또는 그 파생본) 이름이면 SHA-256, 아니면 None."""
+    match = _DIGEST_RE.search(name or '')
+    return match.group(1) if match else None
+
+
+# -----------------------------
+# 참조 수
+# -----------------------------
+def _retain(name, size):
+    now = timezone.now()
+    if MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + 1, updated_at=now):
+        return
+    try:
+        with transaction.atomic():
+            MediaBlob.objects.create(name=name, size=size, refcount=1)
+    except IntegrityError:
+        # 같은 내용이 동시에 올라옴
+        MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + 1, updated_at=now)
+
+
+def _release(name):
+    MediaBlob.objects.filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1, updated_at=timezone.now())
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # 실제 이름은 내용을 다 읽은 뒤 _save() 에서 정해진다. 같은 이름이면 같은 내용이다
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        incoming = self.path(INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=incoming)
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            name = blob_name(directory, digest.hexdigest(), ext)
+            path = self.path(name)
+            if os.path.exists(path):
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp_path, self.file_permissions_mode)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        _retain(name, size)
+        return name
+
+    def delete(self, name):
+        if is_blob(name):
+            _release(name)
+        else:
+            super().delete(name)
+
+
+# -----------------------------
+# 참조 다시 세기 / 정리
+# -----------------------------
+def _file_fields():
+    """기본 스토리지를 쓰는 (모델, 필드 이름) 목록."""
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField) and field.storage is default_storage:
+                yield model, field.name
+
+
+def _referenced_names():
+    counts = {}
+    for model, field in _file_fields():
+        names = model._base_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).values_list(field, flat=True)
+        for name in names.iterator(chunk_size=2000):
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def recount():
+    """모델의 파일 필드로부터 참조 수를 다시 맞춘다. 고친 행 수 반환."""
+    counts = _referenced_names()
+    fixed = 0
+    for blob in MediaBlob.objects.only('id', 'name', 'refcount').iterator(chunk_size=2000):
+        actual = counts.get(blob.name, 0)
+        if blob.refcount != actual:
+            MediaBlob.objects.filter(id=blob.id).update(refcount=actual, updated_at=timezone.now())
+            fixed += 1
+    return fixed
+
+
+def _remove(storage, name):
+    # 참조 수를 거치지 않고 파일을 바로 지운다
+    FileSystemStorage.delete(storage, name)
+    images.delete_variants(name)
+
+
+def _orphans(storage, cutoff):
+    """행 없이 남은 내용 주소 파일과 오래된 임시 파일. MEDIA_ROOT 기준 이름 목록."""
+    known = set(MediaBlob.objects.values_list('name', flat=True))
+    root = storage.location
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel = os.path.relpath(dirpath, root).replace(os.sep, '/')
+        if rel == '.':
+            # 파생본 / 표지는 각자 관리한다
+            dirnames[:] = [d for d in dirnames if d not in ('variants', 'covers')]
+        for filename in filenames:
+            name = filename if rel == '.' else f'{rel}/{filename}'
+            stale = os.path.getmtime(os.path.join(dirpath, filename)) < cutoff
+            if rel == INCOMING_DIR and stale:
+                yield name
+            elif is_blob(name) and name not in known and stale:
+                yield name
+
+
+def gc(grace_hours=None, dry_run=False, storage=None):
+    """참조가 유예 시간 넘게 0 인 파일과 고아 파일을 파생본과 함께 지운다. (지운 파일 수, 바이트) 반환."""
+    storage = storage or default_storage
+    grace_hours = settings.MEDIA_GC_GRACE_HOURS if grace_hours is None else grace_hours
+    cutoff = timezone.now() - timedelta(hours=grace_hours)
+    removed = freed = 0
+    if not dry_run:
+        recount()
+    unreferenced = MediaBlob.objects.filter(refcount=0, updated_at__lte=cutoff).values_list('id', 'name', 'size')
+    for blob_id, name, size in list(unreferenced):
+        # 그 사이 같은 내용이 다시 올라왔으면 (refcount > 0) 건너뛴다
+        if not dry_run and not MediaBlob.objects.filter(id=blob_id, refcount=0).delete()[0]:
+            continue
+        if not dry_run:
+            _remove(storage, name)
+        removed, freed = removed + 1, freed + size
+    for name in list(_orphans(storage, time.time() - grace_hours * 3600)):
+        size = storage.size(name)
+        if not dry_run:
+            _remove(storage, name)
+        removed, freed = removed + 1, freed + size
+    return removed, freed
+
+
+def adopt_existing(dry_run=False):
+    """내용 주소 이전에 원래 파일명으로 저장된 업로드를 내용 주소로 옮기고 필드 값을 바꾼다. 바꾼 행 수 반환.
+
+    같은 이미지가 여러 번 올라와 있었으면 여기서 하나로 합쳐진다. 파생본은 새 이름으로 다시 만든다.
+    """
+    moved = 0
+    for model, field in _file_fields():
+        rows = model._base_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+        names = [name for name in rows.values_list(field, flat=True).distinct() if not is_blob(name)]
+        for name in names:
+            if not default_storage.exists(name):
+                continue
+            if dry_run:
+                moved += rows.filter(**{field: name}).count()
+                continue
+            with default_storage.open(name, 'rb') as f, transaction.atomic():
+                new_name = default_storage.save(name, f)
+                # 파생본 형식은 새 이름으로 다시 만들 때 기록된다
+                reset = {f'{field}_variants': ''} if hasattr(model, f'{field}_variants') else {}
+                moved += rows.filter(**{field: name}).update(**{field: new_name}, **reset)
+            default_storage.delete(name)
+            images.delete_variants(name)
+            images.generate_variants(getattr(rows.filter(**{field: new_name}).first(), field))
+    if moved and not dry_run:
+        recount()
+    return moved
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CounterDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=32)),
+                ('delta', models.SmallIntegerField()),
+                ('batch', models.CharField(blank=True, max_length=32, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.post')),
+            ],
+            options={
+                'db_table': 'counter_deltas',
+                'indexes': [models.Index(fields=['post', 'field'], name='counter_deltas_post_field_idx'), models.Index(fields=['batch'], name='counter_deltas_batch_idx')],
+            },
+        ),
+    ]
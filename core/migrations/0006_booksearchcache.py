@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_counterdelta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookSearchCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query_key', models.CharField(max_length=255, unique=True)),
+                ('results', models.JSONField(default=list)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'book_search_cache',
+            },
+        ),
+    ]
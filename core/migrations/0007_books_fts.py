@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def create_books_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from core import book_index
+    if book_index.create_table(schema_editor.connection):
+        book_index.rebuild(schema_editor.connection)
+
+
+def drop_books_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS books_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_booksearchcache'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_books_fts, drop_books_fts),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:39
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_unread_counts(apps, schema_editor):
+    Notification = apps.get_model('core', 'Notification')
+    Profile = apps.get_model('core', 'Profile')
+    unread = (
+        Notification.objects.filter(user_id=OuterRef('user_id'), is_read=False)
+        .values('user_id').annotate(n=Count('id')).values('n')
+    )
+    Profile.objects.update(unread_notification_count=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_notification_coalescing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='unread_notification_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_unread_counts, migrations.RunPython.noop),
+    ]
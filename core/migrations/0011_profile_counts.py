@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:44
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_profile_counts(apps, schema_editor):
+    Profile = apps.get_model('core', 'Profile')
+    Follow = apps.get_model('core', 'Follow')
+    Post = apps.get_model('core', 'Post')
+
+    def count_of(queryset, field):
+        counts = queryset.filter(**{field: OuterRef('user_id')}).values(field).annotate(n=Count('id')).values('n')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+    Profile.objects.update(
+        follower_count=count_of(Follow.objects.all(), 'followee_id'),
+        following_count=count_of(Follow.objects.all(), 'follower_id'),
+        post_count=count_of(Post.objects.all(), 'user_id'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_profile_unread_notification_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='posts_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repost',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='reposts_user_created_idx'),
+        ),
+        migrations.RunPython(fill_profile_counts, migrations.RunPython.noop),
+    ]
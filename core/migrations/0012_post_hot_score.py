@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:59
+
+import math
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_hot_scores(apps, schema_editor):
+    # 반응 시각을 모르니 작성 시각에 모두 일어난 것으로 근사한다. 정확한 값은 manage.py rescore_hot_posts
+    Post = apps.get_model('core', 'Post')
+    epoch = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    tau = settings.HOT_SCORE_HALF_LIFE_HOURS * 3600 / math.log(2)
+    batch = []
+    # SQLite 는 같은 연결에서 읽는 중인 테이블을 고치면 결과가 꼬일 수 있어 먼저 다 읽는다
+    rows = list(Post.objects.values_list('id', 'created_at', 'like_count', 'repost_count'))
+    for post_id, created_at, likes, reposts in rows:
+        score = (created_at - epoch).total_seconds() / tau + math.log(1 + max(likes, 0) + 3 * max(reposts, 0))
+        batch.append(Post(id=post_id, hot_score=score))
+        if len(batch) >= 1000:
+            Post.objects.bulk_update(batch, ['hot_score'])
+            batch = []
+    Post.objects.bulk_update(batch, ['hot_score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_profile_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['hot_score', 'id'], name='posts_hot_score_id_idx'),
+        ),
+        migrations.RunPython(fill_hot_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_post_hot_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoverImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=64, unique=True)),
+                ('source_url', models.TextField()),
+                ('digest', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('status', models.CharField(default='pending', max_length=16)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=64)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('fetched_at', models.DateTimeField(blank=True, null=True)),
+                ('checked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'cover_images',
+                'indexes': [models.Index(fields=['status', 'checked_at'], name='covers_status_checked_idx')],
+            },
+        ),
+    ]
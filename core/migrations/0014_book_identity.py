@@ -0,0 +1,124 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:31
+
+import hashlib
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+# 이 마이그레이션 시점의 책 식별 규칙 (core/book_search.py, core/books.py 가 바뀌어도 결과가 같도록 복사해 둔다)
+def _isbn10_to_13(isbn10):
+    core = '978' + isbn10[:9]
+    total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(core))
+    return core + str((10 - total % 10) % 10)
+
+
+def normalize_isbn(raw):
+    if not raw:
+        return None
+    candidates = [re.sub(r'[^0-9Xx]', '', part) for part in re.split(r'[\s,]+', str(raw))]
+    for candidate in candidates:
+        if len(candidate) == 13 and candidate.isdigit():
+            return candidate
+    for candidate in candidates:
+        if len(candidate) == 10 and candidate[:9].isdigit():
+            return _isbn10_to_13(candidate)
+    return None
+
+
+def _fold(text):
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text).split())
+
+
+def normalize_author(author):
+    text = re.sub(r'\([^)]*\)', ' ', author or '')
+    names = {_fold(name) for name in re.split(r'\s*(?:[,;&/·]|\band\b)\s*', text)}
+    return '|'.join(sorted(name for name in names if name))
+
+
+def book_key(title, author):
+    raw = f'{_fold(title or "")}\x1f{normalize_author(author)}'
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _duplicate_groups(rows):
+    # ISBN 이 같거나, 제목+저자가 같은 ISBN 없는 책 (그 제목+저자의 판이 하나뿐이면 그 판까지) 을 한 묶음으로
+    parent = {book_id: book_id for book_id, *_ in rows}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        a, b = find(a), find(b)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    isbn_owners = {}
+    by_key = defaultdict(list)
+    has_isbn = set()
+    for book_id, title, author, isbn in rows:
+        isbn = normalize_isbn(isbn)
+        if isbn:
+            has_isbn.add(book_id)
+            if isbn in isbn_owners:
+                union(isbn_owners[isbn], book_id)
+            else:
+                isbn_owners[isbn] = book_id
+        by_key[book_key(title, author)].append((book_id, isbn))
+
+    for books in by_key.values():
+        bare = [book_id for book_id, isbn in books if not isbn]
+        editions = {isbn: book_id for book_id, isbn in books if isbn}
+        if bare and len(editions) == 1:
+            bare.append(next(iter(editions.values())))
+        for book_id in bare[1:]:
+            union(bare[0], book_id)
+
+    groups = defaultdict(list)
+    for book_id, *_ in rows:
+        groups[find(book_id)].append(book_id)
+    return [sorted(ids, key=lambda i: (i not in has_isbn, i)) for ids in groups.values() if len(ids) > 1]
+
+
+def merge_duplicate_books(apps, schema_editor):
+    # 유일 제약(0015)을 걸기 전에 기존 중복을 합치고 ISBN / key 를 채운다
+    Book = apps.get_model('core', 'Book')
+    Post = apps.get_model('core', 'Post')
+    rows = list(Book.objects.order_by('id').values_list('id', 'title', 'author', 'isbn'))
+    for keep_id, *other_ids in _duplicate_groups(rows):
+        cover_url = Book.objects.filter(id__in=other_ids).exclude(cover_url__isnull=True) \
+            .exclude(cover_url='').values_list('cover_url', flat=True).first()
+        Post.objects.filter(book_id__in=other_ids).update(book_id=keep_id)
+        Book.objects.filter(id__in=other_ids).delete()
+        if cover_url:
+            Book.objects.filter(Q(cover_url__isnull=True) | Q(cover_url=''), id=keep_id).update(cover_url=cover_url)
+
+    updates = []
+    for book in Book.objects.only('id', 'title', 'author', 'isbn').iterator():
+        book.isbn = normalize_isbn(book.isbn)
+        book.normalized_key = book_key(book.title, book.author)
+        updates.append(book)
+    Book.objects.bulk_update(updates, ['isbn', 'normalized_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_cover_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='normalized_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(merge_duplicate_books, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 0014 의 데이터 변경과 같은 트랜잭션에서 ALTER TABLE 을 하지 않도록 (PostgreSQL 의 지연 FK 트리거) 나눈다
+
+    dependencies = [
+        ('core', '0014_book_identity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='book',
+            name='normalized_key',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.UniqueConstraint(condition=models.Q(('isbn__isnull', False)), fields=('isbn',), name='books_unique_isbn'),
+        ),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.UniqueConstraint(condition=models.Q(('isbn__isnull', True)), fields=('normalized_key',), name='books_unique_key_without_isbn'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_book_identity_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_name', models.CharField(max_length=255)),
+                ('path', models.CharField(max_length=500)),
+                ('digest', models.CharField(max_length=64)),
+                ('format', models.CharField(max_length=16)),
+                ('status', models.CharField(default='pending', max_length=16)),
+                ('rows_done', models.IntegerField(default=0)),
+                ('posts_created', models.IntegerField(default=0)),
+                ('rows_skipped', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'import_runs',
+                'indexes': [models.Index(fields=['user', 'digest'], name='import_runs_user_digest_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:59
+
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+# 이 마이그레이션 시점의 파생본 규칙 (core/images.py 가 바뀌어도 결과가 같도록 복사해 둔다)
+FIRST_VARIANT = {'post_photos': 'card', 'profile_pics': 'avatar'}
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg', 'avif': 'avif'}
+
+
+def _formats(name):
+    stem = os.path.splitext(name)[0]
+    variant = FIRST_VARIANT.get(name.split('/', 1)[0], 'card')
+    root = os.path.join(settings.MEDIA_ROOT, 'variants')
+    return ','.join(
+        fmt for fmt, ext in EXTENSIONS.items()
+        if os.path.exists(os.path.join(root, stem, f'{variant}.{ext}'))
+    )
+
+
+def record_existing_variants(apps, schema_editor):
+    # 이미 만들어 둔 파생본을 기록해, 배포 직후에도 원본 대신 파생본을 내보낸다
+    for model_name, field in (('Post', 'user_photo'), ('Profile', 'profile_image')):
+        model = apps.get_model('core', model_name)
+        names = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).values_list(field, flat=True)
+        for name in list(names.distinct()):
+            value = _formats(name)
+            if value:
+                model.objects.filter(**{field: name}).update(**{f'{field}_variants': value})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_media_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='user_photo_variants',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='profile_image_variants',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.RunPython(record_existing_variants, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def record_latest_actors(apps, schema_editor):
+    # 읽지 않은 알림은 앞으로도 합쳐지므로 알고 있는 사람(가장 최근 from_user)을 기록해 둔다.
+    # 그 전 사람들은 알 수 없어 actor_count 는 그대로 둔다
+    Notification = apps.get_model('core', 'Notification')
+    NotificationActor = apps.get_model('core', 'NotificationActor')
+    rows = Notification.objects.filter(is_read=False).values_list('id', 'from_user_id').iterator()
+    batch = []
+    for notification_id, user_id in rows:
+        batch.append(NotificationActor(notification_id=notification_id, user_id=user_id))
+        if len(batch) >= 1000:
+            NotificationActor.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    NotificationActor.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_image_variant_formats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationActor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='actors', to='core.notification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'notification_actors',
+                'constraints': [models.UniqueConstraint(fields=('notification', 'user'), name='notif_actors_unique')],
+            },
+        ),
+        migrations.RunPython(record_latest_actors, migrations.RunPython.noop),
+    ]
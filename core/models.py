@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.urls import reverse # New import
 
@@ -6,6 +7,13 @@ class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     nickname = models.CharField(max_length=255)
     profile_image = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+    profile_image_variants = models.CharField(max_length=32, blank=True, default='') # 만들어 둔 파생본 형식 ('webp,jpeg'). core/images.py
+    # 읽지 않은 알림 수 (비정규화). add_notification / mark_all_notifications_read 가 함께 갱신
+    unread_notification_count = models.PositiveIntegerField(default=0)
+    # 프로필 화면용 비정규화 카운트. toggle_follow / create_post / delete_post 가 함께 갱신 (reconcile_profile_counts 로 복구)
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    post_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.nickname
@@ -14,31 +22,121 @@ class Book(models.Model):
     title = models.CharField(max_length=255)
     author = models.CharField(max_length=255, null=True, blank=True)
     cover_url = models.CharField(max_length=255, null=True, blank=True)
-    isbn = models.CharField(max_length=255, null=True, blank=True)
+    isbn = models.CharField(max_length=255, null=True, blank=True) # ISBN-13 으로 정규화 (book_search.normalize_isbn)
+    # 정규화한 제목+저자의 해시 (book_search.book_key). ISBN 없는 책 사이에서만 유일 (ISBN 이 다른 판은 따로, core/books.py)
+    normalized_key = models.CharField(max_length=64, db_index=True, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = 'books'
+        constraints = [
+            models.UniqueConstraint(fields=['isbn'], condition=models.Q(isbn__isnull=False), name='books_unique_isbn'),
+            models.UniqueConstraint(fields=['normalized_key'], condition=models.Q(isbn__isnull=True), name='books_unique_key_without_isbn'),
+        ]
 
     def __str__(self):
         return self.title
 
+class BookSearchCache(models.Model):
+    """외부 도서 검색 결과의 영속 캐시 (정규화된 검색어 단위, TTL)."""
+    query_key = models.CharField(max_length=255, unique=True) # 정규화한 검색어의 SHA-256 (book_search.query_key)
+    results = models.JSONField(default=list)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'book_search_cache'
+
+    def __str__(self):
+        return self.query_key
+
+class CoverImage(models.Model):
+    """원격 표지 URL 한 개를 받아 둔 결과. 파일은 내용 해시(digest) 이름으로 저장 (core/covers.py 참고)."""
+    STATUS_PENDING = 'pending'
+    STATUS_OK = 'ok'
+    STATUS_FAILED = 'failed'
+
+    url_hash = models.CharField(max_length=64, unique=True) # sha256(source_url)
+    source_url = models.TextField()
+    digest = models.CharField(max_length=64, blank=True, db_index=True) # sha256(저장한 JPEG)
+    status = models.CharField(max_length=16, default=STATUS_PENDING)
+    # 조건부 재검증용 원격 응답 헤더
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    fetched_at = models.DateTimeField(null=True, blank=True)
+    checked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'cover_images'
+        indexes = [
+            models.Index(fields=['status', 'checked_at'], name='covers_status_checked_idx'),
+        ]
+
+    def __str__(self):
+        return self.source_url
+
+class MediaBlob(models.Model):
+    """내용 주소로 저장한 업로드 파일 하나와 그것을 가리키는 파일 필드 수 (core/media_storage.py 참고)."""
+    name = models.CharField(max_length=255, unique=True) # '<upload_to>/<aa>/<sha256>.jpg'
+    size = models.BigIntegerField(default=0)
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True) # 참조 수가 마지막으로 바뀐 시각 (gc 유예 기준)
+
+    class Meta:
+        db_table = 'media_blobs'
+        indexes = [
+            models.Index(fields=['refcount', 'updated_at'], name='media_blobs_refcount_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
 class Post(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     book = models.ForeignKey(Book, on_delete=models.SET_NULL, null=True, blank=True)
     user_photo = models.ImageField(upload_to='post_photos/', null=True, blank=True) # Renamed from user_photo_url
+    user_photo_variants = models.CharField(max_length=32, blank=True, default='') # 만들어 둔 파생본 형식 ('webp,jpeg'). core/images.py
     book_cover_url_snapshot = models.CharField(max_length=255, null=True, blank=True)
     text = models.TextField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now) # 가져오기(core/importers.py)는 원래 기록 시각을 넣는다
     like_count = models.IntegerField(default=0)
     repost_count = models.IntegerField(default=0)
+    hot_score = models.FloatField(default=0) # 시간 감쇠 인기 점수 (core/ranking.py)
+    deleted_at = models.DateTimeField(null=True, blank=True) # 삭제 요청 시각. 목록에서 바로 숨기고 행은 core/purge.py 가 지운다
 
     class Meta:
         db_table = 'posts'
+        indexes = [
+            # 피드 키셋 페이지네이션용 (latest / bookup 정렬)
+            models.Index(fields=['created_at', 'id'], name='posts_created_id_idx'),
+            models.Index(fields=['repost_count', 'created_at'], name='posts_repost_created_idx'),
+            models.Index(fields=['hot_score', 'id'], name='posts_hot_score_id_idx'),
+            # 프로필 '내 포스팅' 탭
+            models.Index(fields=['user', 'created_at', 'id'], name='posts_user_created_idx'),
+        ]
 
     def __str__(self):
         return f'Post by {self.user.username} at {self.created_at}'
 
+class CounterDelta(models.Model):
+    """Post 카운터 증감의 append-only 로그. counters.flush() 가 주기적으로 Post 에 합산한다."""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    field = models.CharField(max_length=32) # 'like_count' | 'repost_count'
+    delta = models.SmallIntegerField()
+    batch = models.CharField(max_length=32, null=True, blank=True) # 합산 중인 flush 가 점유 표시
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'counter_deltas'
+        indexes = [
+            models.Index(fields=['post', 'field'], name='counter_deltas_post_field_idx'),
+            models.Index(fields=['batch'], name='counter_deltas_batch_idx'),
+        ]
+
 class Like(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
@@ -56,6 +154,10 @@ class Repost(models.Model):
     class Meta:
         db_table = 'reposts'
         unique_together = ('user', 'post')
+        indexes = [
+            # 프로필 'Book Up' 탭
+            models.Index(fields=['user', 'created_at', 'id'], name='reposts_user_created_idx'),
+        ]
 
 class Comment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -65,6 +167,9 @@ class Comment(models.Model):
 
     class Meta:
         db_table = 'comments'
+        indexes = [
+            models.Index(fields=['post', 'created_at'], name='comments_post_created_idx'),
+        ]
 
     def __str__(self):
         return f'Comment by {self.user.username} on {self.post}'
@@ -78,6 +183,25 @@ class Follow(models.Model):
         db_table = 'follows'
         unique_together = ('follower', 'followee')
 
+class TimelineEntry(models.Model):
+    """팔로우 기반 홈 타임라인의 물질화된 행 (fan-out-on-write)."""
+    REASON_POST = 'post'
+    REASON_REPOST = 'repost'
+
+    user = models.ForeignKey(User, related_name='timeline_entries', on_delete=models.CASCADE) # 타임라인 주인
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    actor = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE) # 글쓴이 또는 리포스트한 사람
+    reason = models.CharField(max_length=16, default=REASON_POST)
+    created_at = models.DateTimeField(default=timezone.now) # 타임라인에 올라온 시각
+
+    class Meta:
+        db_table = 'timeline_entries'
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'post'], name='timeline_user_created_idx'),
+            models.Index(fields=['user', 'actor'], name='timeline_user_actor_idx'),
+        ]
+
 class Notification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     from_user = models.ForeignKey(User, related_name='sent_notifications', on_delete=models.CASCADE)
@@ -85,28 +209,136 @@ class Notification(models.Model):
     notification_type = models.CharField(max_length=255)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # 읽기 전 같은 게시물/종류의 알림은 한 행으로 합친다. from_user 는 가장 최근 사람, actor_count 는 서로 다른 사람 수 (NotificationActor)
+    actor_count = models.IntegerField(default=1)
 
     class Meta:
         db_table = 'notifications'
+        indexes = [
+            models.Index(fields=['user', 'is_read', 'created_at'], name='notifs_user_read_created_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='notifs_user_created_id_idx'),
+        ]
 
     def __str__(self):
         return f'Notification for {self.user.username}'
 
     def get_display_message(self):
         from_user_nickname = self.from_user.profile.nickname if self.from_user.profile else self.from_user.username
+        if self.actor_count > 1:
+            from_user_nickname = f'{from_user_nickname}님 외 {self.actor_count - 1}명이'
+        else:
+            from_user_nickname = f'{from_user_nickname}님이'
         if self.notification_type == 'like':
-            return f'{from_user_nickname}님이 회원님의 게시물을 좋아합니다.'
+            return f'{from_user_nickname} 회원님의 게시물을 좋아합니다.'
         elif self.notification_type == 'repost':
-            return f'{from_user_nickname}님이 회원님의 게시물을 리포스트했습니다.'
+            return f'{from_user_nickname} 회원님의 게시물을 리포스트했습니다.'
         elif self.notification_type == 'comment':
-            return f'{from_user_nickname}님이 회원님의 게시물에 댓글을 남겼습니다.'
+            return f'{from_user_nickname} 회원님의 게시물에 댓글을 남겼습니다.'
         elif self.notification_type == 'follow':
-            return f'{from_user_nickname}님이 회원님을 팔로우하기 시작했습니다.'
+            return f'{from_user_nickname} 회원님을 팔로우하기 시작했습니다.'
         return f'새로운 알림: {self.notification_type}'
 
-    def get_notification_url(self):
-        if self.notification_type in ['like', 'repost', 'comment'] and self.post:
-            return reverse('feed') + f'#post-' + str(self.post.id) # Anchor to the post on the feed page
+    def get_notification_url(self, feed_url=None):
+        """feed_url 을 넘기면 reverse() 를 건너뛴다 (목록에서 한 번만 계산)."""
+        # post / from_user 객체를 불러오지 않도록 id 만 사용
+        if self.notification_type in ['like', 'repost', 'comment'] and self.post_id:
+            return (feed_url or reverse('feed')) + f'#post-' + str(self.post_id) # Anchor to the post on the feed page
         elif self.notification_type == 'follow':
-            return reverse('profile_detail', args=[self.from_user.id])
-        return '#' # Default to no specific link
\ No newline at end of file
+            return reverse('profile_detail', args=[self.from_user_id])
+        return '#' # Default to no specific link
+
+    def to_dict(self, feed_url=None):
+        """API / 실시간 이벤트용 직렬화. from_user.profile 을 미리 불러와 두면 추가 쿼리가 없다."""
+        return {
+            'id': self.id,
+            'type': self.notification_type,
+            'from_user': self.from_user.profile.nickname,
+            'actor_count': self.actor_count,
+            'post_id': self.post_id,
+            'is_read': self.is_read,
+            'created_at': self.created_at.strftime("%Y-%m-%d %H:%M"),
+            'message': self.get_display_message(),
+            'url': self.get_notification_url(feed_url)
+        }
+
+class NotificationActor(models.Model):
+    """합쳐진 알림에 반응한 사람 한 명. actor_count 는 이 행 수 (같은 사람이 여러 번 눌러도 한 번)."""
+    notification = models.ForeignKey(Notification, related_name='actors', on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = 'notification_actors'
+        constraints = [
+            models.UniqueConstraint(fields=['notification', 'user'], name='notif_actors_unique'),
+        ]
+
+class ImportRun(models.Model):
+    """독서 기록 파일 가져오기 한 건. rows_done 까지 반영했으므로 중단되면 그 다음 행부터 이어 간다 (core/importers.py)."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    source_name = models.CharField(max_length=255) # 올린 파일 이름
+    path = models.CharField(max_length=500) # 읽을 파일 경로
+    digest = models.CharField(max_length=64) # sha256(파일 내용). 같은 파일을 다시 넣으면 이어 가기
+    format = models.CharField(max_length=16)
+    status = models.CharField(max_length=16, default=STATUS_PENDING)
+    rows_done = models.IntegerField(default=0) # 읽고 반영을 마친 행 수 (건너뛴 행 포함)
+    posts_created = models.IntegerField(default=0)
+    rows_skipped = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'import_runs'
+        indexes = [
+            models.Index(fields=['user', 'digest'], name='import_runs_user_digest_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.source_name} ({self.status})'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'source_name': self.source_name,
+            'format': self.format,
+            'status': self.status,
+            'rows_done': self.rows_done,
+            'posts_created': self.posts_created,
+            'rows_skipped': self.rows_skipped,
+            'error': self.last_error,
+        }
+
+class Job(models.Model):
+    """DB 기반 백그라운드 작업 큐의 한 건. core/jobs.py 참고."""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_FAILED = 'failed'
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    key = models.CharField(max_length=255, null=True, blank=True) # 같은 key 의 대기 작업은 하나만
+    status = models.CharField(max_length=16, default=STATUS_QUEUED)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True) # 실행 중 점유 만료 시각 (visibility timeout)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'jobs'
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='jobs_status_run_at_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['key'], condition=models.Q(status='queued'), name='jobs_unique_queued_key'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
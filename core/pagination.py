@@ -0,0 +1,107 @@
+# ============================
+# core/pagination.py
+# 키셋(커서) 페이지네이션 유틸
+# ============================
+import base64
+import json
+import math
+from datetime import datetime
+
+from django.db.models import Q
+
+
+# 정수가 아닌 숫자 정렬 키
+FLOAT_FIELDS = ("hot_score",)
+
+
+class InvalidCursor(ValueError):
+    """클라이언트가 보낸 커서를 해석할 수 없을 때."""
+
+
+def encode_cursor(values):
+    """정렬 키 값 목록을 URL-safe 불투명 문자열로 인코딩."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, fields):
+    """encode_cursor 의 역. fields 의 길이/타입에 맞지 않으면 InvalidCursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e)) from e
+    if not isinstance(payload, list) or len(payload) != len(fields):
+        raise InvalidCursor("cursor does not match ordering")
+    values = []
+    for field, value in zip(fields, payload):
+        try:
+            values.append(_coerce(field, value))
+        except (TypeError, ValueError) as e:
+            raise InvalidCursor(str(e)) from e
+    return values
+
+
+def _coerce(field, value):
+    """커서 값을 정렬 키 타입으로. ORM 에 넘기기 전에 걸러야 500 이 아니라 400 이 된다."""
+    if field.endswith("created_at"):
+        return datetime.fromisoformat(value)
+    # bool 은 int 의 하위 클래스, NaN/Infinity 는 json.loads 가 받아 준다
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"invalid cursor value for {field}")
+    if field in FLOAT_FIELDS:
+        return float(value)
+    if value != int(value):
+        raise ValueError(f"invalid cursor value for {field}")
+    return int(value)
+
+
+def keyset_filter(fields, values):
+    """내림차순 정렬 (f1, f2, ...) 에서 values 다음 행들을 고르는 Q 객체.
+
+    (a, b, c) < (x, y, z) 를 a<x OR (a=x AND b<y) OR (a=x AND b=y AND c<z) 로 전개한다.
+    """
+    condition = Q()
+    for i, field in enumerate(fields):
+        clause = Q(**{f"{field}__lt": values[i]})
+        for prev_field, prev_value in zip(fields[:i], values[:i]):
+            clause &= Q(**{prev_field: prev_value})
+        condition |= clause
+    return condition
+
+
+def paginate(queryset, fields, limit, cursor=None):
+    """queryset 을 fields 내림차순으로 정렬해 한 페이지와 다음 커서를 반환.
+
+    OFFSET 없이 인덱스 범위 스캔만 하므로 페이지 깊이와 무관하게 비용이 일정하다.
+    """
+    queryset = _page_queryset(queryset, fields, limit, cursor)
+    return _finish_page(list(queryset), fields, limit)
+
+
+async def apaginate(queryset, fields, limit, cursor=None):
+    """paginate 의 async 버전 (async ORM 으로 조회)."""
+    queryset = _page_queryset(queryset, fields, limit, cursor)
+    return _finish_page([row async for row in queryset], fields, limit)
+
+
+def _page_queryset(queryset, fields, limit, cursor):
+    if cursor:
+        queryset = queryset.filter(keyset_filter(fields, decode_cursor(cursor, fields)))
+    return queryset.order_by(*[f"-{f}" for f in fields])[:limit + 1]
+
+
+def _finish_page(rows, fields, limit):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([_resolve(last, f) for f in fields])
+    return rows, next_cursor
+
+
+def _resolve(obj, field):
+    for part in field.split("__"):
+        obj = getattr(obj, part)
+    return obj
@@ -0,0 +1,155 @@
+# ============================
+# core/purge.py
+# 삭제한 게시물 / 탈퇴한 계정의 행과 파일을 실제로 지우기 (백그라운드)
+# ============================
+# 삭제 요청은 Post.deleted_at / User.is_active 만 바꿔 목록에서 바로 숨기고, 실제 삭제는 작업 큐에서 이 모듈이 한다.
+# Django 의 .delete() 는 CASCADE 대상을 전부 메모리에 모은 뒤 한 트랜잭션에서 지우므로, 반응이 많은 게시물이나
+# 오래 쓴 계정이면 오래 걸리고 그동안 테이블을 잠근다. 여기서는 모델 메타데이터로 참조 관계를 따라가
+# 자식 테이블부터 PURGE_BATCH_SIZE 행씩 DELETE 문을 직접 보낸다 (문장마다 커밋, 시그널 없음).
+# 중간에 멈춰도 남은 행은 계속 숨겨져 있으므로 작업을 다시 돌리면 이어서 지운다.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.db import connections, router
+from django.db.models import CASCADE, SET_NULL
+from django.utils import timezone
+
+from . import counters, fragments, images, services
+from .models import Comment, Follow, Like, Notification, Post, Profile, Repost
+
+
+# -----------------------------
+# 테이블별 나눠 지우기
+# -----------------------------
+def _pks(model, column, values, limit):
+    using = router.db_for_write(model)
+    return list(
+        model._base_manager.using(using).filter(**{f'{column}__in': values}).values_list('pk', flat=True)[:limit]
+    )
+
+
+def _delete_pks(model, pks):
+    connection = connections[router.db_for_write(model)]
+    table = connection.ops.quote_name(model._meta.db_table)
+    pk = connection.ops.quote_name(model._meta.pk.column)
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {pk} IN ({placeholders})', list(pks))
+        return cursor.rowcount
+
+
+def _m2m_links(model):
+    """model 행을 가리키는 자동 생성 중간 테이블(auth_user_groups 등)과 그 컬럼."""
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        if through._meta.auto_created:
+            yield through, through._meta.get_field(field.m2m_field_name()).attname
+    for rel in model._meta.related_objects:
+        if rel.many_to_many and rel.through._meta.auto_created:
+            yield rel.through, rel.through._meta.get_field(rel.field.m2m_reverse_field_name()).attname
+
+
+def _purge_referencing(model, column, parent_ids, batch_size):
+    deleted = 0
+    while pks := _pks(model, column, parent_ids, batch_size):
+        deleted += _purge_rows(model, pks, batch_size)
+    return deleted
+
+
+def _null_referencing(model, column, parent_ids, batch_size):
+    using = router.db_for_write(model)
+    while pks := _pks(model, column, parent_ids, batch_size):
+        model._base_manager.using(using).filter(pk__in=pks).update(**{column: None})
+
+
+def _purge_rows(model, ids, batch_size):
+    """ids 행을 지운다. 먼저 이 행을 참조하는 행을 관계마다 batch_size 개씩 (CASCADE 는 지우고 SET_NULL 은 비움).
+
+    지운 행 수(자식 포함) 반환. 그 밖의 on_delete(PROTECT 등)는 DB 제약에 맡긴다.
+    """
+    deleted = 0
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        for rel in model._meta.related_objects:
+            if rel.many_to_many:
+                continue
+            if rel.on_delete is CASCADE:
+                deleted += _purge_referencing(rel.related_model, rel.field.attname, chunk, batch_size)
+            elif rel.on_delete is SET_NULL:
+                _null_referencing(rel.related_model, rel.field.attname, chunk, batch_size)
+        for through, column in _m2m_links(model):
+            deleted += _purge_referencing(through, column, chunk, batch_size)
+        deleted += _delete_pks(model, chunk)
+    return deleted
+
+
+def _chunks(values, size):
+    values = sorted(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _remove_media(names):
+    for name in names:
+        if not name:
+            continue
+        default_storage.delete(name)
+        # 내용 주소 스토리지는 참조 수만 줄이고, 파일과 파생본은 gc_media 가 지운다 (core/media_storage.py)
+        if not default_storage.exists(name):
+            images.delete_variants(name)
+
+
+# -----------------------------
+# 게시물 / 계정
+# -----------------------------
+def purge_posts(post_ids, batch_size=None):
+    """삭제 표시(deleted_at)된 게시물과 반응/댓글/타임라인/알림, 사진 파일을 지운다. 지운 행 수 반환.
+
+    표시가 없는 게시물(이미 지워졌거나 잘못 넘어온 id)은 건너뛴다.
+    """
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    rows = list(Post.objects.filter(id__in=post_ids, deleted_at__isnull=False).values_list('id', 'user_photo'))
+    if not rows:
+        return 0
+    ids = [post_id for post_id, _ in rows]
+    deleted = _purge_rows(Post, ids, batch_size)
+    _remove_media(photo for _, photo in rows)
+    fragments.invalidate(*ids)
+    return deleted
+
+
+def purge_user(user_id, batch_size=None):
+    """탈퇴한(is_active=False) 계정의 모든 행과 파일을 지우고, 다른 사용자 쪽 카운트를 다시 맞춘다. 지운 행 수 반환."""
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    if not User.objects.filter(id=user_id, is_active=False).exists():
+        return 0
+
+    # 탈퇴 뒤에 끝난 가져오기 등으로 생긴 게시물도 숨긴다
+    posts = Post.objects.filter(user_id=user_id)
+    posts.filter(deleted_at__isnull=True).update(deleted_at=timezone.now())
+    deleted = 0
+    while post_ids := list(posts.filter(deleted_at__isnull=False).values_list('id', flat=True)[:batch_size]):
+        deleted += purge_posts(post_ids, batch_size)
+
+    # 이 계정이 남긴 반응이 빠지면 카운트가 바뀌는 상대 쪽
+    reacted = set(Like.objects.filter(user_id=user_id).values_list('post_id', flat=True))
+    reacted |= set(Repost.objects.filter(user_id=user_id).values_list('post_id', flat=True))
+    commented = set(Comment.objects.filter(user_id=user_id).values_list('post_id', flat=True))
+    followed = set(Follow.objects.filter(follower_id=user_id).values_list('followee_id', flat=True))
+    followed |= set(Follow.objects.filter(followee_id=user_id).values_list('follower_id', flat=True))
+    notified = set(Notification.objects.filter(from_user_id=user_id, is_read=False).values_list('user_id', flat=True))
+    profile_image = Profile.objects.filter(user_id=user_id).values_list('profile_image', flat=True).first()
+
+    deleted += _purge_rows(User, [user_id], batch_size)
+
+    for chunk in _chunks(reacted, batch_size):
+        counters.reconcile(chunk)
+    for chunk in _chunks(followed, batch_size):
+        services.reconcile_profile_counts(chunk)
+    for chunk in _chunks(notified, batch_size):
+        services.recount_unread_notifications(chunk)
+    for chunk in _chunks(commented, batch_size):
+        # 댓글 미리보기가 들어 있는 카드
+        fragments.invalidate(*chunk)
+    _remove_media([profile_image])
+    return deleted
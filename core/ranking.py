@@ -0,0 +1,127 @@
+# ============================
+# core/ranking.py
+# 시간 감쇠 "hot" 점수 (피드 sort=hot, 사이드바 상위 N)
+# ============================
+# 게시물 점수는 작성 자체(가중치 1)와 좋아요/리포스트/댓글 하나하나를 시각 t 에 일어난 사건으로 보고
+#   hot_score = ln( Σ w_i · e^{(t_i - EPOCH) / τ} )        (τ = 반감기 / ln 2)
+# 로 저장한다. 모든 게시물의 현재 가치에는 같은 e^{-(now - EPOCH)/τ} 가 곱해지므로 저장된 값의 순서가
+# 곧 "지금 시점의 감쇠된 인기" 순서이고, 시간이 흘러도 다시 계산할 필요가 없다.
+# 새 반응은 기존 점수에 항 하나를 더하는 것(log-sum-exp)이라 counters.flush() 에서 증분으로 반영한다.
+# 취소는 취소 시각 기준으로 빼므로 약간 과하게 빠질 수 있어, rescore() 가 주기적으로 정확한 값을 다시 계산한다.
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Comment, Like, Post, Repost
+
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+# counters 의 증감 종류별 가중치
+WEIGHTS = {'like_count': 1.0, 'repost_count': 3.0, 'comments': 2.0}
+
+TOP_POSTS_KEY = 'ranking:top_posts'
+
+
+def _tau():
+    return settings.HOT_SCORE_HALF_LIFE_HOURS * 3600 / math.log(2)
+
+
+def _time(moment):
+    """EPOCH 이후 경과 시간을 τ 단위로."""
+    return (moment - EPOCH).total_seconds() / _tau()
+
+
+def base_score(created_at):
+    """반응이 하나도 없는 게시물의 점수."""
+    return _time(created_at)
+
+
+def _logsumexp(values):
+    peak = max(values)
+    return peak + math.log(sum(math.exp(v - peak) for v in values))
+
+
+# -----------------------------
+# 증분 반영 (counters.flush 에서 호출)
+# -----------------------------
+def apply(events, now=None):
+    """events: [(post_id, field, delta, created_at)]. 해당 게시물들의 hot_score 를 갱신."""
+    now = now or timezone.now()
+    ref = _time(now)
+    increments = {}
+    for post_id, field, delta, created_at in events:
+        weight = WEIGHTS.get(field)
+        if weight:
+            # 기준 시각(now) 대비 선형 공간 값. created_at <= now 이므로 넘치지 않는다
+            increments[post_id] = increments.get(post_id, 0.0) + delta * weight * math.exp(_time(created_at) - ref)
+    if not increments:
+        return 0
+    with transaction.atomic():
+        posts = list(
+            Post.objects.select_for_update().filter(id__in=increments).only('id', 'created_at', 'hot_score')
+        )
+        for post in posts:
+            floor = math.exp(base_score(post.created_at) - ref)
+            value = math.exp(post.hot_score - ref) + increments[post.id]
+            post.hot_score = ref + math.log(max(value, floor))
+        Post.objects.bulk_update(posts, ['hot_score'])
+    refresh_top_posts()
+    return len(posts)
+
+
+# -----------------------------
+# 전체 재계산
+# -----------------------------
+def _exact_scores(post_rows):
+    """[(id, created_at)] -> {id: 정확한 점수}. 반응 테이블을 게시물 묶음 단위로 읽는다."""
+    ids = [post_id for post_id, _ in post_rows]
+    terms = {post_id: [base_score(created_at)] for post_id, created_at in post_rows}
+    for model, field in ((Like, 'like_count'), (Repost, 'repost_count'), (Comment, 'comments')):
+        log_weight = math.log(WEIGHTS[field])
+        for post_id, created_at in model.objects.filter(post_id__in=ids).values_list('post_id', 'created_at').iterator():
+            terms[post_id].append(log_weight + _time(created_at))
+    return {post_id: _logsumexp(values) for post_id, values in terms.items()}
+
+
+def rescore(max_age_days=None, batch_size=500):
+    """최근 max_age_days 일 안의 게시물 점수를 반응 테이블로부터 다시 계산. 갱신한 게시물 수 반환.
+
+    그보다 오래된 게시물은 점수가 이미 충분히 낮아 순위에 영향이 없으므로 건너뛴다 (None 이면 전체).
+    """
+    posts = Post.objects.order_by('id')
+    if max_age_days is not None:
+        posts = posts.filter(created_at__gte=timezone.now() - timedelta(days=max_age_days))
+    updated = 0
+    last_id = 0
+    while True:
+        rows = list(posts.filter(id__gt=last_id).values_list('id', 'created_at')[:batch_size])
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        scores = _exact_scores(rows)
+        with transaction.atomic():
+            updated += Post.objects.bulk_update(
+                [Post(id=post_id, hot_score=score) for post_id, score in scores.items()], ['hot_score']
+            )
+    refresh_top_posts()
+    return updated
+
+
+# -----------------------------
+# 사이드바 상위 N (미리 계산한 id 목록)
+# -----------------------------
+def refresh_top_posts():
+    ids = list(Post.objects.filter(deleted_at__isnull=True).order_by('-hot_score', '-id').values_list('id', flat=True)[:settings.HOT_TOP_POSTS_SIZE])
+    cache.set(TOP_POSTS_KEY, ids, settings.HOT_TOP_POSTS_TIMEOUT)
+    return ids
+
+
+def top_post_ids(limit):
+    ids = cache.get(TOP_POSTS_KEY)
+    if ids is None:
+        ids = refresh_top_posts()
+    return ids[:limit]
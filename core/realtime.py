@@ -0,0 +1,223 @@
+# ============================
+# core/realtime.py
+# Server-Sent Events 용 pub/sub (알림, 좋아요/리포스트 카운트 변화)
+# ============================
+# Hub 는 한 프로세스 안의 구독자(SSE 연결)에게 이벤트를 나눠 준다. 연결마다 asyncio.Queue 하나뿐이라
+# ASGI 워커 하나가 유휴 연결 수천 개를 들고 있어도 스레드를 쓰지 않는다.
+# 발행은 브로커를 거친다.
+#   - memory: 같은 프로세스의 Hub 로 바로 전달 (단일 프로세스 개발용)
+#   - sqlite: 공유 SQLite 파일에 적재하고, 프로세스마다 폴러 하나가 새 행을 읽어 자기 Hub 로 전달.
+#             runworker 처럼 다른 프로세스에서 만든 알림도 웹 프로세스의 연결까지 닿는다.
+# Redis 같은 공유 브로커로 바꿀 때는 publish()/ensure_started() 를 같은 모양으로 구현하면 된다.
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+FEED_CHANNEL = 'posts'
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+# -----------------------------
+# 프로세스 내 Hub
+# -----------------------------
+class Subscription:
+    def __init__(self, hub, channels, loop, maxsize):
+        self.hub = hub
+        self.channels = channels
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        # 느린 클라이언트의 큐가 넘치면 이벤트를 버리고, 다음에 resync 를 보내 전체를 다시 받게 한다
+        self.overflowed = False
+
+    def _deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """다음 이벤트. timeout 안에 없으면 None."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class Hub:
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels, maxsize=None):
+        sub = Subscription(self, tuple(channels), asyncio.get_running_loop(), maxsize or settings.REALTIME_QUEUE_SIZE)
+        with self._lock:
+            for channel in sub.channels:
+                self._subscribers.setdefault(channel, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            for channel in sub.channels:
+                subs = self._subscribers.get(channel)
+                if subs:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subscribers[channel]
+
+    def publish_local(self, channel, event):
+        """어느 스레드에서 불러도 된다. 전달받은 구독자 수 반환."""
+        with self._lock:
+            subs = list(self._subscribers.get(channel, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._deliver, event)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힘 (끊긴 연결)
+                self.unsubscribe(sub)
+        return len(subs)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(set().union(*self._subscribers.values())) if self._subscribers else 0
+
+
+hub = Hub()
+
+
+# -----------------------------
+# 브로커
+# -----------------------------
+class MemoryBroker:
+    def publish(self, channel, event):
+        hub.publish_local(channel, event)
+
+    def ensure_started(self):
+        pass
+
+
+class SQLiteBroker:
+    """여러 프로세스가 공유하는 SQLite 파일을 메시지 로그로 쓴다. 테스트/단일 서버용."""
+
+    RETENTION_SECONDS = 60
+
+    def __init__(self, path, poll_interval):
+        self.path = str(path)
+        self.poll_interval = poll_interval
+        self._pollers = {}
+        self._publishes = 0
+        self._setup_done = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._setup_done:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS events ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+            self._setup_done = True
+        return conn
+
+    def publish(self, channel, event):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT INTO events (channel, payload, created_at) VALUES (?, ?, ?)',
+                    (channel, json.dumps(event), time.time()),
+                )
+                self._publishes += 1
+                if self._publishes % 100 == 0:
+                    conn.execute('DELETE FROM events WHERE created_at < ?', (time.time() - self.RETENTION_SECONDS,))
+        finally:
+            conn.close()
+
+    def _max_id(self):
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+        finally:
+            conn.close()
+
+    def _read_since(self, last_id):
+        conn = self._connect()
+        try:
+            return conn.execute(
+                'SELECT id, channel, payload FROM events WHERE id > ? ORDER BY id', (last_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+    async def _poll(self):
+        # 시작 시점 이후의 이벤트만 전달
+        last_id = await asyncio.to_thread(self._max_id)
+        while True:
+            try:
+                rows = await asyncio.to_thread(self._read_since, last_id)
+            except sqlite3.Error as e:
+                print(f"Realtime broker poll error: {e!r}")
+                rows = []
+            for event_id, channel, payload in rows:
+                last_id = event_id
+                hub.publish_local(channel, json.loads(payload))
+            if not hub.subscriber_count():
+                # 구독자가 없으면 멈춘다. 다음 subscribe() 때 다시 시작
+                return
+            await asyncio.sleep(self.poll_interval)
+
+    def ensure_started(self):
+        # 이벤트 루프마다 폴러 하나 (ASGI 서버에서는 프로세스당 하나)
+        loop = asyncio.get_running_loop()
+        task = self._pollers.get(loop)
+        if task is None or task.done():
+            self._pollers = {l: t for l, t in self._pollers.items() if not t.done()}
+            self._pollers[loop] = loop.create_task(self._poll())
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            if settings.REALTIME_BROKER == 'sqlite':
+                _broker = SQLiteBroker(settings.REALTIME_SQLITE_PATH, settings.REALTIME_POLL_INTERVAL)
+            else:
+                _broker = MemoryBroker()
+        return _broker
+
+
+def publish(channel, event):
+    """이벤트 발행. 실시간 전달은 부가 기능이라 실패해도 호출한 쓰기 작업을 깨지 않는다."""
+    try:
+        get_broker().publish(channel, event)
+    except Exception as e:
+        print(f"Realtime publish error: {e!r}")
+
+
+def publish_on_commit(channel, event):
+    transaction.on_commit(lambda: publish(channel, event))
+
+
+def subscribe(channels):
+    """현재 이벤트 루프에서 channels 를 구독. 반드시 async 코드에서 호출."""
+    get_broker().ensure_started()
+    return hub.subscribe(channels)
+
+
+def format_event(event):
+    """SSE 한 건: 'event: <type>\\ndata: <json>\\n\\n'."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
@@ -0,0 +1,187 @@
+# ============================
+# core/seed.py
+# 벤치마크/부하 시험용 가짜 데이터 생성 (manage.py seed)
+# ============================
+# 실제 서비스처럼 활동이 소수에게 몰리도록 멱법칙(Zipf) 분포를 쓴다:
+#   - 글을 쓰고, 좋아요/리포스트/댓글을 다는 사용자 (activity_alpha)
+#   - 반응을 받는 게시물, 팔로우받는 사용자, 많이 읽힌 책 (popularity_alpha)
+# 모든 행은 bulk_create 로 batch_size 씩 넣고, 시그널/서비스를 거치지 않으므로
+# 비정규화 카운터, hot 점수, 안 읽은 알림 수, 도서 검색 인덱스, 홈 타임라인은 마지막에 한 번에 다시 계산한다.
+import random
+from bisect import bisect
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from . import book_index, book_search, counters, ranking, services, timeline
+from .models import Book, Comment, Follow, Like, Notification, Post, Profile, Repost
+
+PASSWORD = 'readlog-seed'
+
+_TITLE_WORDS = ['밤', '바다', '작별', '소년', '빛', '여름', '기억', '도시', '편지', '정원', '시간', '고양이',
+                'Silent', 'River', 'Winter', 'Garden', 'Letters', 'Light', 'House', 'Stranger']
+_SURNAMES = ['김', '이', '박', '최', '정', '강', '조', '윤', '장', '임', 'Smith', 'Garcia', 'Tanaka']
+_GIVEN_NAMES = ['하늘', '서연', '민준', '지우', '도윤', '수아', '하린', 'Anna', 'Kenji', 'Maria', 'Leo']
+_SENTENCES = ['오늘은 여기까지 읽었다.', '문장이 오래 남는다.', '두 번째 읽는 중.', '결말이 의외였다.',
+              '추천받아 읽기 시작했다.', 'Could not put it down.', '밑줄 긋고 싶은 문장이 많다.']
+
+
+class PowerLaw:
+    """items 중 하나를 순위 k 에 1/k^alpha 비례하는 확률로 고른다 (alpha=0 이면 균등)."""
+
+    def __init__(self, items, alpha, rng):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum_weights = list(accumulate(1 / (k + 1) ** alpha for k in range(len(self.items))))
+        self.rng = rng
+
+    def pick(self):
+        return self.items[bisect(self.cum_weights, self.rng.random() * self.cum_weights[-1])]
+
+
+def _insert(model, objs, batch_size, times=None):
+    """bulk_create 후, auto_now_add 로 덮인 created_at 을 times 로 되돌린다."""
+    created = model.objects.bulk_create(objs, batch_size=batch_size)
+    if times:
+        for obj, created_at in zip(created, times):
+            obj.created_at = created_at
+        model.objects.bulk_update(created, ['created_at'], batch_size=batch_size)
+    return created
+
+
+def _pairs(count, pick_a, pick_b, rng, exclude_self=False):
+    """(a, b) 쌍을 중복 없이 최대 count 개. 분포가 좁아 더 못 만들면 거기서 멈춘다."""
+    pairs = set()
+    attempts = 0
+    while len(pairs) < count and attempts < count * 10:
+        attempts += 1
+        pair = (pick_a(), pick_b())
+        if exclude_self and pair[0] == pair[1]:
+            continue
+        pairs.add(pair)
+    return sorted(pairs)
+
+
+def seed(users=100, books=200, posts=1000, likes=5000, reposts=500, comments=2000, follows=1000,
+         notifications=2000, days=90, activity_alpha=1.1, popularity_alpha=1.2, batch_size=1000,
+         random_seed=None, build_timelines=True, log=print):
+    """가짜 데이터를 만들고 종류별 생성 개수 dict 를 반환."""
+    rng = random.Random(random_seed)
+    now = timezone.now()
+    start = now - timedelta(days=days)
+
+    def after(moment):
+        return moment + (now - moment) * rng.random()
+
+    # 사용자 + 프로필 (비밀번호 해시는 한 번만 계산)
+    password = make_password(PASSWORD)
+    offset = User.objects.count()
+    user_objs = _insert(User, [
+        User(username=f'seed{offset + i}@readlog.test', email=f'seed{offset + i}@readlog.test', password=password)
+        for i in range(users)
+    ], batch_size)
+    _insert(Profile, [
+        Profile(user=u, nickname=f'{rng.choice(_SURNAMES)}{rng.choice(_GIVEN_NAMES)}{u.id}') for u in user_objs
+    ], batch_size)
+    user_ids = [u.id for u in user_objs]
+    log(f'users: {len(user_ids)}')
+
+    # bulk_create 는 pre_save 를 거치지 않으므로 식별 key 를 직접 채우고, 이미 있는 key 는 건너뛴다
+    existing_keys = set(Book.objects.values_list('normalized_key', flat=True))
+    new_books = {}
+    for _ in range(books):
+        title = ' '.join(rng.sample(_TITLE_WORDS, rng.randint(1, 3)))
+        author = f'{rng.choice(_SURNAMES)}{rng.choice(_GIVEN_NAMES)}'
+        key = book_search.book_key(title, author)
+        if key not in existing_keys:
+            new_books[key] = Book(
+                title=title, author=author, normalized_key=key,
+                isbn=f'979{rng.randrange(10 ** 9, 10 ** 10)}' if rng.random() < 0.7 else None,
+            )
+    book_objs = _insert(Book, list(new_books.values()), batch_size)
+    log(f'books: {len(book_objs)}')
+
+    authors = PowerLaw(user_ids, activity_alpha, rng)
+    popular_books = PowerLaw(book_objs, popularity_alpha, rng) if book_objs else None
+    post_objs, post_times = [], []
+    for _ in range(posts):
+        book = popular_books.pick() if popular_books and rng.random() < 0.9 else None
+        post_objs.append(Post(
+            user_id=authors.pick(),
+            book=book,
+            book_cover_url_snapshot=book.cover_url if book else None,
+            text=' '.join(rng.sample(_SENTENCES, rng.randint(1, 3))),
+        ))
+        post_times.append(after(start))
+    post_objs = _insert(Post, post_objs, batch_size, post_times)
+    log(f'posts: {len(post_objs)}')
+    if not post_objs:
+        return {'users': len(user_ids), 'books': len(book_objs), 'posts': 0}
+
+    post_by_id = {p.id: p for p in post_objs}
+    actors = PowerLaw(user_ids, activity_alpha, rng)
+    popular_posts = PowerLaw(list(post_by_id), popularity_alpha, rng)
+    popular_users = PowerLaw(user_ids, popularity_alpha, rng)
+    events = []  # 알림 후보: (받는 사람, 종류, 보낸 사람, 게시물, 시각)
+
+    def relation(model, count, kind):
+        pairs = _pairs(count, actors.pick, popular_posts.pick, rng)
+        times = [after(post_by_id[post_id].created_at) for _, post_id in pairs]
+        _insert(model, [model(user_id=u, post_id=p) for u, p in pairs], batch_size, times)
+        for (user_id, post_id), created_at in zip(pairs, times):
+            events.append((post_by_id[post_id].user_id, kind, user_id, post_id, created_at))
+        log(f'{model._meta.db_table}: {len(pairs)}')
+        return len(pairs)
+
+    created = {
+        'users': len(user_ids),
+        'books': len(book_objs),
+        'posts': len(post_objs),
+        'likes': relation(Like, likes, 'like'),
+        'reposts': relation(Repost, reposts, 'repost'),
+    }
+
+    comment_objs, comment_times = [], []
+    for _ in range(comments):
+        post_id = popular_posts.pick()
+        user_id = actors.pick()
+        comment_objs.append(Comment(user_id=user_id, post_id=post_id, text=rng.choice(_SENTENCES)))
+        comment_times.append(after(post_by_id[post_id].created_at))
+        events.append((post_by_id[post_id].user_id, 'comment', user_id, post_id, comment_times[-1]))
+    created['comments'] = len(_insert(Comment, comment_objs, batch_size, comment_times))
+    log(f'comments: {created["comments"]}')
+
+    follow_pairs = _pairs(follows, actors.pick, popular_users.pick, rng, exclude_self=True)
+    follow_times = [after(start) for _ in follow_pairs]
+    _insert(Follow, [Follow(follower_id=a, followee_id=b) for a, b in follow_pairs], batch_size, follow_times)
+    events.extend((b, 'follow', a, None, t) for (a, b), t in zip(follow_pairs, follow_times))
+    created['follows'] = len(follow_pairs)
+    log(f'follows: {len(follow_pairs)}')
+
+    # 알림: 실제 활동 중 일부. 오래된 것일수록 읽은 상태
+    events = [e for e in events if e[0] != e[2]]
+    sample = rng.sample(events, min(notifications, len(events)))
+    notif_times = [e[4] for e in sample]
+    _insert(Notification, [
+        Notification(user_id=to_id, notification_type=kind, from_user_id=from_id, post_id=post_id,
+                     is_read=created_at < now - timedelta(days=rng.uniform(0, 7)))
+        for to_id, kind, from_id, post_id, created_at in sample
+    ], batch_size, notif_times)
+    created['notifications'] = len(sample)
+    log(f'notifications: {len(sample)}')
+
+    # 비정규화 값 다시 계산 (id 목록이 SQLite 변수 개수 제한을 넘을 수 있어 전체를 대상으로)
+    counters.reconcile()
+    ranking.rescore()
+    services.reconcile_profile_counts()
+    services.recount_unread_notifications()
+    if book_index.available():
+        book_index.rebuild()
+    if build_timelines:
+        for follower_id, followee_id in follow_pairs:
+            timeline.backfill(follower_id, followee_id)
+        log('timelines backfilled')
+    return created
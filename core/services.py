@@ -4,43 +4,34 @@
 # Django ORM을 사용하는 새로운 데이터 서비스 레이어
 # ============================
 import os
-import csv
-import requests # New import
-from django.db import transaction
-from django.db.models import F
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Count, IntegerField, OuterRef, Subquery, Value, Window
+from django.db.models.functions import Coalesce, Greatest, RowNumber
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
-from .models import Profile, Book, Post, Like, Repost, Comment, Notification, Follow
+from django.utils import timezone
+from .models import Profile, Book, Post, Like, Repost, Comment, Notification, NotificationActor, Follow
+from .pagination import apaginate, paginate
+from . import book_index, book_search, books, counters, covers, exporters, fragments, images, jobs, ranking, realtime, timeline, viewer_state
 
 # -----------------------------
 # 내부 유틸: 게시글 CSV 미러 저장
 # -----------------------------
-def export_posts_to_csv(csv_path=os.path.join("data", "posts.csv")):
-    """감사/백업용 CSV 미러 저장."""
-    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
-    
-    posts = Post.objects.select_related('user__profile', 'book').order_by('-created_at')
-    
-    cols = ["id","created_at","user_id","nickname","text","user_photo", # Changed user_photo_url to user_photo
-            "book_title","book_author","book_cover_url_snapshot","like_count","repost_count"]
-            
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
-        wr = csv.writer(f)
-        wr.writerow(cols)
-        for p in posts:
-            wr.writerow([
-                p.id,
-                p.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                p.user.id,
-                p.user.profile.nickname,
-                p.text,
-                p.user_photo.url if p.user_photo else "", # Correctly handle ImageField
-                p.book.title if p.book else "",
-                p.book.author if p.book else "",
-                p.book_cover_url_snapshot,
-                p.like_count,
-                p.repost_count,
-            ])
+def export_posts_to_csv(csv_path=os.path.join("data", "posts.csv"), incremental=False):
+    """감사/백업용 CSV 미러 저장. incremental 이면 지난번 이후 새 게시물만 덧붙인다 (core/exporters.py)."""
+    return exporters.export_to_file(csv_path, 'csv', incremental=incremental)
+
+def _queue_csv_mirror(incremental=False):
+    """게시물이 바뀌면 CSV 미러를 갱신한다. 잠시 모아서 한 번만 (같은 key 의 대기 작업은 하나).
+
+    새 게시물은 덧붙이기만, 수정/삭제는 전체를 다시 쓴다.
+    """
+    if settings.POSTS_CSV_MIRROR:
+        key = 'exports.posts_csv:' + ('append' if incremental else 'full')
+        jobs.enqueue('exports.posts_csv', {'incremental': incremental}, key=key, delay=settings.POSTS_CSV_MIRROR_DELAY)
 
 # -----------------------------
 # 사용자(회원) 관련
@@ -66,240 +57,458 @@ def toggle_follow(follower_id, followee_id):
     follow, created = Follow.objects.get_or_create(follower=follower, followee=followee)
 
     if created:
+        _adjust_profile_counts(follower_id, following_count=+1)
+        _adjust_profile_counts(followee_id, follower_count=+1)
+        jobs.enqueue('timeline.backfill', {'follower_id': follower_id, 'followee_id': followee_id})
         # Add notification for the followee
-        add_notification(to_user_id=followee_id, notif_type='follow', from_user_id=follower_id)
-        return True, followee.followers.count() # 팔로우 추가됨, 새 팔로워 수
+        queue_notification(to_user_id=followee_id, notif_type='follow', from_user_id=follower_id)
+        return True, _follower_count(followee_id) # 팔로우 추가됨, 새 팔로워 수
     else:
         follow.delete()
-        return False, followee.followers.count() # 팔로우 취소됨, 새 팔로워 수
+        _adjust_profile_counts(follower_id, following_count=-1)
+        _adjust_profile_counts(followee_id, follower_count=-1)
+        timeline.remove_followee(follower_id, followee_id)
+        return False, _follower_count(followee_id) # 팔로우 취소됨, 새 팔로워 수
+
+def _follower_count(user_id):
+    return Profile.objects.filter(user_id=user_id).values_list('follower_count', flat=True).first() or 0
 
 def is_following(follower_id, followee_id):
     return Follow.objects.filter(follower_id=follower_id, followee_id=followee_id).exists()
 
 def get_follower_count(user_id):
+    """정확한 값 (COUNT). 화면 표시는 Profile.follower_count 를 쓴다."""
     return Follow.objects.filter(followee_id=user_id).count()
 
 def get_following_count(user_id):
     return Follow.objects.filter(follower_id=user_id).count()
 
+# -----------------------------
+# 프로필 카운트 (비정규화)
+# -----------------------------
+def _adjust_profile_counts(user_id, **deltas):
+    """Profile 카운트 컬럼을 원자적으로 증감. 0 아래로는 내려가지 않는다."""
+    Profile.objects.filter(user_id=user_id).update(
+        **{field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()}
+    )
+
+def _count_subquery(queryset, field):
+    counts = queryset.filter(**{field: OuterRef('user_id')}).values(field).annotate(n=Count('id')).values('n')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+def reconcile_profile_counts(user_ids=None):
+    """follows / posts 로부터 팔로워/팔로잉/게시물 수를 다시 계산한다. 갱신한 프로필 수 반환."""
+    profiles = Profile.objects.all()
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+    return profiles.update(
+        follower_count=_count_subquery(Follow.objects.all(), 'followee_id'),
+        following_count=_count_subquery(Follow.objects.all(), 'follower_id'),
+        post_count=_count_subquery(Post.objects.filter(deleted_at__isnull=True), 'user_id'),
+    )
+
 # -----------------------------
 # 알림 관련
 # -----------------------------
 def unread_notifications_count(user_id):
+    """정확한 값 (COUNT). 화면 표시는 Profile.unread_notification_count 를 쓴다."""
     return Notification.objects.filter(user_id=user_id, is_read=False).count()
 
+def _adjust_unread_count(user_id, delta):
+    _adjust_profile_counts(user_id, unread_notification_count=delta)
+
+@transaction.atomic
 def mark_all_notifications_read(user_id):
-    Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+    marked = Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+    # 0 으로 덮어쓰지 않고 읽음 처리한 만큼만 빼서, 그 사이 새로 생긴 알림 수는 남긴다
+    if marked:
+        _adjust_unread_count(user_id, -marked)
+        # 다른 탭/기기의 배지도 갱신
+        transaction.on_commit(lambda: _publish_unread_count(user_id))
+
+def recount_unread_notifications(user_ids=None):
+    """notifications 테이블로부터 unread_notification_count 를 다시 계산한다. 갱신한 프로필 수 반환."""
+    profiles = Profile.objects.all()
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+    return profiles.update(
+        unread_notification_count=_count_subquery(Notification.objects.filter(is_read=False), 'user_id')
+    )
 
 def add_notification(to_user_id, notif_type, from_user_id, post_id=None):
+    """알림 생성. 아직 읽지 않은 같은 종류/게시물 알림이 있으면 새 행 대신 합친다 ("A님 외 12명").
+
+    (notification, created) 반환. 자기 자신에게는 만들지 않는다 (None, False).
+    """
     if to_user_id == from_user_id:
+        return None, False
+    with transaction.atomic():
+        existing = (
+            Notification.objects.select_for_update()
+            .filter(user_id=to_user_id, notification_type=notif_type, post_id=post_id, is_read=False)
+            .order_by('-created_at')
+            .first()
+        )
+        if existing is None:
+            notification = Notification.objects.create(
+                user_id=to_user_id,
+                notification_type=notif_type,
+                from_user_id=from_user_id,
+                post_id=post_id
+            )
+            NotificationActor.objects.create(notification=notification, user_id=from_user_id)
+            _adjust_unread_count(to_user_id, +1)
+            transaction.on_commit(lambda: _publish_notification(notification.id, coalesced=False))
+            return notification, True
+        updates = {'from_user_id': from_user_id, 'created_at': timezone.now()}
+        _, new_actor = NotificationActor.objects.get_or_create(notification=existing, user_id=from_user_id)
+        if new_actor:
+            # 이미 반응한 사람이 다시 누른 경우(취소 후 다시 누름, A->B->A)는 세지 않는다
+            updates['actor_count'] = F('actor_count') + 1
+        Notification.objects.filter(id=existing.id).update(**updates)
+        transaction.on_commit(lambda: _publish_notification(existing.id, coalesced=True))
+        return existing, False
+
+def _publish_notification(notification_id, coalesced):
+    """받는 사람의 SSE 연결로 알림 한 건과 새 미확인 수를 보낸다 (coalesced 면 기존 항목 교체)."""
+    notification = Notification.objects.select_related('from_user__profile').filter(id=notification_id).first()
+    if notification is None:
         return
-    Notification.objects.create(
-        user_id=to_user_id,
-        notification_type=notif_type,
-        from_user_id=from_user_id,
-        post_id=post_id
-    )
+    realtime.publish(realtime.user_channel(notification.user_id), {
+        'type': 'notification',
+        'notification': notification.to_dict(),
+        'coalesced': coalesced,
+        'unread_count': _stored_unread_count(notification.user_id),
+    })
+
+def _stored_unread_count(user_id):
+    return Profile.objects.filter(user_id=user_id).values_list('unread_notification_count', flat=True).first() or 0
+
+def _publish_unread_count(user_id):
+    realtime.publish(realtime.user_channel(user_id), {'type': 'unread', 'unread_count': _stored_unread_count(user_id)})
+
+def list_notifications(user_id, limit=20, cursor=None):
+    """최신순 알림 한 페이지. (notifications, next_cursor) 반환. 잘못된 커서는 InvalidCursor."""
+    return paginate(_notifications(user_id), ('created_at', 'id'), limit, cursor)
+
+def _notifications(user_id):
+    return Notification.objects.filter(
+        Q(post__isnull=True) | Q(post__deleted_at__isnull=True), user_id=user_id, from_user__is_active=True,
+    ).select_related('from_user__profile')
+
+def prune_notifications(older_than_days=None, batch_size=1000):
+    """보존 기간이 지난 읽은 알림을 batch_size 개씩 지운다. 지운 개수 반환."""
+    days = older_than_days if older_than_days is not None else settings.NOTIFICATION_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+    expired = Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+    total = 0
+    while True:
+        # 한 번에 오래 잠그지 않도록 나눠서 삭제
+        ids = list(expired.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return total
+        # 합쳐진 알림의 NotificationActor 행도 같이 지워지므로 알림 수만 센다
+        _, deleted = Notification.objects.filter(id__in=ids).delete()
+        total += deleted.get(Notification._meta.label, 0)
+
+def queue_notification(to_user_id, notif_type, from_user_id, post_id=None):
+    """알림 생성을 작업 큐로 넘긴다 (커밋 후 워커가 add_notification 실행)."""
+    if to_user_id == from_user_id:
+        return
+    jobs.enqueue('notifications.add', {
+        'to_user_id': to_user_id,
+        'notif_type': notif_type,
+        'from_user_id': from_user_id,
+        'post_id': post_id,
+    })
 
 # -----------------------------
 # 책(도서) 관련
 # -----------------------------
 def save_book_if_needed(title, author, cover_url, isbn=None):
-    """같은 제목+저자 책이 있으면 재사용, 없으면 생성 후 객체 반환"""
-    book, created = Book.objects.get_or_create(
-        title=title, 
-        author=author,
-        defaults={'cover_url': cover_url, 'isbn': isbn}
-    )
-    return book
+    """ISBN 또는 정규화한 제목+저자가 같은 책이 있으면 재사용, 없으면 생성 후 객체 반환 (core/books.py)"""
+    return books.resolve(title, author, cover_url, isbn)
 
 # -----------------------------
 # 게시물(Post) 관련
 # -----------------------------
+@transaction.atomic
 def create_post(user_id, book_id, user_photo, book_cover_url_snapshot, text):
-    Post.objects.create(
+    """user_photo 는 EXIF 제거/크기 제한을 거쳐 저장된다. 이미지가 잘못되면 ValidationError."""
+    if user_photo:
+        user_photo = images.normalize_upload(user_photo)
+    post = Post.objects.create(
         user_id=user_id,
         book_id=book_id,
         user_photo=user_photo,
         book_cover_url_snapshot=book_cover_url_snapshot,
-        text=text
+        text=text,
+        hot_score=ranking.base_score(timezone.now()),
     )
+    _adjust_profile_counts(user_id, post_count=+1)
+    jobs.enqueue('timeline.fan_out_post', {'post_id': post.id})
+    covers.queue_fetch(book_cover_url_snapshot)
+    _queue_csv_mirror(incremental=True)
+    return post
 
-# ...
-
-def update_post(user_id, post_id, new_text=None, new_user_photo=None):
-    """작성자만 수정 가능"""
-    post = Post.objects.filter(id=post_id, user_id=user_id).first()
-    if not post:
-        return False
-    
-    if new_text is not None:
-        post.text = new_text
-    if new_user_photo is not None:
-        post.user_photo = new_user_photo
-        
-    post.save(update_fields=['text', 'user_photo'])
-    return True
-
-def list_posts(limit=50, offset=0, sort: str = "latest"):
-    """피드용 목록."""
-    order_by = '-created_at'
-    if sort == 'bookup':
-        order_by = '-repost_count'
-        
-    return Post.objects.select_related('user__profile', 'book').order_by(order_by, '-created_at')[offset:offset+limit]
+@transaction.atomic
+def import_posts(user_id, entries):
+    """가져오기용 일괄 작성 (core/importers.py). entries: [{'title', 'author', 'isbn', 'cover_url', 'text', 'created_at'}]
+
+    책은 묶음으로 식별하고 게시물은 bulk_create 한 번으로 넣는다. 지난 기록이므로 팔로워 타임라인으로
+    fan-out 하지 않는다 (팔로우할 때의 backfill 에는 포함된다).
+    """
+    now = timezone.now()
+    book_list = books.resolve_many(entries)
+    posts = Post.objects.bulk_create([
+        Post(
+            user_id=user_id,
+            book_id=book.id if book else None,
+            book_cover_url_snapshot=entry['cover_url'] or (book.cover_url if book else None),
+            text=entry['text'],
+            created_at=entry['created_at'] or now,
+            hot_score=ranking.base_score(entry['created_at'] or now),
+        )
+        for entry, book in zip(entries, book_list)
+    ])
+    _adjust_profile_counts(user_id, post_count=+len(posts))
+    for url in {post.book_cover_url_snapshot for post in posts if post.book_cover_url_snapshot}:
+        covers.queue_fetch(url)
+    _queue_csv_mirror(incremental=True)
+    return posts
+
+POST_SORT_KEYS = {
+    'latest': ('created_at', 'id'),
+    'bookup': ('repost_count', 'created_at', 'id'),
+    'hot': ('hot_score', 'id'),
+}
+
+def list_posts(limit=50, cursor=None, sort: str = "latest"):
+    """피드용 목록. (posts, next_cursor) 반환.
+
+    cursor 는 이전 페이지가 돌려준 불투명 문자열이며, 정렬 키 기준 키셋 페이지네이션을 한다.
+    """
+    fields = POST_SORT_KEYS.get(sort, POST_SORT_KEYS['latest'])
+    queryset = Post.objects.filter(deleted_at__isnull=True).select_related('user__profile', 'book')
+    return paginate(queryset, fields, limit, cursor)
+
+def home_timeline(user_id, limit=20, cursor=None):
+    """팔로우 피드. (posts, next_cursor) 반환."""
+    return timeline.home_timeline(user_id, limit=limit, cursor=cursor)
 
 def top_bookup_posts(limit: int = 5):
-    """사이드바용: BookUp 많은 게시물 상위 N개."""
-    return Post.objects.select_related('user__profile', 'book').order_by('-repost_count', '-created_at')[:limit]
+    """사이드바용: hot 점수 상위 N개. 미리 계산해 둔 id 목록을 쓰므로 정렬 쿼리가 없다."""
+    ids = ranking.top_post_ids(limit)
+    posts = Post.objects.filter(deleted_at__isnull=True).select_related('user__profile', 'book').in_bulk(ids)
+    return [posts[post_id] for post_id in ids if post_id in posts]
 
 def get_post(post_id):
-    return Post.objects.filter(id=post_id).first()
+    return Post.objects.filter(id=post_id, deleted_at__isnull=True).first()
 
 def update_post(user_id, post_id, new_text=None, new_user_photo=None):
     """작성자만 수정 가능"""
-    post = Post.objects.filter(id=post_id, user_id=user_id).first()
+    post = Post.objects.filter(id=post_id, user_id=user_id, deleted_at__isnull=True).first()
     if not post:
         return False
     
     if new_text is not None:
         post.text = new_text
+    old_photo = post.user_photo.name
     if new_user_photo is not None:
-        post.user_photo = new_user_photo
+        post.user_photo = images.normalize_upload(new_user_photo)
         
-    post.save(update_fields=['text', 'user_photo'])
+    post.save(update_fields=['text', 'user_photo', 'user_photo_variants'])
+    if old_photo and old_photo != post.user_photo.name:
+        # 이전 사진의 참조를 놓는다 (core/media_storage.py)
+        post.user_photo.storage.delete(old_photo)
+    fragments.invalidate(post_id)
+    _queue_csv_mirror()
     return True
 
+@transaction.atomic
 def delete_post(user_id, post_id):
-    """작성자만 삭제 가능"""
-    post = Post.objects.filter(id=post_id, user_id=user_id).first()
-    if post:
-        # 로컬 이미지 삭제 로직은 스토리지 설정에 따라 달라지므로 여기서는 생략
-        post.delete()
-        return True
-    return False
+    """작성자만 삭제 가능. 목록에서 바로 숨기고, 행과 사진 파일은 'purge.post' 작업이 지운다 (core/purge.py)."""
+    posts = Post.objects.filter(id=post_id, user_id=user_id, deleted_at__isnull=True)
+    if not _hide_posts(posts):
+        return False
+    _adjust_profile_counts(user_id, post_count=-1)
+    jobs.enqueue('purge.post', {'post_id': post_id}, key=f'purge.post:{post_id}')
+    _queue_csv_mirror()
+    return True
+
+def _hide_posts(posts):
+    """posts(쿼리셋)에 삭제 표시. 이 게시물들에 대한 읽지 않은 알림은 읽음 처리해 받는 사람의 카운트를 줄인다.
+
+    숨긴 게시물 수 반환. (캐시된 카드 조각은 목록에 다시 나오지 않으므로 지울 때 함께 정리한다)
+    """
+    notifications = Notification.objects.filter(post_id__in=posts.values('id'), is_read=False)
+    unread = notifications.values('user_id').annotate(n=Count('id')).values_list('user_id', 'n')
+    for to_user_id, n in unread:
+        _adjust_unread_count(to_user_id, -n)
+    notifications.update(is_read=True)
+    return posts.update(deleted_at=timezone.now())
+
+@transaction.atomic
+def delete_account(user_id):
+    """탈퇴. 로그인을 막고 게시물을 바로 숨긴다. 나머지 행과 파일은 'purge.user' 작업이 지운다 (core/purge.py)."""
+    if not User.objects.filter(id=user_id, is_active=True).update(is_active=False):
+        return False
+    _hide_posts(Post.objects.filter(user_id=user_id, deleted_at__isnull=True))
+    Profile.objects.filter(user_id=user_id).update(post_count=0)
+    jobs.enqueue('purge.user', {'user_id': user_id}, key=f'purge.user:{user_id}')
+    _queue_csv_mirror()
+    return True
 
 # -----------------------------
 # 좋아요 / 책갈피(리포스트)
 # -----------------------------
+def _post_owner_id(post_id):
+    """삭제되었거나 없는 게시물이면 Post.DoesNotExist."""
+    return Post.objects.values_list('user_id', flat=True).get(id=post_id, deleted_at__isnull=True)
+
 @transaction.atomic
+def _toggle_relation(model, counter_field, user_id, post_id):
+    """좋아요/리포스트 공통 토글. Post 행을 잠그지 않고 카운터 증감만 기록. created 여부 반환."""
+    deleted, _ = model.objects.filter(user_id=user_id, post_id=post_id).delete()
+    if deleted:
+        counters.record(post_id, counter_field, -1)
+        return False
+    try:
+        with transaction.atomic():
+            model.objects.create(user_id=user_id, post_id=post_id)
+    except IntegrityError:
+        # 같은 요청이 동시에 들어와 이미 생성됨
+        return True
+    counters.record(post_id, counter_field, +1)
+    return True
+
+def _publish_count(post_id, field, value):
+    """피드를 보고 있는 사람들에게 카운트 변화를 보낸다."""
+    realtime.publish_on_commit(realtime.FEED_CHANNEL, {'type': 'counts', 'post_id': post_id, field: value})
+
 def toggle_like(user_id, post_id):
-    """이미 눌렀으면 취소, 아니면 +1. 원자적 트랜잭션으로 처리."""
-    post = Post.objects.select_for_update().get(id=post_id) # Lock the post for update
-    like, created = Like.objects.get_or_create(user_id=user_id, post=post)
-    
-    if created:
-        post.like_count = F('like_count') + 1
-        post.save(update_fields=['like_count'])
-        post.refresh_from_db() # Get the updated like_count
+    """이미 눌렀으면 취소, 아니면 +1. (liked, 근사 좋아요 수) 반환."""
+    owner_id = _post_owner_id(post_id)
+    liked = _toggle_relation(Like, 'like_count', user_id, post_id)
+    viewer_state.invalidate(user_id, post_id)
+    if liked:
         # Add notification for the post owner
-        add_notification(to_user_id=post.user.id, notif_type='like', from_user_id=user_id, post_id=post_id)
-        return True, post.like_count # 좋아요 추가됨, 새 좋아요 수
-    else:
-        like.delete()
-        post.like_count = F('like_count') - 1
-        post.save(update_fields=['like_count'])
-        post.refresh_from_db() # Get the updated like_count
-        return False, post.like_count # 좋아요 취소됨, 새 좋아요 수
+        queue_notification(to_user_id=owner_id, notif_type='like', from_user_id=user_id, post_id=post_id)
+    like_count = counters.approximate(post_id, 'like_count')
+    _publish_count(post_id, 'like_count', like_count)
+    return liked, like_count
 
-@transaction.atomic
 def toggle_repost(user_id, post_id):
-    """책갈피(리포스트) 토글. 원자적 트랜잭션으로 처리."""
-    post = Post.objects.select_for_update().get(id=post_id) # Lock the post for update
-    repost, created = Repost.objects.get_or_create(user_id=user_id, post=post)
-
-    if created:
-        post.repost_count = F('repost_count') + 1
-        post.save(update_fields=['repost_count'])
-        post.refresh_from_db() # Get the updated repost_count
+    """책갈피(리포스트) 토글. (reposted, 근사 리포스트 수) 반환."""
+    owner_id = _post_owner_id(post_id)
+    reposted = _toggle_relation(Repost, 'repost_count', user_id, post_id)
+    viewer_state.invalidate(user_id, post_id)
+    if reposted:
+        jobs.enqueue('timeline.fan_out_repost', {'user_id': user_id, 'post_id': post_id})
         # Add notification for the post owner
-        add_notification(to_user_id=post.user.id, notif_type='repost', from_user_id=user_id, post_id=post_id)
-        return True, post.repost_count # 리포스트 추가됨, 새 리포스트 수
+        queue_notification(to_user_id=owner_id, notif_type='repost', from_user_id=user_id, post_id=post_id)
     else:
-        repost.delete()
-        post.repost_count = F('repost_count') - 1
-        post.save(update_fields=['repost_count'])
-        post.refresh_from_db() # Get the updated repost_count
-        return False, post.repost_count # 리포스트 취소됨, 새 리포스트 수
+        timeline.retract_repost(user_id, post_id)
+    repost_count = counters.approximate(post_id, 'repost_count')
+    _publish_count(post_id, 'repost_count', repost_count)
+    return reposted, repost_count
 
 # -----------------------------
 # 댓글
 # -----------------------------
 def add_comment(user_id, post_id, text):
-    post = Post.objects.get(id=post_id)
-    comment = Comment.objects.create(user_id=user_id, post=post, text=text)
-    # Add notification for the post owner
-    add_notification(to_user_id=post.user.id, notif_type='comment', from_user_id=user_id, post_id=post_id)
+    """삭제되었거나 없는 게시물이면 Post.DoesNotExist."""
+    owner_id = _post_owner_id(post_id)
+    comment = Comment.objects.create(user_id=user_id, post_id=post_id, text=text)
+    _comment_added(user_id, post_id, owner_id)
     return comment
 
+def _comment_added(user_id, post_id, owner_id):
+    fragments.invalidate(post_id)
+    counters.record(post_id, 'comments', +1)
+    viewer_state.invalidate(user_id, post_id)
+    # Add notification for the post owner
+    queue_notification(to_user_id=owner_id, notif_type='comment', from_user_id=user_id, post_id=post_id)
+
 def list_comments(post_id):
-    return Comment.objects.filter(post_id=post_id).select_related('user__profile').order_by('created_at')
+    return Comment.objects.filter(post_id=post_id, user__is_active=True).select_related('user__profile').order_by('created_at')
+
+def list_comments_batch(post_ids, per_post=3):
+    """여러 게시물의 최신 댓글 N개와 전체 댓글 수를 윈도 함수 쿼리 한 번으로 조회.
+
+    {post_id: {'comments': [오래된→최신 순 Comment], 'total': int}} 반환.
+    """
+    post_ids = list(post_ids)
+    result = {post_id: {'comments': [], 'total': 0} for post_id in post_ids}
+    if not post_ids:
+        return result
+    comments = Comment.objects.filter(post_id__in=post_ids, user__is_active=True).annotate(
+        row_number=Window(
+            expression=RowNumber(),
+            partition_by=[F('post_id')],
+            order_by=[F('created_at').desc(), F('id').desc()],
+        ),
+        total=Window(expression=Count('id'), partition_by=[F('post_id')]),
+    ).filter(row_number__lte=per_post).select_related('user__profile').order_by('post_id', 'created_at', 'id')
+    for comment in comments:
+        entry = result[comment.post_id]
+        entry['comments'].append(comment)
+        entry['total'] = comment.total
+    return result
 
 # -----------------------------
 # 프로필용 쿼리
 # -----------------------------
-def my_posts(user_id):
-    return Post.objects.filter(user_id=user_id).select_related('book').order_by('-created_at')
+def my_posts(user_id, limit=12, cursor=None):
+    """프로필 '내 포스팅' 한 페이지. (posts, next_cursor) 반환."""
+    posts = Post.objects.filter(user_id=user_id, deleted_at__isnull=True).select_related('user__profile', 'book')
+    return paginate(posts, ('created_at', 'id'), limit, cursor)
 
-def my_reposts(user_id):
-    return Repost.objects.filter(user_id=user_id).select_related(
-        'post__user__profile', 'post__book'
-    ).order_by('-created_at')
+def my_reposts(user_id, limit=12, cursor=None):
+    """프로필 'Book Up' 한 페이지. (reposts, next_cursor) 반환."""
+    reposts = Repost.objects.filter(user_id=user_id, post__deleted_at__isnull=True).select_related('post__user__profile', 'post__book')
+    return paginate(reposts, ('created_at', 'id'), limit, cursor)
+
+# -----------------------------
+# 비동기 뷰용 (ASGI, core/views.py 의 상호작용 API)
+# -----------------------------
+# 조회와 한 문장짜리 쓰기는 async ORM 으로 바로 한다. 여러 문장을 한 트랜잭션으로 묶거나 커밋 후 훅
+# (작업 적재, 실시간 이벤트)이 필요한 토글은 동기 함수를 sync_to_async 로 통째로 실행한다.
+# async ORM 은 트랜잭션을 지원하지 않고, atomic / on_commit 은 같은 스레드의 연결 위에서만 의미가 있기 때문이다.
+atoggle_like = sync_to_async(toggle_like)
+atoggle_repost = sync_to_async(toggle_repost)
+atoggle_follow = sync_to_async(toggle_follow)
+amark_all_notifications_read = sync_to_async(mark_all_notifications_read)
+
+async def aadd_comment(user_id, post_id, text):
+    """add_comment 의 async 버전. 작성자 프로필까지 불러온 Comment 반환."""
+    owner_id = await Post.objects.values_list('user_id', flat=True).aget(id=post_id, deleted_at__isnull=True)
+    comment = await Comment.objects.acreate(user_id=user_id, post_id=post_id, text=text)
+    await sync_to_async(_comment_added)(user_id, post_id, owner_id)
+    return await Comment.objects.select_related('user__profile').aget(id=comment.id)
+
+async def alist_comments(post_id):
+    return [comment async for comment in list_comments(post_id)]
+
+async def alist_notifications(user_id, limit=20, cursor=None):
+    return await apaginate(_notifications(user_id), ('created_at', 'id'), limit, cursor)
+
+async def astored_unread_count(user_id):
+    return await Profile.objects.filter(user_id=user_id).values_list('unread_notification_count', flat=True).afirst() or 0
 
 # ----------------------------
 # 도서 검색 관련
 # ----------------------------
-KAKAO_API_KEY = os.environ.get('KAKAO_API_KEY')
-OPENLIBRARY_API_URL = "https://openlibrary.org/api/books"
-
 def search_books(query):
-    results = []
-    # Kakao Book Search API
-    kakao_url = "https://dapi.kakao.com/v3/search/book"
-    headers = {"Authorization": f"KakaoAK {KAKAO_API_KEY}"}
-    params = {"query": query, "size": 10}
-    try:
-        response = requests.get(kakao_url, headers=headers, params=params)
-        response.raise_for_status() # Raise an exception for HTTP errors
-        data = response.json()
-        for doc in data.get('documents', []):
-            title = doc.get('title')
-            authors = ", ".join(doc.get('authors', []))
-            thumbnail = doc.get('thumbnail')
-            isbn = doc.get('isbn')
-            if title and authors:
-                results.append({
-                    'title': title,
-                    'author': authors,
-                    'cover_url': thumbnail,
-                    'isbn': isbn
-                })
-    except requests.exceptions.RequestException as e:
-        print(f"Kakao API Error: {e}")
-
-    # Fallback to OpenLibrary if no results or Kakao fails
-    if not results:
-        openlibrary_url = "https://openlibrary.org/search.json"
-        params = {"q": query, "limit": 10}
-        try:
-            response = requests.get(openlibrary_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            for doc in data.get('docs', []):
-                title = doc.get('title')
-                authors = ", ".join(doc.get('author_name', []))
-                isbn = doc.get('isbn', [])[0] if doc.get('isbn') else None
-                cover_id = doc.get('cover_i')
-                cover_url = f"https://covers.openlibrary.org/b/id/{cover_id}-M.jpg" if cover_id else None
-                if title and authors:
-                    results.append({
-                        'title': title,
-                        'author': authors,
-                        'cover_url': cover_url,
-                        'isbn': isbn
-                    })
-        except requests.exceptions.RequestException as e:
-            print(f"OpenLibrary API Error: {e}")
-
-    return results
-
+    """Kakao / OpenLibrary 병렬 검색 결과 (캐시 포함). 자세한 내용은 core/book_search.py"""
+    return book_search.search_sync(query)
+
+def local_book_search(query, limit=10):
+    """books 테이블 로컬 인덱스 검색 결과를 search_books 와 같은 dict 형태로."""
+    return [{
+        'title': book.title,
+        'author': book.author,
+        'cover_url': book.cover_url,
+        'isbn': book_search.normalize_isbn(book.isbn),
+        'book_id': book.id,
+    } for book in book_index.search(query, limit=limit)]
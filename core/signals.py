@@ -0,0 +1,47 @@
+# ============================
+# core/signals.py
+# ============================
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import book_index, book_search, jobs
+from .models import Book, Post, Profile
+
+
+@receiver(pre_save, sender=Book)
+def normalize_book_identity(sender, instance, **kwargs):
+    # 관리자 화면 등에서 제목/저자를 고쳐도 식별 key 가 따라가도록 (bulk_create 는 core/books.py 가 직접 채움)
+    instance.isbn = book_search.normalize_isbn(instance.isbn)
+    instance.normalized_key = book_search.book_key(instance.title, instance.author)
+
+
+@receiver(post_save, sender=Book)
+def index_saved_book(sender, instance, **kwargs):
+    book_index.index_books([instance])
+
+
+@receiver(post_delete, sender=Book)
+def unindex_deleted_book(sender, instance, **kwargs):
+    book_index.remove_book(instance.id)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Profile)
+def reset_variant_formats(sender, instance, **kwargs):
+    # 새 파일이 들어오면 기록된 파생본 형식은 이전 파일 것이다. 작업이 새로 만들고 다시 기록한다 (core/images.py)
+    field_name = 'user_photo' if sender is Post else 'profile_image'
+    field_file = getattr(instance, field_name)
+    if not field_file or not field_file._committed:
+        setattr(instance, f'{field_name}_variants', '')
+
+
+@receiver(post_save, sender=Post)
+def generate_post_photo_variants(sender, instance, **kwargs):
+    if instance.user_photo:
+        jobs.enqueue('images.post_variants', {'post_id': instance.id})
+
+
+@receiver(post_save, sender=Profile)
+def generate_profile_image_variants(sender, instance, **kwargs):
+    if instance.profile_image:
+        jobs.enqueue('images.profile_variants', {'profile_id': instance.id})
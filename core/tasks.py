@@ -0,0 +1,114 @@
+# ============================
+# core/tasks.py
+# 요청 경로 밖에서 처리하는 작업 핸들러 (core/jobs.py 큐에 등록)
+# ============================
+# 작업이 적재된 뒤 실행되기 전에 상태가 바뀌었을 수 있으므로 (리포스트 취소, 언팔로우, 게시물 삭제)
+# 각 핸들러는 실행 시점의 DB 상태를 다시 확인한다.
+# 네트워크/이미지 처리/전체 스캔처럼 오래 걸리는 핸들러는 atomic=False 로 등록한다. 작업 전체를 트랜잭션 하나로 묶으면
+# SQLite(IMMEDIATE 모드)에서는 그동안 쓰기 잠금을 쥐고 있어 요청의 쓰기가 'database is locked' 로 실패한다.
+# 이런 핸들러는 쓰기만 짧은 트랜잭션(또는 문장 하나)으로 한다.
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from . import counters, covers, fragments, images, importers, purge, ranking, services, timeline
+from .jobs import register
+from .models import CoverImage, Follow, ImportRun, Post, Profile, Repost
+
+
+@register('notifications.add')
+def add_notification(to_user_id, notif_type, from_user_id, post_id=None):
+    if post_id is not None and not Post.objects.filter(id=post_id, deleted_at__isnull=True).exists():
+        return
+    services.add_notification(to_user_id, notif_type, from_user_id, post_id=post_id)
+
+
+@register('timeline.fan_out_post')
+def fan_out_post(post_id):
+    post = Post.objects.filter(id=post_id, deleted_at__isnull=True).first()
+    if post:
+        timeline.fan_out_post(post)
+
+
+@register('timeline.fan_out_repost')
+def fan_out_repost(user_id, post_id):
+    if Repost.objects.filter(user_id=user_id, post_id=post_id).exists():
+        timeline.fan_out_repost(user_id, post_id)
+
+
+@register('timeline.backfill')
+def backfill_timeline(follower_id, followee_id):
+    if Follow.objects.filter(follower_id=follower_id, followee_id=followee_id).exists():
+        timeline.backfill(follower_id, followee_id)
+
+
+@register('images.post_variants', atomic=False)
+def generate_post_variants(post_id):
+    post = Post.objects.filter(id=post_id).only('id', 'user_photo').first()
+    if not post or not post.user_photo:
+        return
+    try:
+        images.generate_variants(post.user_photo)
+    except (ValidationError, FileNotFoundError) as e:
+        # 다시 시도해도 결과가 같으므로 재시도하지 않는다
+        print(f"Post {post_id} photo variants skipped: {e}")
+        return
+    # 이미 있던 파생본이어도 형식이 새로 기록되었을 수 있다
+    fragments.invalidate(post_id)
+
+
+@register('images.profile_variants', atomic=False)
+def generate_profile_variants(profile_id):
+    profile = Profile.objects.filter(id=profile_id).only('id', 'profile_image').first()
+    if not profile or not profile.profile_image:
+        return
+    try:
+        images.generate_variants(profile.profile_image)
+    except (ValidationError, FileNotFoundError) as e:
+        print(f"Profile {profile_id} image variants skipped: {e}")
+
+
+@register('covers.fetch', atomic=False)
+def fetch_cover(url):
+    covers.fetch(url)
+
+
+@register('covers.revalidate', atomic=False)
+def revalidate_covers():
+    covers.revalidate()
+    # 받아 둔 표지가 남아 있으면 다음 주기를 예약한다
+    if CoverImage.objects.filter(status=CoverImage.STATUS_OK).exists():
+        covers.schedule_revalidate()
+
+
+@register('counters.flush')
+def flush_counters():
+    counters.flush()
+
+
+@register('ranking.rescore', atomic=False)
+def rescore_hot_posts(max_age_days=None):
+    # 아직 합산 안 된 증감을 먼저 반영해야, 재계산 뒤 flush 가 같은 반응을 또 더하지 않는다
+    counters.flush()
+    ranking.rescore(max_age_days=max_age_days or settings.HOT_RESCORE_MAX_AGE_DAYS)
+
+
+@register('exports.posts_csv', atomic=False)
+def export_posts_csv(incremental=False):
+    services.export_posts_to_csv(incremental=incremental)
+
+
+@register('imports.run', atomic=False)
+def run_import(run_id):
+    import_run = ImportRun.objects.filter(id=run_id).exclude(status=ImportRun.STATUS_DONE).first()
+    if import_run:
+        importers.run(import_run)
+
+
+@register('purge.post', atomic=False)
+def purge_post(post_id):
+    purge.purge_posts([post_id])
+
+
+@register('purge.user', atomic=False)
+def purge_user(user_id):
+    purge.purge_user(user_id)
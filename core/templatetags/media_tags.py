@@ -0,0 +1,21 @@
+from django import template
+
+from core import images
+
+register = template.Library()
+
+
+@register.simple_tag
+def variant_url(field_file, variant, fmt='jpeg'):
+    """파생본 URL. 아직 만들어지지 않았으면 원본 URL."""
+    if not field_file:
+        return ''
+    return images.variant_url(field_file, variant, fmt) or field_file.url
+
+
+@register.simple_tag
+def srcset(field_file, fmt='jpeg'):
+    """<img srcset> / <source srcset> 값. 파생본이 없으면 빈 문자열."""
+    if not field_file:
+        return ''
+    return images.srcset(field_file, fmt)
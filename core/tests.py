@@ -1,3 +1,1383 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from io import BytesIO, StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from datetime import datetime, timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.functional import empty
+from PIL import Image
+
+from . import bench, book_search, books, concurrency, counters, covers, db_routers, exporters, fragments, images, importers, instrumentation, jobs, media_storage, purge, ranking, realtime, seed, services, viewer_state
+from .models import Book, BookSearchCache, Comment, CounterDelta, CoverImage, Follow, ImportRun, Job, Like, MediaBlob, Notification, Post, Profile, Repost
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+class FeedPaginationTests(TestCase):
+    def setUp(self):
+        self.user = services.create_user('reader@example.com', 'pw', 'Reader')
+        self.posts = [services.create_post(self.user.id, None, None, None, f'post {i}') for i in range(45)]
+
+    def test_pages_cover_every_post_once_in_each_sort(self):
+        for sort in services.POST_SORT_KEYS:
+            seen, cursor = [], None
+            while True:
+                posts, cursor = services.list_posts(limit=20, cursor=cursor, sort=sort)
+                seen += [p.id for p in posts]
+                if not cursor:
+                    break
+            self.assertEqual(sorted(seen), sorted(p.id for p in self.posts), sort)
+        self.assertEqual(services.list_posts(limit=3)[0], self.posts[:-4:-1])
+
+    def test_feed_api_continues_from_page_cursor(self):
+        response = self.client.get('/', HTTP_HOST='localhost')
+        data = self.client.get('/api/feed/', {'cursor': response.context['next_cursor']}, HTTP_HOST='localhost').json()
+        self.assertEqual(len(data['posts']), 20)
+        self.assertEqual(data['posts'][0]['id'], self.posts[24].id)
+
+    def test_malformed_cursors_are_rejected(self):
+        created_at = self.posts[0].created_at
+        bad = ['zzz', encode_cursor([created_at]), encode_cursor([created_at, 'x']),
+               encode_cursor([created_at, {'a': 1}]), encode_cursor([created_at, 1.5]), encode_cursor([created_at, True]),
+               encode_cursor(['yesterday', 1])]
+        for cursor in bad:
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(cursor, ('created_at', 'id'))
+            response = self.client.get('/api/feed/', {'cursor': cursor}, HTTP_HOST='localhost')
+            self.assertEqual(response.status_code, 400, cursor)
+        bookup = encode_cursor(['many', created_at, 1])
+        self.assertEqual(self.client.get('/api/feed/', {'cursor': bookup, 'sort': 'bookup'}, HTTP_HOST='localhost').status_code, 400)
+        self.assertEqual(decode_cursor(encode_cursor([2, 7]), ('hot_score', 'id')), [2.0, 7])
+        # 페이지에서 온 커서가 아니면 첫 페이지로
+        self.assertRedirects(self.client.get('/', {'cursor': 'zzz'}, HTTP_HOST='localhost'), '/', fetch_redirect_response=False)
+
+
+class CommentPreviewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = services.create_user('reader@example.com', 'pw', 'Reader')
+        self.posts = [services.create_post(self.user.id, None, None, None, f'post {i}') for i in range(3)]
+        for i in range(5):
+            services.add_comment(self.user.id, self.posts[0].id, f'comment {i}')
+        services.add_comment(self.user.id, self.posts[1].id, 'only')
+
+    def test_latest_comments_for_many_posts_in_one_query(self):
+        with self.assertNumQueries(1):
+            batch = services.list_comments_batch([p.id for p in self.posts], per_post=3)
+            authors = {c.user.profile.nickname for entry in batch.values() for c in entry['comments']}
+        self.assertEqual(authors, {'Reader'})
+        first, second, third = (batch[p.id] for p in self.posts)
+        self.assertEqual(([c.text for c in first['comments']], first['total']), (['comment 2', 'comment 3', 'comment 4'], 5))
+        self.assertEqual(([c.text for c in second['comments']], second['total']), (['only'], 1))
+        self.assertEqual(third, {'comments': [], 'total': 0})
+
+    def test_batch_api(self):
+        ids = f'{self.posts[0].id},{self.posts[1].id}'
+        data = self.client.get('/api/comments/', {'post_ids': ids, 'limit': 1}, HTTP_HOST='localhost').json()
+        entry = data['posts'][str(self.posts[0].id)]
+        self.assertEqual(([c['text'] for c in entry['comments']], entry['total']), (['comment 4'], 5))
+        self.assertEqual(self.client.get('/api/comments/', {'post_ids': 'a,b'}, HTTP_HOST='localhost').status_code, 400)
+        self.assertEqual(self.client.get('/api/comments/', HTTP_HOST='localhost').status_code, 400)
+
+    def test_feed_embeds_previews(self):
+        response = self.client.get('/', HTTP_HOST='localhost')
+        self.assertContains(response, 'comment 4')
+        self.assertNotContains(response, 'comment 1')
+        self.assertContains(response, 'View all <span class="comment-total">5</span> comments')
+
+
+class HomeTimelineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author, self.reposter, self.reader = (
+            services.create_user(f'{name}@example.com', 'pw', name) for name in ('author', 'reposter', 'reader')
+        )
+
+    def timeline(self, user=None, **kwargs):
+        posts, _ = services.home_timeline((user or self.reader).id, **kwargs)
+        return [p.text for p in posts]
+
+    def run_jobs(self, name):
+        for job in Job.objects.filter(name=name).order_by('id'):
+            jobs.run(job)
+
+    def test_fan_out_backfill_and_unfollow(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            services.create_post(self.author.id, None, None, None, 'old')
+        with self.captureOnCommitCallbacks(execute=True):
+            services.toggle_follow(self.reader.id, self.author.id)
+        self.run_jobs('timeline.backfill')
+        self.assertEqual(self.timeline(), ['old'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.create_post(self.author.id, None, None, None, 'new')
+        self.run_jobs('timeline.fan_out_post')
+        self.assertEqual(self.timeline(), ['new', 'old'])
+        self.assertEqual(self.timeline(self.author), ['new', 'old'])
+
+        posts, cursor = services.home_timeline(self.reader.id, limit=1)
+        self.assertEqual(self.timeline(limit=1, cursor=cursor), ['old'])
+
+        services.toggle_follow(self.reader.id, self.author.id)
+        self.assertEqual(self.timeline(), [])
+
+    def test_entry_survives_while_another_path_remains(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = services.create_post(self.author.id, None, None, None, 'shared')
+        for followee in (self.author, self.reposter):
+            with self.captureOnCommitCallbacks(execute=True):
+                services.toggle_follow(self.reader.id, followee.id)
+        self.run_jobs('timeline.backfill')
+        with self.captureOnCommitCallbacks(execute=True):
+            services.toggle_repost(self.reposter.id, post.id)
+        self.run_jobs('timeline.fan_out_repost')
+
+        # 글쓴이를 언팔로우해도 리포스트한 사람을 통해 보인다
+        services.toggle_follow(self.reader.id, self.author.id)
+        self.assertEqual(self.timeline(), ['shared'])
+        entry = self.reader.timeline_entries.get()
+        self.assertEqual((entry.actor_id, entry.reason), (self.reposter.id, 'repost'))
+        # 마지막 경로가 사라지면 지운다
+        services.toggle_repost(self.reposter.id, post.id)
+        self.assertEqual(self.timeline(), [])
+
+    @override_settings(TIMELINE_MAX_LENGTH=3, TIMELINE_TRIM_EVERY=1)
+    def test_fan_out_trims_timelines(self):
+        services.toggle_follow(self.reader.id, self.author.id)
+        for i in range(5):
+            with self.captureOnCommitCallbacks(execute=True):
+                services.create_post(self.author.id, None, None, None, f'post {i}')
+        self.run_jobs('timeline.fan_out_post')
+        self.assertEqual(self.timeline(), ['post 4', 'post 3', 'post 2'])
+        self.assertEqual(self.reader.timeline_entries.count(), 3)
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_high_fanout_authors_are_merged_at_read_time(self):
+        services.toggle_follow(self.reader.id, self.author.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            services.create_post(self.author.id, None, None, None, 'pulled')
+        self.run_jobs('timeline.fan_out_post')
+        self.assertFalse(self.reader.timeline_entries.exists())
+        self.assertEqual(self.timeline(), ['pulled'])
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.author = services.create_user('author@example.com', 'pw', 'Author')
+        self.fans = [services.create_user(f'fan{i}@example.com', 'pw', f'Fan{i}') for i in range(3)]
+        self.post = services.create_post(self.author.id, None, None, None, 'text')
+
+    def counts(self):
+        return Post.objects.values_list('like_count', 'repost_count').get(id=self.post.id)
+
+    def test_toggles_are_folded_by_flush(self):
+        self.assertEqual(services.toggle_like(self.fans[0].id, self.post.id), (True, 1))
+        self.assertEqual(services.toggle_like(self.fans[1].id, self.post.id), (True, 2))
+        self.assertEqual(services.toggle_like(self.fans[0].id, self.post.id), (False, 1))
+        self.assertEqual(services.toggle_repost(self.fans[2].id, self.post.id), (True, 1))
+        # 토글은 증감만 남기고 Post 행은 건드리지 않는다
+        self.assertEqual(self.counts(), (0, 0))
+        self.assertEqual(CounterDelta.objects.count(), 4)
+
+        self.assertEqual(counters.flush(), [self.post.id])
+        self.assertEqual(self.counts(), (1, 1))
+        self.assertFalse(CounterDelta.objects.exists())
+        self.assertEqual(counters.flush(), [])
+        self.assertEqual(counters.approximate(self.post.id, 'like_count'), 1)
+
+    def test_flush_is_scheduled_once_per_interval(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            services.toggle_like(self.fans[0].id, self.post.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            services.toggle_like(self.fans[1].id, self.post.id)
+        job = Job.objects.get(name='counters.flush')
+        self.assertGreater(job.run_at, timezone.now())
+        jobs.run(job)
+        self.assertEqual(self.counts(), (2, 0))
+
+        # 바로 다음 토글도 버려지지 않고 다음 flush 가 예약된다
+        with self.captureOnCommitCallbacks(execute=True):
+            services.toggle_repost(self.fans[0].id, self.post.id)
+        jobs.run(Job.objects.get(name='counters.flush'))
+        self.assertEqual(self.counts(), (2, 1))
+
+    def test_reconcile_rebuilds_from_relations(self):
+        services.toggle_like(self.fans[0].id, self.post.id)
+        counters.flush()
+        Post.objects.filter(id=self.post.id).update(like_count=40, repost_count=3)
+        CounterDelta.objects.create(post_id=self.post.id, field='like_count', delta=5)
+        CounterDelta.objects.create(post_id=self.post.id, field='comments', delta=1)
+        call_command('reconcile_counts', stdout=StringIO())
+        self.assertEqual(self.counts(), (1, 0))
+        # hot 점수에만 쓰는 댓글 증감은 다음 flush 를 위해 남는다
+        self.assertEqual(list(CounterDelta.objects.values_list('field', flat=True)), ['comments'])
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches[settings.FRAGMENT_CACHE_ALIAS].clear()
+        self.author = services.create_user('author@example.com', 'pw', 'Author')
+        self.post = services.create_post(self.author.id, None, None, None, 'hello text')
+
+    def feed(self):
+        return self.client.get('/', HTTP_HOST='localhost')
+
+    def test_cards_are_rendered_once_then_served_from_cache(self):
+        self.assertContains(self.feed(), 'hello text')
+        self.assertEqual(fragments.stats()['misses'], 1)
+        # 캐시된 조각에는 보는 사람별 상태가 들어가지 않는다
+        services.toggle_like(self.author.id, self.post.id)
+        self.client.force_login(self.author)
+        response = self.feed()
+        self.assertContains(response, 'hello text')
+        self.assertEqual((fragments.stats()['hits'], fragments.stats()['misses']), (1, 1))
+        self.assertContains(response, 'data-embedded="1"')
+
+    def test_edits_and_comments_invalidate_the_card(self):
+        self.feed()
+        services.add_comment(self.author.id, self.post.id, 'first comment')
+        self.assertContains(self.feed(), 'first comment')
+        services.update_post(self.author.id, self.post.id, new_text='edited text')
+        response = self.feed()
+        self.assertContains(response, 'edited text')
+        self.assertNotContains(response, 'hello text')
+        self.assertEqual(fragments.stats()['misses'], 3)
+
+
+class ImagePipelineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches[settings.FRAGMENT_CACHE_ALIAS].clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = self.settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        images.variant_storage._wrapped = empty
+        self.addCleanup(setattr, images.variant_storage, '_wrapped', empty)
+        self.user = services.create_user('reader@example.com', 'pw', 'Reader')
+
+    def photo(self, size=(3000, 2000), color='red'):
+        buf = BytesIO()
+        exif = Image.Exif()
+        exif[0x0112] = 6  # 90도 회전해서 보여야 하는 사진
+        exif[0x010f] = 'Camera'
+        Image.new('RGB', size, color).save(buf, format='JPEG', exif=exif)
+        return ContentFile(buf.getvalue(), name='photo.jpg')
+
+    def test_upload_is_normalized_and_variants_are_recorded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = services.create_post(self.user.id, None, self.photo(), None, 'photo')
+        with Image.open(post.user_photo.path) as stored:
+            self.assertEqual(stored.size, (1365, 2048))
+            self.assertEqual(dict(stored.getexif()), {})
+        self.assertEqual(post.user_photo_variants, '')
+
+        jobs.run(Job.objects.get(name='images.post_variants'))
+        post.refresh_from_db()
+        self.assertEqual(images.available_formats(post.user_photo), list(images.FORMATS))
+        self.assertIn('600w', images.srcset(post.user_photo, 'webp'))
+
+        # 렌더링은 기록된 형식만 보고 파일 시스템을 확인하지 않는다
+        with mock.patch.object(images.variant_storage, 'exists', side_effect=AssertionError('stat')):
+            response = self.client.get('/', HTTP_HOST='localhost')
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, images.variant_storage.url(images.variant_name(post.user_photo.name, 'card', 'jpeg')))
+
+    def test_new_photo_resets_recorded_formats(self):
+        post = services.create_post(self.user.id, None, self.photo(), None, 'photo')
+        images.generate_variants(post.user_photo)
+        self.assertNotEqual(Post.objects.get(id=post.id).user_photo_variants, '')
+        services.update_post(self.user.id, post.id, new_user_photo=self.photo(color='blue'))
+        post.refresh_from_db()
+        self.assertEqual((post.user_photo_variants, images.srcset(post.user_photo)), ('', ''))
+
+        # 기존 파생본이 있으면 명령은 형식만 기록한다
+        images.generate_variants(post.user_photo)
+        Post.objects.filter(id=post.id).update(user_photo_variants='')
+        call_command('generate_image_variants', stdout=StringIO())
+        self.assertEqual(Post.objects.get(id=post.id).user_photo_variants, ','.join(images.FORMATS))
+
+    def test_oversized_and_invalid_uploads_are_rejected(self):
+        limit = Image.MAX_IMAGE_PIXELS
+        with self.settings(IMAGE_MAX_PIXELS=1000 * 1000):
+            with self.assertRaisesMessage(ValidationError, '해상도'):
+                services.create_post(self.user.id, None, self.photo(size=(1001, 1000)), None, 'big')
+            services.create_post(self.user.id, None, self.photo(size=(1000, 1000)), None, 'ok')
+        self.assertEqual(Image.MAX_IMAGE_PIXELS, limit)
+        with self.assertRaises(ValidationError):
+            services.create_post(self.user.id, None, ContentFile(b'0' * (11 * 1024 * 1024), name='b.jpg'), None, 'x')
+
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile('c.jpg', b'not an image', content_type='image/jpeg')
+        response = self.client.post('/create/', {'text': 't', 'user_photo': upload}, HTTP_HOST='localhost')
+        self.assertContains(response, 'alert-danger')
+        self.assertEqual(Post.objects.filter(text='t').count(), 0)
+
+
+class StubServer:
+    """응답 본문과 지연 시간을 지정할 수 있는 로컬 HTTP 서버."""
+
+    def __init__(self, payload, delay=0.0):
+        self.payload = payload
+        self.delay = delay
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                time.sleep(stub.delay)
+                body = json.dumps(stub.payload).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except BrokenPipeError:
+                    # 클라이언트가 마감 시간에 걸려 먼저 끊음
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}/'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+KAKAO_PAYLOAD = {'documents': [
+    {'title': '소년이 온다', 'authors': ['한강'], 'thumbnail': 'http://img/1.jpg', 'isbn': '8936434128 9788936434120'},
+]}
+OPENLIBRARY_PAYLOAD = {'docs': [
+    {'title': 'Human Acts', 'author_name': ['Han Kang'], 'isbn': ['9788936434120'], 'cover_i': 1},
+    {'title': 'The White Book', 'author_name': ['Han Kang'], 'isbn': ['1524708437']},
+]}
+
+
+class BookSearchTests(TestCase):
+    def setUp(self):
+        book_search.memory_cache.clear()
+        self.kakao = StubServer(KAKAO_PAYLOAD)
+        self.openlibrary = StubServer(OPENLIBRARY_PAYLOAD)
+        self.settings_override = override_settings(
+            KAKAO_API_KEY='test-key',
+            KAKAO_SEARCH_URL=self.kakao.url,
+            OPENLIBRARY_SEARCH_URL=self.openlibrary.url,
+            BOOK_SEARCH_TIMEOUT=0.5,
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.kakao.close()
+        self.openlibrary.close()
+
+    def test_merges_providers_and_dedupes_by_isbn(self):
+        results = book_search.search_sync('한강')
+        self.assertEqual([r['title'] for r in results], ['소년이 온다', 'The White Book'])
+        self.assertEqual(results[0]['isbn'], '9788936434120')
+        self.assertEqual(results[1]['isbn'], '9781524708436')
+        self.assertEqual((self.kakao.hits, self.openlibrary.hits), (1, 1))
+
+    def test_providers_run_in_parallel_with_deadline(self):
+        self.kakao.delay = 0.4
+        self.openlibrary.delay = 1.5
+        started = time.monotonic()
+        results = book_search.search_sync('한강')
+        elapsed = time.monotonic() - started
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual([r['title'] for r in results], ['소년이 온다'])
+
+    def test_repeated_query_is_served_from_cache(self):
+        book_search.search_sync('한강')
+        results = book_search.search_sync('  한강 ')
+        self.assertEqual(len(results), 2)
+        self.assertEqual((self.kakao.hits, self.openlibrary.hits), (1, 1))
+
+    def test_persistent_cache_survives_memory_loss(self):
+        book_search.search_sync('한강')
+        self.assertTrue(BookSearchCache.objects.filter(query_key=book_search.query_key(' 한강')).exists())
+        book_search.memory_cache.clear()
+        self.assertEqual(len(book_search.search_sync('한강')), 2)
+        self.assertEqual((self.kakao.hits, self.openlibrary.hits), (1, 1))
+
+        # 아주 긴 검색어도 키는 고정 길이
+        book_search.search_sync('한강 ' * 200)
+        self.assertEqual({len(key) for key in BookSearchCache.objects.values_list('query_key', flat=True)}, {64})
+
+    def test_partial_results_are_cached_briefly_in_memory_only(self):
+        self.openlibrary.delay = 1.0
+        with self.settings(BOOK_SEARCH_PARTIAL_CACHE_TTL=0):
+            self.assertEqual(len(book_search.search_sync('한강')), 1)
+            self.assertFalse(BookSearchCache.objects.exists())
+            self.openlibrary.delay = 0
+            self.assertEqual(len(book_search.search_sync('한강')), 2)
+        self.assertEqual(self.kakao.hits, 2)
+        self.assertTrue(BookSearchCache.objects.exists())
+
+    def test_provider_calls_are_timed(self):
+        with instrumentation.collect() as metrics:
+            book_search.search_sync('한강')
+        self.assertEqual(metrics.span_count['http'], 2)
+
+    def test_async_view(self):
+        response = self.client.get('/api/books/search/', {'q': '한강'}, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 2)
+
+
+class BookIndexTests(TestCase):
+    def test_partial_korean_and_short_queries(self):
+        from . import services
+        services.save_book_if_needed('바다가 들리는 편의점', '마치다 소노코', None, '9791190090001')
+        services.save_book_if_needed('소년이 온다', '한강', None)
+        self.assertEqual([b['title'] for b in services.local_book_search('들리는')], ['바다가 들리는 편의점'])
+        self.assertEqual([b['title'] for b in services.local_book_search('한강')], ['소년이 온다'])
+        self.assertEqual([b['title'] for b in services.local_book_search('소노코 편의')], ['바다가 들리는 편의점'])
+        self.assertEqual(services.local_book_search('979119009')[0]['isbn'], '9791190090001')
+
+    def test_index_follows_book_changes(self):
+        from . import services
+        book = services.save_book_if_needed('채식주의자', '한강', None)
+        book.title = '흰'
+        book.save()
+        self.assertEqual(services.local_book_search('채식주의'), [])
+        book.delete()
+        self.assertEqual(services.local_book_search('한강'), [])
+
+    def test_typeahead_answers_locally_when_enough_results(self):
+        from . import services
+        for title in ('작별하지 않는다', '작별 인사', '작별의 순간'):
+            services.save_book_if_needed(title, '저자', None)
+        response = self.client.get('/api/books/typeahead/', {'q': '작별'}, HTTP_HOST='localhost')
+        self.assertEqual(response.json()['source'], 'local')
+        self.assertEqual(len(response.json()['results']), 3)
+
+
+
+class BookIdentityTests(TestCase):
+    def test_resolve_reuses_by_isbn_and_normalized_key(self):
+        book = books.resolve('소년이 온다', '한강 (지은이)', None, '8936434128')
+        self.assertEqual(book.isbn, '9788936434120')
+        self.assertEqual(books.resolve('소년이  온다!', '한강', None).id, book.id)
+        self.assertEqual(books.resolve('Human Acts', 'Han Kang', None, '978-89-364-3412-0').id, book.id)
+        self.assertEqual(books.resolve('작별하지 않는다', 'A, B', 'http://c/1.jpg').id,
+                         books.resolve('작별하지 않는다', 'B & A', None).id)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_editions_with_different_isbns_stay_apart(self):
+        bare = books.resolve('채식주의자', '한강')
+        first = books.resolve('채식주의자', '한강', None, '9788936433598')
+        # ISBN 없는 책에 처음 온 ISBN 이 붙고, 다른 ISBN 은 다른 판
+        self.assertEqual(first.id, bare.id)
+        second = books.resolve('채식주의자', '한강 (지은이)', None, '9788936434595')
+        self.assertNotEqual(second.id, first.id)
+        self.assertEqual(books.resolve('채식주의자', '한강', None, '8936434594').id, second.id)
+        # ISBN 을 모르면 있는 판에 붙는다
+        self.assertIn(books.resolve('채식주의자', '한강').id, {first.id, second.id})
+        self.assertEqual(Book.objects.count(), 2)
+
+        result = books.resolve_many([
+            {'title': '흰', 'author': '한강', 'isbn': '9788954651134'},
+            {'title': '흰', 'author': '한강', 'isbn': '9788954681155'},
+            {'title': '흰', 'author': '한강', 'isbn': None},
+        ])
+        self.assertNotEqual(result[0].id, result[1].id)
+        self.assertIn(result[2].id, {result[0].id, result[1].id})
+        self.assertEqual(Book.objects.filter(title='흰').count(), 2)
+        self.assertEqual(books.find_duplicates(), [])
+
+    def test_resolve_many_batches_and_dedupes(self):
+        entries = [{'title': f'책 {i % 50}', 'author': '저자', 'isbn': None} for i in range(200)] + [{'title': ''}]
+        # 조회 / INSERT / 재조회 + 검색 인덱스 반영(executemany 2번)
+        with self.assertNumQueries(5):
+            result = books.resolve_many(entries, batch_size=500)
+        self.assertEqual(Book.objects.count(), 50)
+        self.assertEqual(result[0].id, result[50].id)
+        self.assertIsNone(result[-1])
+
+    def test_merge_duplicates_repoints_posts(self):
+        user = services.create_user('books@example.com', 'pw', 'Books')
+        keep = Book.objects.create(title='채식주의자', author='한강')
+        # 유일 제약이 생기기 전의 중복 행 흉내 (key 없음, 정규화 안 된 ISBN)
+        dup = Book.objects.bulk_create([
+            Book(title='채식주의자 ', author='한강', cover_url='http://c/2.jpg'),
+            Book(title='The Vegetarian', author='Han Kang', isbn='9788936433598 8936433598'),
+        ])
+        Book.objects.filter(id=keep.id).update(normalized_key=None)
+        posts = [services.create_post(user.id, b.id, None, None, 'x') for b in [keep, *dup]]
+        Book.objects.filter(id=dup[1].id).update(title='채식주의자', author='한강')
+
+        self.assertEqual(books.merge_duplicates(), (1, 2, 2))
+        book = Book.objects.get()
+        self.assertEqual((book.id, book.isbn, book.cover_url), (dup[1].id, '9788936433598', 'http://c/2.jpg'))
+        self.assertEqual({p.book_id for p in Post.objects.filter(id__in=[p.id for p in posts])}, {book.id})
+
+
+
+GOODREADS_CSV = '''Book Id,Title,Author,Additional Authors,ISBN,ISBN13,My Rating,Date Read,Date Added,Exclusive Shelf,My Review
+1,The Vegetarian,Han Kang,Deborah Smith,"=""1101906111""","=""9781101906118""",5,2021/03/04,2021/01/01,read,Quiet<br/>and sharp &amp; strange
+2,Human Acts,Han Kang,,"=""""","=""""",4,,2022/05/06,read,
+3,Greek Lessons,Han Kang,,,,0,,2024/01/01,to-read,
+4,The Vegetarian,Han Kang,Deborah Smith,,,5,2023/07/08,2023/07/01,read,second read
+'''
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.user = services.create_user('import@example.com', 'pw', 'Importer')
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def _write(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_goodreads_import_resumes_after_interruption(self):
+        path = self._write('goodreads.csv', GOODREADS_CSV)
+        import_run = importers.start(self.user.id, path)
+        self.assertEqual(import_run.format, 'goodreads')
+        # 첫 묶음(2행)을 커밋한 직후 프로세스가 죽은 것처럼
+        def crash(message):
+            raise KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            importers.run(import_run, batch_size=2, log=crash)
+        self.assertEqual(Post.objects.filter(user=self.user).count(), 2)
+
+        resumed = importers.start(self.user.id, path)
+        self.assertEqual(resumed.id, import_run.id)
+        resumed = importers.run(resumed, batch_size=2)
+        self.assertEqual((resumed.status, resumed.rows_done, resumed.posts_created, resumed.rows_skipped),
+                         (ImportRun.STATUS_DONE, 4, 3, 1))
+
+        posts = list(Post.objects.filter(user=self.user).order_by('created_at'))
+        self.assertEqual([p.book.title for p in posts], ['The Vegetarian', 'Human Acts', 'The Vegetarian'])
+        self.assertEqual(posts[0].book_id, posts[2].book_id)
+        self.assertEqual(posts[0].book.isbn, '9781101906118')
+        self.assertEqual(posts[0].text, 'Quiet\nand sharp & strange')
+        self.assertEqual(timezone.localtime(posts[0].created_at).date().isoformat(), '2021-03-04')
+        self.assertEqual(Profile.objects.get(user=self.user).post_count, 3)
+
+    def test_own_export_round_trips_through_upload(self):
+        author = services.create_user('writer@example.com', 'pw', 'Writer')
+        book = books.resolve('소년이 온다', '한강')
+        services.create_post(author.id, book.id, None, None, 'first')
+        services.create_post(author.id, None, None, None, 'no book')
+        path = self._write('export.ndjson', ''.join(exporters.stream('ndjson')))
+
+        self.client.force_login(self.user)
+        with self.settings(IMPORT_DIR=self.dir), open(path, 'rb') as f, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/imports/', {'file': f}, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 202)
+        run_id = response.json()['import']['id']
+        self.assertEqual(Job.objects.get(name='imports.run').payload, {'run_id': run_id})
+
+        with self.settings(IMPORT_DIR=self.dir):
+            jobs.run(Job.objects.get(name='imports.run'))
+        status = self.client.get(f'/api/imports/{run_id}/', HTTP_HOST='localhost').json()['import']
+        self.assertEqual((status['status'], status['posts_created']), ('done', 2))
+        self.assertEqual(sorted(Post.objects.filter(user=self.user).values_list('text', 'book_id')),
+                         [('first', book.id), ('no book', None)])
+        # 다 가져온 업로드 파일은 지운다
+        self.assertEqual(os.listdir(self.dir), ['export.ndjson'])
+
+    def test_export_round_trip_keeps_created_at(self):
+        author = services.create_user('clock@example.com', 'pw', 'Clock')
+        post = services.create_post(author.id, None, None, None, 'at noon')
+        created_at = timezone.make_aware(datetime(2024, 5, 6, 12, 34, 56))
+        Post.objects.filter(id=post.id).update(created_at=created_at)
+        paths = {fmt: self._write(f'export.{fmt}', ''.join(exporters.stream(fmt))) for fmt in ('csv', 'ndjson')}
+        for fmt, path in paths.items():
+            with self.subTest(fmt=fmt):
+                import_run = importers.run(importers.start(self.user.id, path))
+                self.assertEqual(import_run.status, ImportRun.STATUS_DONE)
+                imported = Post.objects.filter(user=self.user).latest('id')
+                self.assertEqual(imported.created_at, created_at)
+
+    def test_uploaded_files_are_removed_when_replaced_or_failed(self):
+        uploads = os.path.join(self.dir, 'uploads')
+        os.makedirs(uploads)
+        first = self._write('uploads/a.csv', GOODREADS_CSV)
+        with self.settings(IMPORT_DIR=uploads):
+            import_run = importers.start(self.user.id, first)
+            # 같은 파일을 다시 올리면 이어 가는 가져오기가 새 파일을 가리키고, 이전 파일은 지운다
+            second = self._write('uploads/b.csv', GOODREADS_CSV)
+            self.assertEqual(importers.start(self.user.id, second).id, import_run.id)
+            self.assertEqual(os.listdir(uploads), ['b.csv'])
+
+            broken = self._write('uploads/c.csv', GOODREADS_CSV.replace('Quiet', 'Loud'))
+            failing = importers.start(self.user.id, broken)
+            with open(broken, 'ab') as f:
+                f.write(b'5,\xff\xfe\n')
+            failed = importers.run(failing)
+            self.assertEqual(failed.status, ImportRun.STATUS_FAILED)
+            self.assertEqual(os.listdir(uploads), ['b.csv'])
+
+            # IMPORT_DIR 밖의 파일(명령으로 가져온 파일)은 그대로 둔다
+            local = self._write('local.csv', GOODREADS_CSV)
+            self.assertEqual(importers.run(importers.start(self.user.id, local)).status, ImportRun.STATUS_DONE)
+            self.assertTrue(os.path.exists(local))
+
+
+calls = []
+
+
+@jobs.register('tests.record')
+def record_call(value, fail_times=0):
+    calls.append(value)
+    if calls.count(value) <= fail_times:
+        raise RuntimeError('boom')
+
+
+@override_settings(JOBS_EAGER=False)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def run_due(self):
+        for job in jobs.claim(10):
+            jobs.run(job)
+
+    def test_job_is_stored_only_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.enqueue('tests.record', {'value': 1})
+            self.assertFalse(Job.objects.exists())
+        self.run_due()
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+
+    def test_failures_back_off_then_give_up(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.enqueue('tests.record', {'value': 2, 'fail_times': 5}, max_attempts=2)
+        self.run_due()
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertEqual(jobs.claim(10), [])
+
+        Job.objects.update(run_at=timezone.now())
+        self.run_due()
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+        self.assertIn('boom', job.last_error)
+
+    def test_expired_lock_is_claimed_again(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.enqueue('tests.record', {'value': 3})
+        self.assertEqual(len(jobs.claim(10)), 1)
+        self.assertEqual(jobs.claim(10), [])
+        # 워커가 점유한 채 죽음
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.run_due()
+        self.assertEqual(calls, [3])
+
+    def test_same_key_is_queued_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for value in range(3):
+                jobs.enqueue('tests.record', {'value': value}, key='tests')
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_like_notification_is_deferred_to_worker(self):
+        author = services.create_user('a@example.com', 'pw', 'A')
+        reader = services.create_user('b@example.com', 'pw', 'B')
+        post = services.create_post(author.id, None, None, None, 'text')
+        with self.captureOnCommitCallbacks(execute=True):
+            services.toggle_like(reader.id, post.id)
+        self.assertFalse(Notification.objects.exists())
+        self.run_due()
+        self.assertTrue(Notification.objects.filter(user=author, notification_type='like').exists())
+
+    def test_worker_refuses_process_local_broker(self):
+        # 워커에서 발행한 알림이 웹 프로세스의 SSE 연결에 닿지 않는 설정
+        with self.settings(REALTIME_BROKER='memory'), self.assertRaisesMessage(CommandError, 'REALTIME_BROKER'):
+            call_command('runworker', once=True, stdout=StringIO())
+        out = StringIO()
+        with self.settings(REALTIME_BROKER='memory'):
+            call_command('runworker', once=True, allow_memory_broker=True, stdout=out)
+        self.assertIn('Processed 0 jobs.', out.getvalue())
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = services.create_user('a@example.com', 'pw', 'A')
+        self.path = os.path.join(tempfile.mkdtemp(), 'posts.csv')
+
+    def read_ids(self):
+        with open(self.path, encoding='utf-8', newline='') as f:
+            return [int(row['id']) for row in csv.DictReader(f)]
+
+    def test_incremental_export_adds_new_posts_only(self):
+        first = services.create_post(self.user.id, None, None, None, 'one')
+        self.assertEqual(exporters.export_to_file(self.path, incremental=True), (1, False))
+        second = services.create_post(self.user.id, None, None, None, 'two')
+        self.assertEqual(exporters.export_to_file(self.path, incremental=True), (1, True))
+        # 예전 data/posts.csv 와 같은 컬럼, 최신순
+        self.assertEqual(self.read_ids(), [second.id, first.id])
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(f.readline().strip().split(',')[5], 'user_photo')
+
+        # 파일이 밖에서 바뀌면 덧붙이지 않고 다시 쓴다
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('garbage\n')
+        self.assertEqual(exporters.export_to_file(self.path, incremental=True), (2, False))
+        self.assertEqual(self.read_ids(), [second.id, first.id])
+
+        # 맨 위보다 오래된 새 게시물(가져오기 등)이 생기면 순서를 지키려고 다시 쓴다
+        imported = services.create_post(self.user.id, None, None, None, 'imported')
+        Post.objects.filter(id=imported.id).update(created_at=timezone.now() - timedelta(days=30))
+        self.assertEqual(exporters.export_to_file(self.path, incremental=True), (3, False))
+        self.assertEqual(self.read_ids(), [second.id, first.id, imported.id])
+
+    def test_ndjson_stream(self):
+        post = services.create_post(self.user.id, None, None, None, '한글')
+        lines = [json.loads(line) for line in exporters.stream('ndjson')]
+        self.assertEqual(lines[0]['id'], post.id)
+        self.assertEqual((lines[0]['nickname'], lines[0]['text']), ('A', '한글'))
+
+    def test_admin_download_streams(self):
+        services.create_post(self.user.id, None, None, None, 'one')
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(admin_user)
+        response = self.client.get('/admin/core/post/export/csv/', HTTP_HOST='localhost')
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.startswith('id,created_at'))
+        self.assertIn('one', body)
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        self.author = services.create_user('author@example.com', 'pw', 'Author')
+        self.post = services.create_post(self.author.id, None, None, None, 'text')
+        self.readers = [services.create_user(f'r{i}@example.com', 'pw', f'R{i}') for i in range(5)]
+
+    def test_repeated_events_are_coalesced_until_read(self):
+        for reader in self.readers:
+            services.add_notification(self.author.id, 'like', reader.id, self.post.id)
+        services.add_notification(self.author.id, 'like', self.readers[-1].id, self.post.id)
+        notification = Notification.objects.get()
+        self.assertEqual((notification.actor_count, notification.from_user_id), (5, self.readers[-1].id))
+        self.assertEqual(notification.get_display_message(), 'R4님 외 4명이 회원님의 게시물을 좋아합니다.')
+
+        services.mark_all_notifications_read(self.author.id)
+        _, created = services.add_notification(self.author.id, 'like', self.readers[0].id, self.post.id)
+        self.assertTrue(created)
+
+    def test_coalesced_notification_counts_distinct_actors(self):
+        a, b = self.readers[:2]
+        # A -> B -> A, 그리고 좋아요 취소 후 다시 누르기를 반복해도 두 사람
+        for actor in (a, b, a, b, a):
+            services.add_notification(self.author.id, 'like', actor.id, self.post.id)
+        notification = Notification.objects.get()
+        self.assertEqual((notification.actor_count, notification.from_user_id), (2, a.id))
+        self.assertEqual(notification.get_display_message(), 'R0님 외 1명이 회원님의 게시물을 좋아합니다.')
+
+        # 읽은 뒤 새 알림은 사람을 처음부터 센다
+        services.mark_all_notifications_read(self.author.id)
+        notification, created = services.add_notification(self.author.id, 'like', b.id, self.post.id)
+        services.add_notification(self.author.id, 'like', b.id, self.post.id)
+        notification.refresh_from_db()
+        self.assertEqual((created, notification.actor_count), (True, 1))
+
+    def unread(self):
+        return Profile.objects.get(user=self.author).unread_notification_count
+
+    def test_unread_counter_tracks_writes(self):
+        services.add_notification(self.author.id, 'like', self.readers[0].id, self.post.id)
+        services.add_notification(self.author.id, 'like', self.readers[1].id, self.post.id)
+        services.add_notification(self.author.id, 'follow', self.readers[0].id)
+        self.assertEqual(self.unread(), 2)
+        services.mark_all_notifications_read(self.author.id)
+        self.assertEqual(self.unread(), 0)
+
+        services.add_notification(self.author.id, 'comment', self.readers[0].id, self.post.id)
+        services.delete_post(self.author.id, self.post.id)
+        self.assertEqual(self.unread(), 0)
+
+        Profile.objects.filter(user=self.author).update(unread_notification_count=7)
+        services.add_notification(self.author.id, 'follow', self.readers[1].id)
+        services.recount_unread_notifications()
+        self.assertEqual(self.unread(), 1)
+
+    def test_api_pages_with_constant_queries(self):
+        for reader in self.readers:
+            services.add_notification(self.author.id, 'follow', reader.id)
+            Notification.objects.filter(user=self.author).update(is_read=True)
+        self.client.force_login(self.author)
+        with override_settings(NOTIFICATION_PAGE_SIZE=3):
+            with self.assertNumQueries(3):  # 세션, 사용자, 알림(+프로필 조인)
+                first = self.client.get('/notifications/', HTTP_HOST='localhost').json()
+            second = self.client.get('/notifications/', {'cursor': first['next_cursor']}, HTTP_HOST='localhost').json()
+        self.assertEqual(len(first['notifications']), 3)
+        self.assertEqual(len(second['notifications']), 2)
+        self.assertIsNone(second['next_cursor'])
+
+    def test_prune_removes_only_old_read_notifications(self):
+        services.add_notification(self.author.id, 'like', self.readers[0].id, self.post.id)
+        services.add_notification(self.author.id, 'comment', self.readers[1].id, self.post.id)
+        old = timezone.now() - timedelta(days=200)
+        Notification.objects.update(created_at=old)
+        Notification.objects.filter(notification_type='like').update(is_read=True)
+        self.assertEqual(services.prune_notifications(older_than_days=90), 1)
+        self.assertEqual(list(Notification.objects.values_list('notification_type', flat=True)), ['comment'])
+
+
+def publish_from_other_process(path, channel, event):
+    realtime.SQLiteBroker(path, poll_interval=0.05).publish(channel, event)
+
+
+class RealtimeTests(TestCase):
+    def setUp(self):
+        realtime._broker = None
+        self.addCleanup(setattr, realtime, '_broker', None)
+
+    @override_settings(REALTIME_BROKER='memory')
+    async def test_hub_delivers_to_channel_subscribers(self):
+        mine = realtime.subscribe([realtime.user_channel(1)])
+        other = realtime.subscribe([realtime.user_channel(2)])
+        realtime.publish(realtime.user_channel(1), {'type': 'unread', 'unread_count': 3})
+        self.assertEqual(await mine.get(timeout=1), {'type': 'unread', 'unread_count': 3})
+        self.assertIsNone(await other.get(timeout=0.05))
+        mine.close()
+        other.close()
+        self.assertEqual(realtime.hub.subscriber_count(), 0)
+
+    async def test_sqlite_broker_crosses_processes(self):
+        path = os.path.join(tempfile.mkdtemp(), 'realtime.sqlite3')
+        with self.settings(REALTIME_BROKER='sqlite', REALTIME_SQLITE_PATH=path, REALTIME_POLL_INTERVAL=0.05):
+            sub = realtime.subscribe([realtime.FEED_CHANNEL])
+            await asyncio.sleep(0.2)  # 폴러가 시작 위치를 잡을 때까지
+            process = multiprocessing.get_context('fork').Process(
+                target=publish_from_other_process,
+                args=(path, realtime.FEED_CHANNEL, {'type': 'counts', 'post_id': 7, 'like_count': 2}),
+            )
+            process.start()
+            await asyncio.to_thread(process.join)
+            event = await sub.get(timeout=5)
+            sub.close()
+        self.assertEqual(event, {'type': 'counts', 'post_id': 7, 'like_count': 2})
+
+    @override_settings(REALTIME_BROKER='memory')
+    async def test_event_stream_sends_unread_count_then_deltas(self):
+        user = await User.objects.acreate(username='sse@example.com')
+        await Profile.objects.acreate(user=user, nickname='SSE', unread_notification_count=4)
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get('/events/', HTTP_HOST='localhost')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertIn(b'retry:', await anext(chunks))
+        self.assertIn(b'"unread_count": 4', await anext(chunks))
+        realtime.publish(realtime.FEED_CHANNEL, {'type': 'counts', 'post_id': 1, 'like_count': 9})
+        self.assertIn(b'event: counts', await anext(chunks))
+        await response.streaming_content.aclose()
+
+
+class ProfileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = services.create_user('reader@example.com', 'pw', 'Reader')
+        self.fan = services.create_user('fan@example.com', 'pw', 'Fan')
+
+    def counts(self, user):
+        return Profile.objects.values_list('follower_count', 'following_count', 'post_count').get(user=user)
+
+    def test_counts_follow_writes_and_reconcile(self):
+        self.assertEqual(services.toggle_follow(self.fan.id, self.reader.id), (True, 1))
+        post = services.create_post(self.reader.id, None, None, None, 'one')
+        services.create_post(self.reader.id, None, None, None, 'two')
+        self.assertEqual(self.counts(self.reader), (1, 0, 2))
+        self.assertEqual(self.counts(self.fan), (0, 1, 0))
+
+        services.delete_post(self.reader.id, post.id)
+        self.assertEqual(services.toggle_follow(self.fan.id, self.reader.id), (False, 0))
+        self.assertEqual(self.counts(self.reader), (0, 0, 1))
+
+        Profile.objects.update(follower_count=5, following_count=5, post_count=5)
+        services.reconcile_profile_counts()
+        self.assertEqual(self.counts(self.reader), (0, 0, 1))
+
+    def test_profile_sections_are_paginated(self):
+        for i in range(15):
+            post = services.create_post(self.reader.id, None, None, None, f'post {i}')
+            services.toggle_repost(self.fan.id, post.id)
+        self.client.force_login(self.fan)
+        # 조회 대상, 프로필, 게시물 페이지, 리포스트 페이지 + 세션, 로그인 사용자, 팔로우 여부, 네비게이션 바 프로필
+        # + 처음 한 번은 보는 사람 상태(좋아요/리포스트/댓글)
+        with self.assertNumQueries(11):
+            self.client.get(f'/profile/{self.reader.id}/', HTTP_HOST='localhost')
+        with self.assertNumQueries(8):
+            response = self.client.get(f'/profile/{self.reader.id}/', HTTP_HOST='localhost')
+        self.assertEqual(len(response.context['my_posts']), 12)
+
+        data = self.client.get(
+            f'/api/profile/{self.reader.id}/posts/', {'cursor': response.context['posts_cursor']}, HTTP_HOST='localhost',
+        ).json()
+        self.assertEqual(data['html'].count('card-title'), 3)
+        self.assertIsNone(data['next_cursor'])
+        data = self.client.get(f'/api/profile/{self.fan.id}/reposts/', HTTP_HOST='localhost').json()
+        self.assertIn('post 14', data['html'])
+
+
+class DeletionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = self.settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        images.variant_storage._wrapped = empty
+        self.addCleanup(setattr, images.variant_storage, '_wrapped', empty)
+        self.author = services.create_user('author@example.com', 'pw', 'Author')
+        self.reader = services.create_user('reader@example.com', 'pw', 'Reader')
+
+    def photo(self):
+        buf = BytesIO()
+        Image.new('RGB', (64, 48), 'red').save(buf, format='JPEG')
+        return ContentFile(buf.getvalue(), name='photo.jpg')
+
+    def test_deleted_post_is_hidden_then_purged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = services.create_post(self.author.id, None, self.photo(), None, 'bye')
+        jobs.run(Job.objects.get(name='images.post_variants'))
+        photo = post.user_photo.name
+        self.assertTrue(images.has_variants(post.user_photo))
+        kept = services.create_post(self.author.id, None, None, None, 'stay')
+        services.toggle_like(self.reader.id, post.id)
+        services.toggle_repost(self.reader.id, post.id)
+        services.add_comment(self.reader.id, post.id, 'nice')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(services.delete_post(self.author.id, post.id))
+        self.assertEqual([p.id for p in services.list_posts()[0]], [kept.id])
+        self.assertEqual([p.id for p in services.my_posts(self.author.id)[0]], [kept.id])
+        self.assertEqual(services.my_reposts(self.reader.id)[0], [])
+        self.assertEqual(Profile.objects.get(user=self.author).post_count, 1)
+        with self.assertRaises(Post.DoesNotExist):
+            services.toggle_like(self.reader.id, post.id)
+
+        jobs.run(Job.objects.get(name='purge.post'))
+        self.assertFalse(Post.objects.filter(id=post.id).exists())
+        self.assertFalse(Like.objects.exists() or Repost.objects.exists() or Comment.objects.exists())
+        self.assertEqual(MediaBlob.objects.get(name=photo).refcount, 0)
+        media_storage.gc(grace_hours=0)
+        self.assertFalse(default_storage.exists(photo))
+        self.assertFalse(images.has_variants(post.user_photo))
+        self.assertTrue(Post.objects.filter(id=kept.id).exists())
+
+    def test_account_deletion_purges_in_batches_and_fixes_counts(self):
+        own = [services.create_post(self.author.id, None, None, None, f'post {i}') for i in range(5)]
+        theirs = services.create_post(self.reader.id, None, None, None, 'reader post')
+        services.toggle_like(self.author.id, theirs.id)
+        services.toggle_like(self.reader.id, own[0].id)
+        services.toggle_follow(self.author.id, self.reader.id)
+        services.toggle_follow(self.reader.id, self.author.id)
+        services.add_comment(self.author.id, theirs.id, 'hello')
+        services.add_notification(self.reader.id, 'comment', self.author.id, theirs.id)
+        counters.flush()
+
+        self.client.force_login(self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/account/delete/', HTTP_HOST='localhost')
+        self.assertRedirects(response, '/', fetch_redirect_response=False)
+        self.assertNotIn('_auth_user_id', self.client.session)
+        self.assertEqual([p.id for p in services.list_posts()[0]], [theirs.id])
+        self.assertEqual(services.list_comments(theirs.id).count(), 0)
+        self.assertEqual(services.list_notifications(self.reader.id)[0], [])
+        self.assertEqual(self.client.get(f'/profile/{self.author.id}/', HTTP_HOST='localhost').status_code, 404)
+
+        with override_settings(PURGE_BATCH_SIZE=2):
+            jobs.run(Job.objects.get(name='purge.user'))
+        self.assertFalse(User.objects.filter(id=self.author.id).exists())
+        self.assertFalse(Post.objects.filter(user_id=self.author.id).exists())
+        self.assertFalse(Follow.objects.exists() or Comment.objects.exists() or Notification.objects.exists())
+        self.assertEqual(Post.objects.get(id=theirs.id).like_count, 0)
+        self.assertEqual(
+            Profile.objects.values_list('follower_count', 'following_count', 'unread_notification_count').get(user=self.reader),
+            (0, 0, 0),
+        )
+
+
+class MediaStorageTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = self.settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        images.variant_storage._wrapped = empty
+        self.addCleanup(setattr, images.variant_storage, '_wrapped', empty)
+        self.user = services.create_user('reader@example.com', 'pw', 'Reader')
+
+    def photo(self, color='red'):
+        buf = BytesIO()
+        Image.new('RGB', (64, 48), color).save(buf, format='JPEG')
+        return ContentFile(buf.getvalue(), name='독서 기록 사진 (최종본).jpg')
+
+    def test_same_upload_is_stored_once_and_collected_when_unreferenced(self):
+        first = services.create_post(self.user.id, None, self.photo(), None, 'one')
+        second = services.create_post(self.user.id, None, self.photo(), None, 'two')
+        name = first.user_photo.name
+        self.assertEqual(name, second.user_photo.name)
+        self.assertRegex(name, r'^post_photos/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        self.assertEqual(os.listdir(os.path.dirname(default_storage.path(name))), [os.path.basename(name)])
+        self.assertEqual(MediaBlob.objects.get(name=name).refcount, 2)
+        images.generate_variants(first.user_photo)
+
+        services.update_post(self.user.id, first.id, new_user_photo=self.photo('blue'))
+        services.delete_post(self.user.id, second.id)
+        purge.purge_posts([second.id])
+        self.assertEqual(MediaBlob.objects.get(name=name).refcount, 0)
+        self.assertEqual(media_storage.gc(), (0, 0))  # 유예 시간 안
+        self.assertTrue(default_storage.exists(name))
+
+        # 롤백된 업로드처럼 행 없이 남은 파일
+        orphan = default_storage.path(media_storage.blob_name('post_photos', 'f' * 64, '.jpg'))
+        os.makedirs(os.path.dirname(orphan))
+        with open(orphan, 'wb') as f:
+            f.write(b'x')
+        os.utime(orphan, (time.time() - 60, time.time() - 60))
+        self.assertEqual(media_storage.gc(grace_hours=0)[0], 2)
+        self.assertFalse(default_storage.exists(name) or os.path.exists(orphan))
+        self.assertFalse(images.has_variants(second.user_photo))
+        first.refresh_from_db()
+        self.assertTrue(default_storage.exists(first.user_photo.name))
+        self.assertEqual(MediaBlob.objects.get().refcount, 1)
+
+    def test_content_addressed_files_are_served_immutable(self):
+        post = services.create_post(self.user.id, None, self.photo(), None, 'one')
+        url = f'/media/{post.user_photo.name}'
+        response = self.client.get(url, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        etag = response['ETag']
+        response.close()
+        self.assertEqual(self.client.get(url, HTTP_HOST='localhost', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/media/.incoming/x', HTTP_HOST='localhost').status_code, 404)
+
+
+class InteractionApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = services.create_user('author@example.com', 'pw', 'Author')
+        self.reader = services.create_user('reader@example.com', 'pw', 'Reader')
+        self.post = services.create_post(self.author.id, None, None, None, 'text')
+
+    async def test_async_endpoints_share_auth_and_errors(self):
+        url = f'/post/{self.post.id}/like/'
+        self.assertEqual((await self.async_client.post(url, HTTP_HOST='localhost')).status_code, 401)
+        await self.async_client.aforce_login(self.reader)
+        self.assertEqual((await self.async_client.get(url, HTTP_HOST='localhost')).status_code, 400)
+
+        data = (await self.async_client.post(url, HTTP_HOST='localhost')).json()
+        self.assertEqual((data['liked'], data['new_like_count']), (True, 1))
+        response = await self.async_client.post(
+            f'/post/{self.post.id}/comment/', json.dumps({'comment_text': 'hi'}),
+            content_type='application/json', HTTP_HOST='localhost',
+        )
+        self.assertEqual(response.json()['comment']['author'], 'Reader')
+        comments = (await self.async_client.get(f'/post/{self.post.id}/comments/', HTTP_HOST='localhost')).json()
+        self.assertEqual([c['text'] for c in comments['comments']], ['hi'])
+        data = (await self.async_client.post(f'/profile/{self.author.id}/follow/', HTTP_HOST='localhost')).json()
+        self.assertEqual((data['followed'], data['follower_count']), (True, 1))
+        self.assertTrue(await Like.objects.filter(user=self.reader, post=self.post).aexists())
+
+        await sync_to_async(services.delete_post)(self.author.id, self.post.id)
+        response = await self.async_client.post(url, HTTP_HOST='localhost')
+        self.assertEqual((response.status_code, response.json()['message']), (404, '삭제된 게시물입니다.'))
+
+    @override_settings(ASYNC_API_CONCURRENCY=1, ASYNC_API_QUEUE_TIMEOUT=0.05)
+    async def test_concurrency_limit_returns_503(self):
+        await self.async_client.aforce_login(self.reader)
+        async with concurrency.limit():
+            response = await self.async_client.get('/notifications/', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        response = await self.async_client.get('/notifications/', HTTP_HOST='localhost')
+        self.assertEqual(response.json()['notifications'], [])
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        self.reader = services.create_user('reader@example.com', 'pw', 'Reader')
+        for i in range(4):
+            services.create_post(self.reader.id, None, None, None, f'post {i}')
+
+    def test_server_timing_header_and_log(self):
+        self.client.force_login(self.reader)
+        with self.assertLogs('readlog.perf') as logs:
+            response = self.client.get(f'/profile/{self.reader.id}/', HTTP_HOST='localhost')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", template;dur=')
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['path'], f'/profile/{self.reader.id}/')
+        self.assertGreater(record['queries'], 0)
+        self.assertEqual(record['template_calls'], 1)
+
+    def test_query_budget(self):
+        with instrumentation.query_budget(10, max_duplicates=1):
+            self.client.get('/', HTTP_HOST='localhost')
+        # 게시물마다 프로필을 따로 읽는 N+1
+        with self.assertRaisesMessage(AssertionError, 'queries repeated more than 1 times'):
+            with instrumentation.query_budget(10, max_duplicates=1):
+                for post in Post.objects.all():
+                    Profile.objects.get(user_id=post.user_id)
+        with self.assertRaisesMessage(AssertionError, 'exceed the budget of 2'):
+            with instrumentation.query_budget(2):
+                for post in Post.objects.all():
+                    Profile.objects.get(user_id=post.user_id)
+
+
+class SeedBenchTests(TestCase):
+    def test_seed_then_bench(self):
+        created = seed.seed(users=20, books=10, posts=60, likes=200, reposts=30, comments=50, follows=60,
+                            notifications=40, random_seed=1, batch_size=25, log=lambda *_: None)
+        self.assertEqual(Post.objects.count(), created['posts'])
+        post = Post.objects.order_by('-like_count').first()
+        self.assertEqual(post.like_count, post.like_set.count())
+        profile = Profile.objects.order_by('-follower_count').first()
+        self.assertEqual(profile.follower_count, profile.user.followers.count())
+        self.assertGreater(profile.follower_count, 60 / 20)  # 멱법칙: 인기 사용자에게 몰림
+
+        result = bench.run(iterations=2, warmup=0, log=lambda *_: None)
+        self.assertEqual(set(result['results']), set(bench.SCENARIOS))
+        self.assertGreater(result['results']['feed']['queries_per_request'], 0)
+        self.assertEqual(bench.compare(result, result)[0][3], 0.0)
+        self.assertEqual(Post.objects.get(id=result['fixtures']['post_id']).like_set.count(),
+                         Post.objects.get(id=result['fixtures']['post_id']).like_count)
+
+
+class ReadReplicaRouterTests(TestCase):
+    def test_reads_inside_read_only_views_go_to_replica(self):
+        router = db_routers.ReadReplicaRouter()
+        replica = {**settings.DATABASES['default']}
+        with override_settings(DATABASES={**settings.DATABASES, 'replica': replica}):
+            self.assertEqual(router.db_for_read(Post), 'default')
+            view = db_routers.read_replica(lambda request: (router.db_for_read(Post), router.db_for_read(Session)))
+            self.assertEqual(view(None), ('replica', 'default'))
+            self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertEqual(view(None), ('default', 'default'))
+
+
+class RankingTests(TestCase):
+    def setUp(self):
+        cache.delete(ranking.TOP_POSTS_KEY)
+        self.reader = services.create_user('reader@example.com', 'pw', 'Reader')
+        self.fans = [services.create_user(f'fan{i}@example.com', 'pw', f'Fan{i}') for i in range(6)]
+
+    def test_recent_engagement_beats_old_popularity(self):
+        old = services.create_post(self.reader.id, None, None, None, 'old')
+        new = services.create_post(self.reader.id, None, None, None, 'new')
+        week_ago = timezone.now() - timedelta(days=7)
+        Post.objects.filter(id=old.id).update(created_at=week_ago)
+        for fan in self.fans:
+            Like.objects.create(user=fan, post=old)
+        Like.objects.filter(post=old).update(created_at=week_ago)
+        Like.objects.create(user=self.fans[0], post=new)
+
+        ranking.rescore()
+        posts, _ = services.list_posts(sort='hot')
+        self.assertEqual([p.text for p in posts], ['new', 'old'])
+        with self.assertNumQueries(1):
+            self.assertEqual([p.text for p in services.top_bookup_posts(2)], ['new', 'old'])
+
+    def test_flush_updates_score_incrementally(self):
+        post = services.create_post(self.reader.id, None, None, None, 'post')
+        base = Post.objects.get(id=post.id).hot_score
+        services.toggle_like(self.fans[0].id, post.id)
+        services.add_comment(self.fans[1].id, post.id, 'nice')
+        counters.flush()
+        incremental = Post.objects.get(id=post.id).hot_score
+        self.assertAlmostEqual(incremental, base + math.log(1 + 1 + 2), places=3)
+
+        ranking.rescore()
+        self.assertAlmostEqual(Post.objects.get(id=post.id).hot_score, incremental, places=3)
+
+        services.toggle_like(self.fans[0].id, post.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            counters.flush()
+        self.assertGreaterEqual(Post.objects.get(id=post.id).hot_score, base)
+        self.assertTrue(Job.objects.filter(name='ranking.rescore').exists())
+
+
+class ViewerStateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = services.create_user('reader@example.com', 'pw', 'Reader')
+        self.fan = services.create_user('fan@example.com', 'pw', 'Fan')
+        self.posts = [services.create_post(self.reader.id, None, None, None, f'post {i}') for i in range(3)]
+
+    def test_batch_state_is_cached_and_invalidated(self):
+        first, second, third = self.posts
+        with self.captureOnCommitCallbacks(execute=True):
+            services.toggle_like(self.fan.id, first.id)
+            services.toggle_repost(self.fan.id, second.id)
+        with self.assertNumQueries(3):
+            state = viewer_state.get_many(self.fan.id, [p.id for p in self.posts])
+        self.assertEqual(state, {first.id: viewer_state.LIKED, second.id: viewer_state.REPOSTED, third.id: 0})
+        with self.assertNumQueries(0):
+            viewer_state.get_many(self.fan.id, [p.id for p in self.posts])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.add_comment(self.fan.id, third.id, 'hi')
+            services.toggle_like(self.fan.id, first.id)
+        posts = viewer_state.annotate(self.fan.id, list(Post.objects.order_by('id')))
+        self.assertEqual([(p.is_liked, p.is_reposted, p.is_commented) for p in posts],
+                         [(False, False, False), (False, True, False), (False, False, True)])
+
+    def test_feed_api_reports_viewer_state(self):
+        services.toggle_like(self.fan.id, self.posts[0].id)
+        self.client.force_login(self.fan)
+        data = self.client.get('/api/feed/', HTTP_HOST='localhost').json()
+        liked = {post['id']: post['is_liked'] for post in data['posts']}
+        self.assertEqual(liked, {self.posts[0].id: True, self.posts[1].id: False, self.posts[2].id: False})
+
+
+class CoverStub:
+    """ETag 조건부 요청에 304 로 답하는 표지 이미지 서버."""
+
+    def __init__(self):
+        self.etag = '"v1"'
+        self.color = 'red'
+        self.hits = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits.append(self.headers.get('If-None-Match'))
+                if self.headers.get('If-None-Match') == stub.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                buf = BytesIO()
+                Image.new('RGB', (1200, 1800), stub.color).save(buf, 'PNG')
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('ETag', stub.etag)
+                self.send_header('Content-Length', str(len(buf.getvalue())))
+                self.end_headers()
+                self.wfile.write(buf.getvalue())
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}/cover.png'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@override_settings(COVER_ALLOWED_HOSTS=['127.0.0.1'])
+class CoverProxyTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = self.settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        covers.cover_storage._wrapped = empty
+        self.addCleanup(setattr, covers.cover_storage, '_wrapped', empty)
+        self.stub = CoverStub()
+        self.addCleanup(self.stub.close)
+        self.user = services.create_user('cover@example.com', 'pw', 'Cover')
+
+    def test_fetch_resize_revalidate_and_serve(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = services.create_post(self.user.id, None, None, self.stub.url, 'cover')
+        self.assertEqual(Job.objects.get(name='covers.fetch').payload, {'url': self.stub.url})
+        cover = covers.fetch(self.stub.url)
+        self.assertEqual(cover.status, CoverImage.STATUS_OK)
+        with covers.cover_storage.open(covers.blob_name(cover.digest)) as f:
+            self.assertLessEqual(Image.open(f).size[1], settings.COVER_DISPLAY_SIZE[1])
+
+        # 바뀌지 않았으면 304 -> 다시 받지 않음
+        covers.fetch(self.stub.url)
+        self.assertEqual(self.stub.hits, [None, '"v1"'])
+
+        # 내용이 바뀌면 새 digest, 이전 파일 삭제
+        old_digest = cover.digest
+        self.stub.etag, self.stub.color = '"v2"', 'blue'
+        cover = covers.fetch(self.stub.url)
+        self.assertNotEqual(cover.digest, old_digest)
+        self.assertFalse(covers.cover_storage.exists(covers.blob_name(old_digest)))
+
+        covers.attach([post])
+        self.assertEqual(post.cover_src, f'/covers/{cover.digest}.jpg')
+        response = self.client.get(post.cover_src, HTTP_HOST='localhost')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', response['Cache-Control'])
+        response.close()
+        response = self.client.get(post.cover_src, HTTP_HOST='localhost', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_fetch_job_schedules_revalidation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            services.create_post(self.user.id, None, None, self.stub.url, 'cover')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(jobs.run(Job.objects.get(name='covers.fetch')))
+        revalidate = Job.objects.get(name='covers.revalidate')
+        self.assertEqual(revalidate.key, 'covers.revalidate')
+
+        # 돌고 나면 다음 주기를 다시 예약한다
+        CoverImage.objects.update(checked_at=timezone.now() - timedelta(days=settings.COVER_REVALIDATE_DAYS + 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(jobs.run(revalidate))
+        self.assertEqual(self.stub.hits, [None, '"v1"'])
+        self.assertEqual(Job.objects.filter(name='covers.revalidate', status=Job.STATUS_QUEUED).count(), 1)
+
+    def test_failed_fetch_job_keeps_failure_record(self):
+        self.stub.close()
+        with self.captureOnCommitCallbacks(execute=True):
+            covers.queue_fetch(self.stub.url)
+        job = Job.objects.get(name='covers.fetch')
+        job.attempts = 1
+        self.assertFalse(jobs.run(job))
+        # 재시도 전에 실패 기록이 남아 있어야 한다
+        cover = CoverImage.objects.get(url_hash=covers.url_hash(self.stub.url))
+        self.assertEqual((cover.status, cover.attempts), (CoverImage.STATUS_FAILED, 1))
+        self.assertNotEqual(cover.last_error, '')
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.STATUS_QUEUED)
+
+    def test_disallowed_hosts_are_not_fetched(self):
+        self.assertFalse(covers.is_allowed('http://169.254.169.254/latest/meta-data'))
+        self.assertFalse(covers.is_allowed('file:///etc/passwd'))
+        with self.captureOnCommitCallbacks(execute=True):
+            post = services.create_post(self.user.id, None, None, 'http://example.com/x.jpg', 'cover')
+        covers.attach([post])
+        self.assertEqual(post.cover_src, 'http://example.com/x.jpg')
+        self.assertFalse(Job.objects.filter(name='covers.fetch').exists())
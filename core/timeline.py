@@ -0,0 +1,180 @@
+# ============================
+# core/timeline.py
+# 팔로우 기반 홈 타임라인 (fan-out-on-write + 대형 계정은 fan-out-on-read)
+# ============================
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Follow, Post, Repost, TimelineEntry
+from .pagination import decode_cursor, encode_cursor, keyset_filter
+
+TIMELINE_CURSOR_FIELDS = ('created_at', 'post_id')
+HIGH_FANOUT_CACHE_KEY = 'timeline:high_fanout_authors'
+HIGH_FANOUT_CACHE_TTL = 600
+
+
+def _follower_ids(user_id, limit):
+    return list(Follow.objects.filter(followee_id=user_id).values_list('follower_id', flat=True)[:limit])
+
+
+def is_high_fanout(user_id):
+    """팔로워가 TIMELINE_FANOUT_LIMIT 를 넘는 계정은 쓰기 시 분배하지 않는다."""
+    return Follow.objects.filter(followee_id=user_id)[settings.TIMELINE_FANOUT_LIMIT:settings.TIMELINE_FANOUT_LIMIT + 1].exists()
+
+
+def high_fanout_author_ids():
+    """fan-out-on-read 대상 계정 id 집합 (캐시 TTL 동안 재사용)."""
+    ids = cache.get(HIGH_FANOUT_CACHE_KEY)
+    if ids is None:
+        ids = set(
+            Follow.objects.values('followee_id')
+            .annotate(n=Count('id'))
+            .filter(n__gt=settings.TIMELINE_FANOUT_LIMIT)
+            .values_list('followee_id', flat=True)
+        )
+        cache.set(HIGH_FANOUT_CACHE_KEY, ids, HIGH_FANOUT_CACHE_TTL)
+    return ids
+
+
+def _fan_out(actor_id, post_id, reason, include_actor):
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    recipients = _follower_ids(actor_id, limit + 1)
+    if len(recipients) > limit:
+        # 대형 계정: 팔로워 타임라인에는 쓰지 않고 읽을 때 합친다
+        recipients = []
+    if include_actor:
+        recipients.append(actor_id)
+    now = timezone.now()
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=uid, post_id=post_id, actor_id=actor_id, reason=reason, created_at=now) for uid in recipients],
+        ignore_conflicts=True,
+    )
+    # 받는 사람마다 평균 TIMELINE_TRIM_EVERY 번에 한 번 자른다 (분배마다 전원을 자르지 않도록 post_id 로 나눠 맡음)
+    every = settings.TIMELINE_TRIM_EVERY
+    for uid in recipients:
+        if (uid + post_id) % every == 0:
+            trim(uid)
+    return recipients
+
+
+def fan_out_post(post):
+    """새 게시물을 작성자와 팔로워들의 타임라인에 넣는다."""
+    return _fan_out(post.user_id, post.id, TimelineEntry.REASON_POST, include_actor=True)
+
+
+def fan_out_repost(user_id, post_id):
+    """리포스트한 사람의 팔로워 타임라인에 원글을 넣는다 (이미 있으면 그대로)."""
+    return _fan_out(user_id, post_id, TimelineEntry.REASON_REPOST, include_actor=False)
+
+
+def retract_repost(user_id, post_id):
+    """리포스트 취소 직후: 그 리포스트로 들어온 항목을 지운다. 다른 경로로도 보이는 글이면 남긴다."""
+    return _detach(TimelineEntry.objects.filter(actor_id=user_id, post_id=post_id, reason=TimelineEntry.REASON_REPOST))
+
+
+def backfill(follower_id, followee_id, size=None):
+    """팔로우 직후: followee 의 최근 게시물을 follower 타임라인에 채운다."""
+    if is_high_fanout(followee_id):
+        return 0
+    size = size or settings.TIMELINE_BACKFILL_SIZE
+    posts = Post.objects.filter(user_id=followee_id, deleted_at__isnull=True).order_by('-created_at', '-id').values_list('id', 'created_at')[:size]
+    entries = [
+        TimelineEntry(user_id=follower_id, post_id=post_id, actor_id=followee_id,
+                      reason=TimelineEntry.REASON_POST, created_at=created_at)
+        for post_id, created_at in posts
+    ]
+    TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+    trim(follower_id)
+    return len(entries)
+
+
+def remove_followee(follower_id, followee_id):
+    """언팔로우 직후: followee 로 인해 들어온 항목을 follower 타임라인에서 지운다. 다른 경로로도 보이는 글이면 남긴다."""
+    return _detach(TimelineEntry.objects.filter(user_id=follower_id, actor_id=followee_id))
+
+
+def _detach(entries):
+    """actor 와의 관계(팔로우/리포스트)가 이미 지워진 항목들을 정리한다. 지운 수 반환.
+
+    (user, post) 당 항목은 하나라 처음 넣은 actor 만 남아 있다. 아직 글쓴이를 팔로우하거나(또는 본인 글)
+    팔로우하는 다른 사람이 리포스트했으면 그 사람을 actor 로 바꿔 남기고, 아니면 지운다.
+    """
+    rows = list(entries.values_list('id', 'user_id', 'post_id', 'post__user_id'))
+    if not rows:
+        return 0
+    user_ids = {user_id for _, user_id, _, _ in rows}
+    post_ids = {post_id for _, _, post_id, _ in rows}
+    reposters = {}
+    for post_id, reposter_id in Repost.objects.filter(post_id__in=post_ids).values_list('post_id', 'user_id'):
+        reposters.setdefault(post_id, []).append(reposter_id)
+    candidates = {author_id for _, _, _, author_id in rows} | {uid for ids in reposters.values() for uid in ids}
+    follows = set(
+        Follow.objects.filter(follower_id__in=user_ids, followee_id__in=candidates).values_list('follower_id', 'followee_id')
+    )
+
+    doomed = []
+    for entry_id, user_id, post_id, author_id in rows:
+        if author_id == user_id or (user_id, author_id) in follows:
+            TimelineEntry.objects.filter(id=entry_id).update(actor_id=author_id, reason=TimelineEntry.REASON_POST)
+            continue
+        reposter_id = next((uid for uid in reposters.get(post_id, ()) if (user_id, uid) in follows), None)
+        if reposter_id is not None:
+            TimelineEntry.objects.filter(id=entry_id).update(actor_id=reposter_id, reason=TimelineEntry.REASON_REPOST)
+            continue
+        doomed.append(entry_id)
+    TimelineEntry.objects.filter(id__in=doomed).delete()
+    return len(doomed)
+
+
+def trim(user_id, max_length=None):
+    """타임라인을 최신 max_length 개로 자른다."""
+    max_length = max_length or settings.TIMELINE_MAX_LENGTH
+    entries = TimelineEntry.objects.filter(user_id=user_id)
+    boundary = list(entries.order_by('-created_at', '-post_id').values_list('created_at', 'post_id')[max_length:max_length + 1])
+    if not boundary:
+        return 0
+    at_or_older = keyset_filter(TIMELINE_CURSOR_FIELDS, boundary[0]) | Q(**dict(zip(TIMELINE_CURSOR_FIELDS, boundary[0])))
+    deleted, _ = entries.filter(at_or_older).delete()
+    return deleted
+
+
+def home_timeline(user_id, limit=20, cursor=None):
+    """팔로우 타임라인 한 페이지. (posts, next_cursor) 반환.
+
+    물질화된 TimelineEntry 범위 스캔에, 대형 계정 게시물만 읽을 때 합친다.
+    """
+    key = decode_cursor(cursor, TIMELINE_CURSOR_FIELDS) if cursor else None
+
+    entries = TimelineEntry.objects.filter(user_id=user_id, post__deleted_at__isnull=True) \
+        .select_related('post__user__profile', 'post__book')
+    if key:
+        entries = entries.filter(keyset_filter(TIMELINE_CURSOR_FIELDS, key))
+    candidates = [
+        (entry.created_at, entry.post_id, entry.post)
+        for entry in entries.order_by('-created_at', '-post_id')[:limit + 1]
+    ]
+
+    pulled = high_fanout_author_ids()
+    if pulled:
+        followees = set(Follow.objects.filter(follower_id=user_id, followee_id__in=pulled).values_list('followee_id', flat=True))
+        if followees:
+            posts = Post.objects.filter(user_id__in=followees, deleted_at__isnull=True).select_related('user__profile', 'book')
+            if key:
+                posts = posts.filter(keyset_filter(('created_at', 'id'), key))
+            candidates += [(post.created_at, post.id, post) for post in posts.order_by('-created_at', '-id')[:limit + 1]]
+            candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
+
+    page, seen = [], set()
+    for created_at, post_id, post in candidates:
+        if post_id in seen:
+            continue
+        seen.add(post_id)
+        page.append((created_at, post_id, post))
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1][:2])
+    return [post for _, _, post in page], next_cursor
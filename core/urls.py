@@ -1,9 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 from django.contrib.auth.views import LoginView, LogoutView # New import
 
 urlpatterns = [
     path('', views.feed, name='feed'),
+    path('api/feed/', views.feed_api, name='feed_api'),
     path('create/', views.create_post_view, name='create_post'),
     path('profile/', views.profile, name='profile'),
     path('profile/<int:user_id>/', views.profile, name='profile_detail'),
@@ -12,11 +14,22 @@ urlpatterns = [
     path('logout/', LogoutView.as_view(next_page='feed'), name='logout'), # Custom logout view
     path('post/<int:post_id>/edit/', views.edit_post_view, name='edit_post'), # New edit post URL
     path('post/<int:post_id>/delete/', views.delete_post_view, name='delete_post'), # New delete post URL
+    path('account/delete/', views.delete_account_view, name='delete_account'),
     path('post/<int:post_id>/like/', views.like_post, name='like_post'),
     path('post/<int:post_id>/repost/', views.toggle_repost, name='toggle_repost'),
     path('post/<int:post_id>/comment/', views.add_comment, name='add_comment'),
     path('post/<int:post_id>/comments/', views.list_comments_api, name='list_comments_api'),
+    path('api/comments/', views.list_comments_batch_api, name='list_comments_batch_api'),
     path('profile/<int:user_id>/follow/', views.toggle_follow, name='toggle_follow'),
     path('notifications/', views.list_notifications_api, name='list_notifications_api'),
     path('notifications/mark_read/', views.mark_notifications_read_api, name='mark_notifications_read_api'),
+    path('api/books/search/', views.search_books_api, name='search_books_api'),
+    path('api/books/typeahead/', views.book_typeahead_api, name='book_typeahead_api'),
+    path('events/', views.events_stream, name='events_stream'),
+    path('api/profile/<int:user_id>/<str:section>/', views.profile_section_api, name='profile_section_api'),
+    path('api/cache/stats/', views.fragment_cache_stats_api, name='fragment_cache_stats_api'),
+    path('api/imports/', views.import_readlog_api, name='import_readlog_api'),
+    path('api/imports/<int:run_id>/', views.import_status_api, name='import_status_api'),
+    path('covers/<str:digest>.jpg', views.cover_image, name='cover_image'),
+    path(settings.MEDIA_URL.lstrip('/') + '<path:name>', views.media_file, name='media_file'),
 ]
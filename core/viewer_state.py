@@ -0,0 +1,70 @@
+# ============================
+# core/viewer_state.py
+# 보는 사람 기준 게시물 상태 (좋아요/리포스트/댓글 여부)
+# ============================
+# 게시물 묶음에 대해 관계별로 쿼리 한 번씩(likes, reposts, comments)만 하고 set 으로 조회한다.
+# 결과는 (보는 사람, 게시물) 단위로 캐시하며, 토글/댓글 서비스가 커밋 후 해당 키만 지운다.
+# 캐시 채우기와 무효화가 엇갈려 낡은 값이 남을 수 있으므로 TTL 을 짧게 둔다.
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Comment, Like, Repost
+
+LIKED = 1
+REPOSTED = 2
+COMMENTED = 4
+
+
+def _key(user_id, post_id):
+    return f'viewer_state:{user_id}:{post_id}'
+
+
+def _load(user_id, post_ids):
+    """DB 에서 직접. {post_id: 비트 플래그}."""
+    state = dict.fromkeys(post_ids, 0)
+    for model, flag in ((Like, LIKED), (Repost, REPOSTED), (Comment, COMMENTED)):
+        for post_id in set(model.objects.filter(user_id=user_id, post_id__in=post_ids).values_list('post_id', flat=True)):
+            state[post_id] |= flag
+    return state
+
+
+def get_many(user_id, post_ids):
+    """{post_id: 비트 플래그}. 캐시에 없는 게시물만 DB 에서 읽는다."""
+    post_ids = list(dict.fromkeys(post_ids))
+    if not post_ids:
+        return {}
+    keys = {post_id: _key(user_id, post_id) for post_id in post_ids}
+    found = cache.get_many(list(keys.values()))
+    state = {post_id: found[key] for post_id, key in keys.items() if key in found}
+    missing = [post_id for post_id in post_ids if post_id not in state]
+    if missing:
+        loaded = _load(user_id, missing)
+        cache.set_many({keys[post_id]: flags for post_id, flags in loaded.items()}, settings.VIEWER_STATE_CACHE_TIMEOUT)
+        state.update(loaded)
+    return state
+
+
+def annotate(user_id, posts):
+    """각 post 에 is_liked / is_reposted / is_commented 를 붙인다. 로그인하지 않았으면 모두 False."""
+    state = get_many(user_id, [post.id for post in posts]) if user_id else {}
+    for post in posts:
+        flags = state.get(post.id, 0)
+        post.is_liked = bool(flags & LIKED)
+        post.is_reposted = bool(flags & REPOSTED)
+        post.is_commented = bool(flags & COMMENTED)
+    return posts
+
+
+def as_dict(post):
+    """JSON 응답용."""
+    return {
+        'is_liked': getattr(post, 'is_liked', False),
+        'is_reposted': getattr(post, 'is_reposted', False),
+        'is_commented': getattr(post, 'is_commented', False),
+    }
+
+
+def invalidate(user_id, post_id):
+    """user_id 가 post_id 에 좋아요/리포스트/댓글을 바꾼 뒤 호출. 커밋된 뒤에 지운다."""
+    transaction.on_commit(lambda: cache.delete(_key(user_id, post_id)))
@@ -1,20 +1,102 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation, ValidationError
+from django.core.files.storage import default_storage
+from django.shortcuts import aget_object_or_404, render, redirect, get_object_or_404
 from django.urls import reverse
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
 import json # New import
-from . import services
-from .models import Like, Repost, Comment, Follow, Notification # New import
+import os
+import uuid
+from functools import wraps
+from . import book_search, concurrency, covers, fragments, importers, jobs, media_storage, realtime, services, viewer_state
+from .db_routers import read_replica
+from .pagination import InvalidCursor
+from .models import Like, Repost, Comment, Follow, ImportRun, Notification, Post, Profile # New import
+from django.contrib.auth import logout
 from django.contrib.auth.models import User # New import
 
+FEED_PAGE_SIZE = 20
+PROFILE_PAGE_SIZE = 12
+
+def _annotate_viewer_state(request, posts):
+    """로그인 사용자의 좋아요/리포스트/댓글 여부를 각 post 에 표시."""
+    viewer_state.annotate(request.user.id if request.user.is_authenticated else None, posts)
+
+def _embed_comments(posts):
+    """FEED_EMBED_COMMENTS 가 켜져 있으면 최신 댓글 미리보기를 서버에서 함께 렌더링.
+
+    조각 캐시에 없는 게시물에 대해서만 호출된다.
+    """
+    if not settings.FEED_EMBED_COMMENTS or not posts:
+        return
+    batch = services.list_comments_batch([post.id for post in posts], per_post=settings.FEED_COMMENT_PREVIEW_SIZE)
+    for post in posts:
+        post.comments_embedded = True
+        post.preview_comments = batch[post.id]['comments']
+        post.comment_total = batch[post.id]['total']
+
+def _prepare_fragments(posts):
+    """조각 캐시에 없는 게시물을 렌더링하기 전 일괄 준비 (표지 주소, 댓글 미리보기)."""
+    covers.attach(posts)
+    _embed_comments(posts)
+
+def _serialize_comment(comment):
+    return {
+        'id': comment.id,
+        'text': comment.text,
+        'author': comment.user.profile.nickname,
+        'created_at': comment.created_at.strftime("%Y-%m-%d %H:%M"),
+    }
+
+def _feed_page(request):
+    """?tab=following 이면 팔로우 타임라인, 아니면 전체 피드 한 페이지. (posts, next_cursor, sort, tab)"""
+    tab = request.GET.get('tab', 'all')
+    sort = request.GET.get('sort', 'latest')
+    if sort not in services.POST_SORT_KEYS:
+        sort = 'latest'
+    cursor = request.GET.get('cursor')
+    if tab == 'following' and request.user.is_authenticated:
+        posts, next_cursor = services.home_timeline(request.user.id, limit=FEED_PAGE_SIZE, cursor=cursor)
+    else:
+        tab = 'all'
+        posts, next_cursor = services.list_posts(limit=FEED_PAGE_SIZE, cursor=cursor, sort=sort)
+    _annotate_viewer_state(request, posts)
+    fragments.attach(posts, prepare_misses=_prepare_fragments)
+    return posts, next_cursor, sort, tab
+
+@read_replica
 def feed(request):
-    posts = services.list_posts()
-    if request.user.is_authenticated:
-        liked_posts_ids = Like.objects.filter(user=request.user, post__in=posts).values_list('post_id', flat=True)
-        reposted_posts_ids = Repost.objects.filter(user=request.user, post__in=posts).values_list('post_id', flat=True)
-        for post in posts:
-            post.is_liked = post.id in liked_posts_ids
-            post.is_reposted = post.id in reposted_posts_ids
-    return render(request, 'feed.html', {'posts': posts})
+    try:
+        posts, next_cursor, sort, tab = _feed_page(request)
+    except InvalidCursor:
+        return redirect(reverse('feed'))
+    return render(request, 'feed.html', {'posts': posts, 'next_cursor': next_cursor, 'sort': sort, 'tab': tab})
+
+@read_replica
+def feed_api(request):
+    """무한 스크롤용: 다음 페이지의 카드 HTML 과 next_cursor 반환."""
+    try:
+        posts, next_cursor, sort, tab = _feed_page(request)
+    except InvalidCursor:
+        return JsonResponse({'status': 'error', 'message': '잘못된 커서입니다.'}, status=400)
+    html = ''.join(render_to_string('_post_card.html', {'post': post}, request=request) for post in posts)
+    return JsonResponse({
+        'status': 'success',
+        'posts': [{
+            'id': post.id,
+            'author': post.user.profile.nickname,
+            'text': post.text,
+            'created_at': post.created_at.strftime("%Y-%m-%d %H:%M"),
+            'like_count': post.like_count,
+            'repost_count': post.repost_count,
+            **viewer_state.as_dict(post),
+        } for post in posts],
+        'html': html,
+        'next_cursor': next_cursor,
+    })
 
 def create_post_view(request):
     search_results = []
@@ -33,19 +115,23 @@ def create_post_view(request):
         book_title = request.POST.get('book_title')
         book_author = request.POST.get('book_author')
         book_cover_url = request.POST.get('book_cover_url')
+        book_isbn = request.POST.get('book_isbn')
         user_photo = request.FILES.get('user_photo')
 
         book = None
         if book_title and book_author:
-            book = services.save_book_if_needed(book_title, book_author, book_cover_url)
-
-        services.create_post(
-            user_id=request.user.id,
-            book_id=book.id if book else None,
-            user_photo=user_photo,
-            book_cover_url_snapshot=book_cover_url,
-            text=text
-        )
+            book = services.save_book_if_needed(book_title, book_author, book_cover_url, book_isbn)
+
+        try:
+            services.create_post(
+                user_id=request.user.id,
+                book_id=book.id if book else None,
+                user_photo=user_photo,
+                book_cover_url_snapshot=book_cover_url,
+                text=text
+            )
+        except ValidationError as e:
+            return render(request, 'create_post.html', {'search_results': search_results, 'error': e.messages[0]})
         return redirect(reverse('feed'))
     elif request.method == 'GET':
         query = request.GET.get('query')
@@ -53,36 +139,60 @@ def create_post_view(request):
             search_results = services.search_books(query)
     return render(request, 'create_post.html', {'search_results': search_results})
 
+@read_replica
 def profile(request, user_id=None):
     if user_id:
-        viewed_user = get_object_or_404(User, id=user_id)
+        viewed_user = get_object_or_404(User, id=user_id, is_active=True)
     else:
         if not request.user.is_authenticated:
             return redirect(reverse('feed'))
         viewed_user = request.user
 
     user_profile = viewed_user.profile
-    my_posts = services.my_posts(viewed_user.id)
-    my_reposts = services.my_reposts(viewed_user.id)
+    my_posts, posts_cursor = services.my_posts(viewed_user.id, limit=PROFILE_PAGE_SIZE)
+    my_reposts, reposts_cursor = services.my_reposts(viewed_user.id, limit=PROFILE_PAGE_SIZE)
+    _annotate_viewer_state(request, my_posts + [repost.post for repost in my_reposts])
+    covers.attach(my_posts + [repost.post for repost in my_reposts])
 
     is_following = False
     if request.user.is_authenticated and request.user != viewed_user:
         is_following = services.is_following(request.user.id, viewed_user.id)
 
-    follower_count = services.get_follower_count(viewed_user.id)
-    following_count = services.get_following_count(viewed_user.id)
-
     context = {
         'viewed_user': viewed_user,
         'user_profile': user_profile,
         'my_posts': my_posts,
+        'posts_cursor': posts_cursor,
         'my_reposts': my_reposts,
+        'reposts_cursor': reposts_cursor,
         'is_following': is_following,
-        'follower_count': follower_count,
-        'following_count': following_count,
+        # 비정규화 카운트 (COUNT 쿼리 없음)
+        'follower_count': user_profile.follower_count,
+        'following_count': user_profile.following_count,
     }
     return render(request, 'profile.html', context)
 
+PROFILE_SECTIONS = {
+    'posts': (services.my_posts, '_profile_post_card.html', 'post'),
+    'reposts': (services.my_reposts, '_profile_repost_card.html', 'repost'),
+}
+
+@read_replica
+def profile_section_api(request, user_id, section):
+    """프로필 탭의 다음 페이지 카드 HTML 과 next_cursor 반환."""
+    if section not in PROFILE_SECTIONS:
+        return JsonResponse({'status': 'error', 'message': '잘못된 요청입니다.'}, status=400)
+    load_page, template, name = PROFILE_SECTIONS[section]
+    try:
+        items, next_cursor = load_page(user_id, limit=PROFILE_PAGE_SIZE, cursor=request.GET.get('cursor'))
+    except InvalidCursor:
+        return JsonResponse({'status': 'error', 'message': '잘못된 커서입니다.'}, status=400)
+    posts = [item.post if section == 'reposts' else item for item in items]
+    _annotate_viewer_state(request, posts)
+    covers.attach(posts)
+    html = ''.join(render_to_string(template, {name: item}, request=request) for item in items)
+    return JsonResponse({'status': 'success', 'html': html, 'next_cursor': next_cursor})
+
 def signup_view(request):
     if request.method == 'POST':
         email = request.POST.get('email')
@@ -112,12 +222,15 @@ def edit_post_view(request, post_id):
         new_text = request.POST.get('text')
         new_user_photo = request.FILES.get('user_photo')
 
-        services.update_post(
-            user_id=request.user.id,
-            post_id=post_id,
-            new_text=new_text,
-            new_user_photo=new_user_photo
-        )
+        try:
+            services.update_post(
+                user_id=request.user.id,
+                post_id=post_id,
+                new_text=new_text,
+                new_user_photo=new_user_photo
+            )
+        except ValidationError as e:
+            return render(request, 'edit_post.html', {'post': post, 'error': e.messages[0]})
         return redirect(reverse('profile'))
     
     context = {'post': post}
@@ -139,105 +252,257 @@ def delete_post_view(request, post_id):
     context = {'post': post}
     return render(request, 'delete_post_confirm.html', context)
 
-def like_post(request, post_id):
+def delete_account_view(request):
     if not request.user.is_authenticated:
-        return JsonResponse({'status': 'error', 'message': '로그인이 필요합니다.'}, status=401)
-
-    if request.method == 'POST':
-        liked, new_like_count = services.toggle_like(request.user.id, post_id)
-        return JsonResponse({'status': 'success', 'liked': liked, 'new_like_count': new_like_count})
-    
-    return JsonResponse({'status': 'error', 'message': '잘못된 요청입니다.'}, status=400)
-
-def toggle_repost(request, post_id):
-    if not request.user.is_authenticated:
-        return JsonResponse({'status': 'error', 'message': '로그인이 필요합니다.'}, status=401)
+        return redirect(reverse('feed'))
 
     if request.method == 'POST':
-        reposted, new_repost_count = services.toggle_repost(request.user.id, post_id)
-        return JsonResponse({'status': 'success', 'reposted': reposted, 'new_repost_count': new_repost_count})
-    
-    return JsonResponse({'status': 'error', 'message': '잘못된 요청입니다.'}, status=400)
-
-def add_comment(request, post_id):
-    if not request.user.is_authenticated:
-        return JsonResponse({'status': 'error', 'message': '로그인이 필요합니다.'}, status=401)
+        # 게시물은 바로 숨겨지고, 나머지는 백그라운드에서 지워진다 (core/purge.py)
+        services.delete_account(request.user.id)
+        logout(request)
+        return redirect(reverse('feed'))
 
-    if request.method == 'POST':
-        try:
-            data = json.loads(request.body)
-            comment_text = data.get('comment_text')
-            if not comment_text:
-                return JsonResponse({'status': 'error', 'message': '댓글 내용을 입력해주세요.'}, status=400)
-            
-            comment = services.add_comment(request.user.id, post_id, comment_text)
-            return JsonResponse({
-                'status': 'success',
-                'comment': {
-                    'id': comment.id,
-                    'text': comment.text,
-                    'author': comment.user.profile.nickname,
-                    'created_at': comment.created_at.strftime("%Y-%m-%d %H:%M"),
-                }
-            })
-        except json.JSONDecodeError:
-            return JsonResponse({'status': 'error', 'message': '잘못된 JSON 형식입니다.'}, status=400)
-    
-    return JsonResponse({'status': 'error', 'message': '잘못된 요청입니다.'}, status=400)
-
-def list_comments_api(request, post_id):
-    comments = services.list_comments(post_id)
-    comments_data = []
-    for comment in comments:
-        comments_data.append({
-            'id': comment.id,
-            'text': comment.text,
-            'author': comment.user.profile.nickname,
-            'created_at': comment.created_at.strftime("%Y-%m-%d %H:%M"),
-        })
+    return render(request, 'delete_account_confirm.html')
+
+# -----------------------------
+# 상호작용 API (async)
+# -----------------------------
+# ASGI 에서는 요청마다 스레드를 잡지 않고 이벤트 루프에서 처리한다. 트랜잭션이 필요한 토글은
+# services 의 sync_to_async 래퍼(atoggle_*)가 한 스레드에서 통째로 실행한다.
+def _api_error(message, status):
+    return JsonResponse({'status': 'error', 'message': message}, status=status)
+
+def _interaction_api(methods=('POST',), login_required=True):
+    """로그인/메서드 확인, 워커당 동시 처리 수 제한(core/concurrency.py), 공통 오류 응답.
+
+    뷰는 await request.auser() 결과를 두 번째 인자 user 로 받는다.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await request.auser()
+            if login_required and not user.is_authenticated:
+                return _api_error('로그인이 필요합니다.', 401)
+            if request.method not in methods:
+                return _api_error('잘못된 요청입니다.', 400)
+            try:
+                async with concurrency.limit():
+                    return await view(request, user, *args, **kwargs)
+            except concurrency.Busy:
+                response = _api_error('요청이 많습니다. 잠시 후 다시 시도해주세요.', 503)
+                response['Retry-After'] = '1'
+                return response
+            except Post.DoesNotExist:
+                return _api_error('삭제된 게시물입니다.', 404)
+            except json.JSONDecodeError:
+                return _api_error('잘못된 JSON 형식입니다.', 400)
+            except InvalidCursor:
+                return _api_error('잘못된 커서입니다.', 400)
+        return wrapper
+    return decorator
+
+@_interaction_api()
+async def like_post(request, user, post_id):
+    liked, new_like_count = await services.atoggle_like(user.id, post_id)
+    return JsonResponse({'status': 'success', 'liked': liked, 'new_like_count': new_like_count})
+
+@_interaction_api()
+async def toggle_repost(request, user, post_id):
+    reposted, new_repost_count = await services.atoggle_repost(user.id, post_id)
+    return JsonResponse({'status': 'success', 'reposted': reposted, 'new_repost_count': new_repost_count})
+
+@_interaction_api()
+async def add_comment(request, user, post_id):
+    comment_text = json.loads(request.body).get('comment_text')
+    if not comment_text:
+        return _api_error('댓글 내용을 입력해주세요.', 400)
+    comment = await services.aadd_comment(user.id, post_id, comment_text)
+    return JsonResponse({'status': 'success', 'comment': _serialize_comment(comment)})
+
+@read_replica
+@_interaction_api(methods=('GET',), login_required=False)
+async def list_comments_api(request, user, post_id):
+    comments = await services.alist_comments(post_id)
+    comments_data = [_serialize_comment(comment) for comment in comments]
     return JsonResponse({'status': 'success', 'comments': comments_data})
 
-def toggle_follow(request, user_id):
+COMMENTS_BATCH_MAX_POSTS = 100
+COMMENTS_BATCH_MAX_PER_POST = 20
+
+@read_replica
+def list_comments_batch_api(request):
+    """?post_ids=1,2,3&limit=3 → 게시물별 최신 댓글 limit 개와 전체 댓글 수."""
+    try:
+        post_ids = [int(pid) for pid in request.GET.get('post_ids', '').split(',') if pid.strip()]
+        limit = int(request.GET.get('limit', settings.FEED_COMMENT_PREVIEW_SIZE))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': '잘못된 요청입니다.'}, status=400)
+    if not post_ids or len(post_ids) > COMMENTS_BATCH_MAX_POSTS:
+        return JsonResponse({'status': 'error', 'message': f'post_ids 는 1~{COMMENTS_BATCH_MAX_POSTS}개여야 합니다.'}, status=400)
+    limit = max(1, min(limit, COMMENTS_BATCH_MAX_PER_POST))
+
+    batch = services.list_comments_batch(post_ids, per_post=limit)
+    return JsonResponse({
+        'status': 'success',
+        'posts': {
+            str(post_id): {
+                'comments': [_serialize_comment(comment) for comment in entry['comments']],
+                'total': entry['total'],
+            }
+            for post_id, entry in batch.items()
+        },
+    })
+
+@_interaction_api()
+async def toggle_follow(request, user, user_id):
+    # user_id is the ID of the user being followed/unfollowed
+    followed_user = await aget_object_or_404(User, id=user_id, is_active=True)
+
+    if user.id == followed_user.id:
+        return _api_error('자기 자신을 팔로우할 수 없습니다.', 400)
+
+    followed, follower_count = await services.atoggle_follow(user.id, followed_user.id)
+    return JsonResponse({'status': 'success', 'followed': followed, 'follower_count': follower_count})
+
+@_interaction_api(methods=('GET',))
+async def list_notifications_api(request, user):
+    """알림 목록 한 페이지 (?cursor=...). 관련 사용자/프로필은 한 번의 조인으로 불러온다."""
+    notifications, next_cursor = await services.alist_notifications(
+        user.id, limit=settings.NOTIFICATION_PAGE_SIZE, cursor=request.GET.get('cursor'),
+    )
+    feed_url = reverse('feed')
+    notifications_data = [notif.to_dict(feed_url) for notif in notifications]
+    return JsonResponse({'status': 'success', 'notifications': notifications_data, 'next_cursor': next_cursor})
+
+@_interaction_api()
+async def mark_notifications_read_api(request, user):
+    await services.amark_all_notifications_read(user.id)
+    return JsonResponse({'status': 'success', 'message': '모든 알림을 읽음으로 표시했습니다.'})
+
+def fragment_cache_stats_api(request):
+    """피드 조각 캐시 히트/미스 통계 (스태프 전용)."""
+    if not request.user.is_staff:
+        return JsonResponse({'status': 'error', 'message': '권한이 없습니다.'}, status=403)
+    return JsonResponse({'status': 'success', 'stats': fragments.stats()})
+
+def import_readlog_api(request):
+    """POST: 독서 기록 파일(file)을 올려 가져오기 시작 (처리는 백그라운드 작업). 진행 상황은 import_status_api."""
     if not request.user.is_authenticated:
         return JsonResponse({'status': 'error', 'message': '로그인이 필요합니다.'}, status=401)
-
-    if request.method == 'POST':
-        # user_id is the ID of the user being followed/unfollowed
-        followed_user = get_object_or_404(User, id=user_id)
-
-        if request.user == followed_user:
-            return JsonResponse({'status': 'error', 'message': '자기 자신을 팔로우할 수 없습니다.'}, status=400)
-
-        followed, follower_count = services.toggle_follow(request.user.id, followed_user.id)
-        return JsonResponse({'status': 'success', 'followed': followed, 'follower_count': follower_count})
-    
-    return JsonResponse({'status': 'error', 'message': '잘못된 요청입니다.'}, status=400)
-
-def list_notifications_api(request):
+    upload = request.FILES.get('file')
+    if request.method != 'POST' or not upload:
+        return JsonResponse({'status': 'error', 'message': '잘못된 요청입니다.'}, status=400)
+    if upload.size > settings.IMPORT_UPLOAD_MAX_BYTES:
+        return JsonResponse({'status': 'error', 'message': '파일이 너무 큽니다.'}, status=400)
+    os.makedirs(settings.IMPORT_DIR, exist_ok=True)
+    path = os.path.join(settings.IMPORT_DIR, f'{uuid.uuid4().hex}{os.path.splitext(upload.name)[1][:10]}')
+    with open(path, 'wb') as out:
+        for chunk in upload.chunks():
+            out.write(chunk)
+    try:
+        import_run = importers.start(request.user.id, path, source_name=upload.name)
+    except ValueError as e:
+        os.unlink(path)
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    jobs.enqueue('imports.run', {'run_id': import_run.id}, key=f'imports.run:{import_run.id}')
+    return JsonResponse({'status': 'success', 'import': import_run.to_dict()}, status=202)
+
+def import_status_api(request, run_id):
     if not request.user.is_authenticated:
         return JsonResponse({'status': 'error', 'message': '로그인이 필요합니다.'}, status=401)
-
-    notifications = services.list_notifications(request.user.id)
-    notifications_data = []
-    for notif in notifications:
-        notifications_data.append({
-            'id': notif.id,
-            'type': notif.notification_type,
-            'from_user': notif.from_user.profile.nickname,
-            'post_id': notif.post.id if notif.post else None,
-            'is_read': notif.is_read,
-            'created_at': notif.created_at.strftime("%Y-%m-%d %H:%M"),
-            'message': notif.get_display_message(),
-            'url': notif.get_notification_url()
-        })
-    return JsonResponse({'status': 'success', 'notifications': notifications_data})
-
-def mark_notifications_read_api(request):
-    if not request.user.is_authenticated:
+    import_run = ImportRun.objects.filter(id=run_id, user_id=request.user.id).first()
+    if not import_run:
+        return JsonResponse({'status': 'error', 'message': '가져오기를 찾을 수 없습니다.'}, status=404)
+    return JsonResponse({'status': 'success', 'import': import_run.to_dict()})
+
+def cover_image(request, digest):
+    """받아 둔 책 표지. 주소가 내용 해시이므로 바뀌지 않는다 -> 영구 캐시."""
+    if len(digest) != 64 or any(c not in '0123456789abcdef' for c in digest):
+        raise Http404
+    etag = f'"{digest}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        try:
+            response = FileResponse(covers.cover_storage.open(covers.blob_name(digest)), content_type='image/jpeg')
+        except FileNotFoundError:
+            raise Http404
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={settings.COVER_CACHE_MAX_AGE}, immutable'
+    return response
+
+def media_file(request, name):
+    """업로드 파일 / 파생본. 내용 주소 이름이면 (core/media_storage.py) 바뀌지 않으므로 영구 캐시."""
+    if name.split('/', 1)[0] == media_storage.INCOMING_DIR:
+        raise Http404
+    digest = media_storage.digest_of(name)
+    etag = f'"{digest}"' if digest else None
+    if etag and etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        try:
+            response = FileResponse(default_storage.open(name))
+        except (FileNotFoundError, IsADirectoryError, SuspiciousFileOperation):
+            raise Http404
+    if etag:
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable'
+    return response
+
+async def search_books_api(request):
+    """?q= 도서 검색 (비동기: 두 제공자를 동시에 기다리는 동안 워커를 점유하지 않음)."""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'status': 'error', 'message': '검색어를 입력해주세요.'}, status=400)
+    results = await book_search.search(query)
+    return JsonResponse({'status': 'success', 'results': results})
+
+TYPEAHEAD_LIMIT = 10
+
+async def book_typeahead_api(request):
+    """?q= 자동완성: 로컬 인덱스로 답하고, 결과가 부족할 때만 외부 검색을 덧붙인다."""
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'status': 'success', 'results': [], 'source': 'local'})
+    results = await sync_to_async(services.local_book_search)(query, TYPEAHEAD_LIMIT)
+    source = 'local'
+    if len(results) < settings.TYPEAHEAD_MIN_LOCAL_RESULTS and len(query) >= 2:
+        remote = await book_search.search(query)
+        results = book_search.merge_results(results, remote)[:TYPEAHEAD_LIMIT]
+        source = 'mixed'
+    return JsonResponse({'status': 'success', 'results': results, 'source': source})
+
+async def events_stream(request):
+    """Server-Sent Events: 내 알림/미확인 수와 피드 카운트 변화를 밀어 준다.
+
+    ASGI 에서만 동작한다 (연결마다 스레드를 잡지 않음). WSGI 면 204 로 답해 브라우저가 재연결하지 않게 한다.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
         return JsonResponse({'status': 'error', 'message': '로그인이 필요합니다.'}, status=401)
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    unread_count = await services.astored_unread_count(user.id)
 
-    if request.method == 'POST':
-        services.mark_all_notifications_read(request.user.id)
-        return JsonResponse({'status': 'success', 'message': '모든 알림을 읽음으로 표시했습니다.'})
-    
-    return JsonResponse({'status': 'error', 'message': '잘못된 요청입니다.'}, status=400)
\ No newline at end of file
+    async def stream():
+        subscription = realtime.subscribe([realtime.user_channel(user.id), realtime.FEED_CHANNEL])
+        try:
+            yield "retry: 5000\n\n"
+            yield realtime.format_event({'type': 'unread', 'unread_count': unread_count})
+            while True:
+                event = await subscription.get(timeout=settings.REALTIME_HEARTBEAT)
+                if subscription.overflowed:
+                    # 밀린 이벤트를 버렸으니 클라이언트가 목록을 다시 받아야 한다
+                    subscription.overflowed = False
+                    yield realtime.format_event({'type': 'resync'})
+                if event is None:
+                    yield ": ping\n\n"
+                else:
+                    yield realtime.format_event(event)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx 버퍼링 끄기
+    return response
@@ -1,7 +1,7 @@
-from core import services
-
 def unread_notifications(request):
+    # 프로필의 비정규화 카운트를 읽는다. 네비게이션 바가 닉네임 표시에 어차피 profile 을 불러오므로 추가 쿼리가 없다.
     if request.user.is_authenticated:
-        count = services.unread_notifications_count(request.user.id)
+        profile = getattr(request.user, 'profile', None)
+        count = profile.unread_notification_count if profile else 0
         return {'unread_notifications_count': count}
-    return {'unread_notifications_count': 0}
\ No newline at end of file
+    return {'unread_notifications_count': 0}
@@ -66,6 +66,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.instrumentation.instrumentation_middleware',  # INSTRUMENTATION_ENABLED 일 때만 동작
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,7 +80,7 @@ ROOT_URLCONF = 'readlog_django.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.instrumentation.TimedDjangoTemplates',  # 렌더링 시간 계측을 더한 DjangoTemplates
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -103,13 +104,109 @@ CSRF_TRUSTED_ORIGINS = env_list('CSRF_TRUSTED_ORIGINS', default=[])
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+# DB_PROFILE:
+#   'sqlite'     기본 저널 모드의 SQLite 파일 하나 (예전 설정)
+#   'sqlite-wal' WAL + busy_timeout + synchronous=NORMAL 등 연결마다 PRAGMA 적용
+#   'postgres'   POSTGRES_* 환경 변수
+# DB_READ_REPLICA=1 이면 읽기 전용 연결 'replica' 를 둔다 (sqlite-wal: 같은 파일의 query_only 연결,
+# postgres: POSTGRES_REPLICA_HOST). 읽기 전용 뷰(@read_replica)의 조회는 core.db_routers.ReadReplicaRouter 가 그쪽으로 보낸다.
+# 테스트에서는 켜지 않는다 (TestCase 트랜잭션 안의 데이터가 다른 연결에서는 안 보이므로).
+DB_READ_REPLICA = env_bool('DB_READ_REPLICA', default=False)
+# sqlite-wal 쓰기 트랜잭션 시작 방식. IMMEDIATE 는 시작할 때 쓰기 잠금을 잡아, 읽다가 쓰기로 올릴 때의 "database is locked" 를 피한다
+SQLITE_TRANSACTION_MODE = os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE') or None
+DB_PROFILE = os.environ.get('DB_PROFILE', 'sqlite-wal')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))  # 영속 연결 유지 시간(초). 0 이면 요청마다 새 연결
+SQLITE_PATH = os.environ.get('SQLITE_PATH', BASE_DIR / 'data' / 'readlog.db')
+
+SQLITE_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',            # 읽기와 쓰기가 서로 막지 않음
+    'PRAGMA synchronous=NORMAL',          # WAL 에서는 커밋마다 fsync 하지 않아도 손상되지 않음
+    'PRAGMA busy_timeout=5000',           # 쓰기 잠금을 바로 실패하지 않고 5초까지 기다림
+    'PRAGMA mmap_size=268435456',         # 256MB 메모리 맵 읽기
+    'PRAGMA cache_size=-65536',           # 연결당 페이지 캐시 64MB
+    'PRAGMA temp_store=MEMORY',
+]
+
+if DB_PROFILE == 'postgres':
+    _postgres = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'readlog'),
+        'USER': os.environ.get('POSTGRES_USER', 'readlog'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    }
+    DATABASES = {'default': _postgres}
+    if DB_READ_REPLICA and os.environ.get('POSTGRES_REPLICA_HOST'):
+        DATABASES['replica'] = {**_postgres, 'HOST': os.environ['POSTGRES_REPLICA_HOST']}
+elif DB_PROFILE == 'sqlite-wal':
+    _sqlite = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'data' / 'readlog.db',
+        'NAME': SQLITE_PATH,
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': '; '.join(SQLITE_PRAGMAS),
+            'transaction_mode': SQLITE_TRANSACTION_MODE,
+            'timeout': 5,
+        },
+    }
+    DATABASES = {'default': _sqlite}
+    if DB_READ_REPLICA:
+        # 같은 파일을 읽기 전용으로 여는 연결. WAL 이라 쓰기 트랜잭션과 서로 막지 않는다
+        DATABASES['replica'] = {
+            **_sqlite,
+            'OPTIONS': {'init_command': '; '.join(SQLITE_PRAGMAS + ['PRAGMA query_only=ON']), 'timeout': 5},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': SQLITE_PATH,
+        }
+    }
+
+DATABASE_ROUTERS = ['core.db_routers.ReadReplicaRouter']
+
+
+# Cache
+# CACHE_BACKEND: 'locmem'(기본) | 'file' | 'redis'. redis 는 REDIS_URL 과 redis 패키지가 필요하다.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/0')
+
+def cache_config(name: str, max_entries: int = 300) -> dict:
+    if CACHE_BACKEND == 'redis':
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': name,
+        }
+    if CACHE_BACKEND == 'file':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'data' / 'cache' / name,
+            'OPTIONS': {'MAX_ENTRIES': max_entries},
+        }
+    return {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': name,
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
     }
+
+CACHES = {
+    'default': cache_config('default'),
+    'fragments': cache_config('fragments', max_entries=int(os.environ.get('FRAGMENT_CACHE_MAX_ENTRIES', 5000))),
 }
 
+# 피드 카드 조각 캐시 (core/fragments.py)
+FRAGMENT_CACHE_ALIAS = 'fragments'
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# 보는 사람별 좋아요/리포스트/댓글 여부 캐시 (core/viewer_state.py)
+VIEWER_STATE_CACHE_TIMEOUT = 60 * 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -148,11 +245,120 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {
+    # 업로드 파일은 내용 해시 이름으로 한 번만 저장하고 참조 수로 관리 (core/media_storage.py)
+    'default': {'BACKEND': 'core.media_storage.ContentAddressedStorage'},
+    # 예전 STATICFILES_STORAGE 설정은 Django 5.1 에서 없어져 읽히지 않고 있었다. 그동안 실제로 쓰이던 기본 백엔드.
+    # whitenoise 의 CompressedManifestStaticFilesStorage 로 바꾸려면 배포 시 collectstatic 이 먼저 돌아야 한다.
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
 
 # Media files (User uploaded content)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365    # 내용 주소 업로드 / 파생본 브라우저·CDN 캐시 (이름이 내용이라 변하지 않음)
+MEDIA_GC_GRACE_HOURS = 24                   # 참조가 0 이 된 뒤 이만큼 지나야 gc_media 가 지움 (되돌린 삭제, 진행 중 업로드 보호)
+
+# Feed
+# 피드 카드에 최신 댓글 미리보기를 서버에서 함께 렌더링할지 여부 (끄면 클라이언트가 일괄 API 한 번으로 불러옴)
+FEED_EMBED_COMMENTS = env_bool('FEED_EMBED_COMMENTS', default=True)
+FEED_COMMENT_PREVIEW_SIZE = 3
+
+# Home timeline (팔로우 피드)
+TIMELINE_MAX_LENGTH = 800          # 사용자별 물질화 타임라인 최대 길이
+TIMELINE_FANOUT_LIMIT = 10000      # 팔로워가 이보다 많으면 쓰기 시 분배 대신 읽을 때 합침
+TIMELINE_BACKFILL_SIZE = 50        # 팔로우 직후 채워 넣을 최근 게시물 수
+TIMELINE_TRIM_EVERY = 20           # fan-out 때 받는 사람 타임라인을 평균 이 횟수마다 한 번 자름 (최대 길이 초과분 상한)
+
+# Counters
+# 좋아요/리포스트 증감을 Post 에 합산하는 주기(초). 첫 증감 뒤 이 시간 안에 flush 작업이 돈다. 별도로 `manage.py flush_counters --loop` 를 돌려도 된다.
+COUNTER_FLUSH_INTERVAL = float(os.environ.get('COUNTER_FLUSH_INTERVAL', 5))
+
+# Hot ranking (core/ranking.py)
+HOT_SCORE_HALF_LIFE_HOURS = float(os.environ.get('HOT_SCORE_HALF_LIFE_HOURS', 24))  # 반응의 가치가 절반이 되는 시간
+HOT_RESCORE_INTERVAL = 60 * 15      # 반응이 있을 때 ranking.rescore 작업을 도는 주기(초)
+HOT_RESCORE_MAX_AGE_DAYS = 30       # 재계산하는 게시물 범위 (이보다 오래된 글은 순위 밖)
+HOT_TOP_POSTS_SIZE = 20             # 미리 계산해 두는 상위 게시물 수
+HOT_TOP_POSTS_TIMEOUT = 60 * 10
+
+# Background jobs (core/jobs.py, `manage.py runworker`)
+# JOBS_EAGER=True 면 워커 없이 커밋 직후 요청 프로세스에서 바로 실행한다.
+JOBS_EAGER = env_bool('JOBS_EAGER', default=False)
+JOBS_WORKER_CONCURRENCY = int(os.environ.get('JOBS_WORKER_CONCURRENCY', 4))
+JOBS_VISIBILITY_TIMEOUT = 300      # 점유 후 이 시간(초) 안에 끝나지 않으면 다른 워커가 다시 가져감
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BASE_DELAY = 5          # 재시도 대기(초): 5, 10, 20, ... 최대 JOBS_RETRY_MAX_DELAY
+JOBS_RETRY_MAX_DELAY = 60 * 60
+
+# 게시물 변경 시 data/posts.csv 미러를 다시 쓸지 여부와, 변경을 모으는 대기 시간(초)
+POSTS_CSV_MIRROR = env_bool('POSTS_CSV_MIRROR', default=False)
+POSTS_CSV_MIRROR_DELAY = 30
+EXPORT_CHUNK_SIZE = 2000           # 내보내기 시 DB 에서 한 번에 읽어 오는 행 수
+
+# Reading-log import (core/importers.py)
+IMPORT_BATCH_SIZE = 1000                        # 트랜잭션 하나에 반영하는 행 수 (진행 상황 저장 단위)
+IMPORT_UPLOAD_MAX_BYTES = 50 * 1024 * 1024
+IMPORT_DIR = os.path.join(BASE_DIR, 'data', 'imports')  # 올린 파일을 가져오기가 끝나거나 실패할 때까지 보관
+
+# Deletion (core/purge.py): 삭제한 게시물 / 탈퇴한 계정의 행을 지울 때 DELETE 문 하나가 건드리는 최대 행 수
+PURGE_BATCH_SIZE = 1000
+
+# Async interaction API (좋아요/리포스트/댓글/팔로우/알림, core/concurrency.py)
+# ASGI 워커 하나가 동시에 처리하는 요청 수 상한과, 자리가 날 때까지 기다리는 시간(초). 넘으면 503
+ASYNC_API_CONCURRENCY = int(os.environ.get('ASYNC_API_CONCURRENCY', 64))
+ASYNC_API_QUEUE_TIMEOUT = float(os.environ.get('ASYNC_API_QUEUE_TIMEOUT', 5))
+
+# Notifications
+NOTIFICATION_PAGE_SIZE = 20
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))  # 이보다 오래된 읽은 알림은 prune_notifications 가 지움
+
+# Realtime (core/realtime.py, SSE). 'memory' 는 단일 프로세스용, 'sqlite' 는 runworker 등 여러 프로세스가 파일을 공유
+# sqlite 는 발행마다 별도 파일에 연결해 INSERT(fsync)하므로 토글 비용이 늘어난다. 필요할 때만 명시적으로 켠다
+# 알림은 notifications.add 작업에서 발행된다. JOBS_EAGER=False 로 runworker 를 돌리면 웹 프로세스와 워커 모두
+# REALTIME_BROKER=sqlite 여야 알림이 SSE 로 전달된다 ('memory' 면 runworker 가 시작을 거부한다)
+REALTIME_BROKER = os.environ.get('REALTIME_BROKER', 'memory')
+REALTIME_SQLITE_PATH = os.environ.get('REALTIME_SQLITE_PATH', os.path.join(BASE_DIR, 'data', 'realtime.sqlite3'))
+REALTIME_POLL_INTERVAL = 0.5       # sqlite 브로커 폴링 주기(초)
+REALTIME_HEARTBEAT = 20            # 유휴 연결에 보내는 keep-alive 주기(초)
+REALTIME_QUEUE_SIZE = 100          # 연결당 밀린 이벤트 상한 (넘치면 resync)
+
+# Request instrumentation (core/instrumentation.py): Server-Timing 헤더 + 'readlog.perf' 로그
+INSTRUMENTATION_ENABLED = env_bool('INSTRUMENTATION_ENABLED', default=False)
+INSTRUMENTATION_QUERY_WARNING = 30       # 요청당 쿼리가 이보다 많으면 WARNING 으로 기록
+INSTRUMENTATION_DUPLICATE_THRESHOLD = 3  # 같은 모양의 쿼리가 이만큼 반복되면 N+1 의심으로 기록
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {
+        'readlog.perf': {'handlers': ['console'], 'level': os.environ.get('PERF_LOG_LEVEL', 'INFO'), 'propagate': False},
+    },
+}
+
+# Book search (core/book_search.py)
+KAKAO_API_KEY = os.environ.get('KAKAO_API_KEY')
+KAKAO_SEARCH_URL = os.environ.get('KAKAO_SEARCH_URL', 'https://dapi.kakao.com/v3/search/book')
+OPENLIBRARY_SEARCH_URL = os.environ.get('OPENLIBRARY_SEARCH_URL', 'https://openlibrary.org/search.json')
+BOOK_SEARCH_TIMEOUT = float(os.environ.get('BOOK_SEARCH_TIMEOUT', 3))          # 제공자별 마감 시간(초)
+BOOK_SEARCH_CACHE_TTL = int(os.environ.get('BOOK_SEARCH_CACHE_TTL', 60 * 60 * 24))
+BOOK_SEARCH_PARTIAL_CACHE_TTL = int(os.environ.get('BOOK_SEARCH_PARTIAL_CACHE_TTL', 60))  # 일부 제공자 실패 시 (메모리만)
+TYPEAHEAD_MIN_LOCAL_RESULTS = 3   # 로컬 인덱스 결과가 이보다 적으면 외부 제공자까지 조회
+
+# Uploaded images (core/images.py)
+IMAGE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024   # 업로드 허용 최대 용량
+IMAGE_MAX_DIMENSION = 2048                  # 원본 저장 시 긴 변 상한
+IMAGE_MAX_PIXELS = 50_000_000               # 디코딩 허용 픽셀 수 (압축 폭탄 방지)
+
+# Book cover proxy (core/covers.py)
+# 이 호스트(앞에 '.' 이면 하위 도메인 포함)의 표지만 받아 둔다
+COVER_ALLOWED_HOSTS = ['.kakaocdn.net', '.daumcdn.net', 'covers.openlibrary.org', '.archive.org']
+COVER_DISPLAY_SIZE = (600, 900)             # 피드 카드 표시 크기로 줄여 저장
+COVER_MAX_BYTES = 5 * 1024 * 1024           # 원격 이미지 최대 용량
+COVER_FETCH_TIMEOUT = 10
+COVER_REVALIDATE_DAYS = 30                  # 이보다 오래 확인하지 않은 표지는 조건부 요청으로 다시 확인
+COVER_REVALIDATE_INTERVAL = 60 * 60 * 24    # covers.revalidate 작업을 도는 주기(초)
+COVER_CACHE_MAX_AGE = 60 * 60 * 24 * 365    # /covers/<digest>.jpg 브라우저 캐시 (내용 주소라 변하지 않음)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field